@@ -4,74 +4,256 @@ import numpy as np
 import os
 import time
 
-from SimulationParameters import *
+from SimulationConfig import RunConfig
+from codegen_backend import configure_codegen, compile_network
 from SimulationInitialization import (
     make_neurons, make_synapses, make_monitors
 )
 
 
-def main():
-    start_time = time.time()
-
-    prefs.codegen.target = 'numpy'
-    start_scope()
-
+def _prepare_results_dir(cfg, run_tag):
+    """Cria ./results/<RUN_NAME> e grava params.txt. Retorna a pasta."""
     # ---- Nome da pasta de resultados ----
     base_results_dir = "./results"
     timestamp = int(time.time())
 
-    mode_tag = FEEDBACK_MODE.upper()
+    mode_tag = cfg.FEEDBACK_MODE.upper()
 
-    if STDP_ENABLED:
-        ltp_str = str(A_LTP).replace('.', 'p')
-        ltd_str = str(A_LTD).replace('.', 'p').replace('-', 'm')
-        stdp_tag = STDP_MODE.upper()
+    if cfg.STDP_ENABLED:
+        ltp_str = str(cfg.A_LTP).replace('.', 'p')
+        ltd_str = str(cfg.A_LTD).replace('.', 'p').replace('-', 'm')
+        stdp_tag = cfg.STDP_MODE.upper()
         run_name = f"{mode_tag}_STDP_{stdp_tag}_LTP_{ltp_str}_LTD_{ltd_str}_{timestamp}"
     else:
         run_name = f"{mode_tag}_STDP_OFF_{timestamp}"
 
+    if run_tag:
+        run_name = f"{run_name}_{run_tag}"
+
     results_dir = os.path.join(base_results_dir, run_name)
     os.makedirs(results_dir, exist_ok=True)
     print(f"[INFO] Resultados serão salvos em: {os.path.abspath(results_dir)}")
 
     # ---- Salvar parâmetros ----
     with open(os.path.join(results_dir, "params.txt"), "w") as f:
-        f.write(f"FEEDBACK_MODE = {FEEDBACK_MODE}\n")
-        f.write(f"STDP_ENABLED = {STDP_ENABLED}\n")
-        f.write(f"STDP_MODE = {STDP_MODE}\n")
-        f.write(f"A_LTP = {A_LTP}\n")
-        f.write(f"A_LTD = {A_LTD}\n")
-        f.write(f"eta = {eta}\n")
-        f.write(f"W_MIN = {W_MIN}\n")
-        f.write(f"W_MAX = {W_MAX}\n")
-        f.write(f"N = {N}\n")
-        f.write(f"gbar_syn = {gbar_syn}\n")
-        f.write(f"tau_e = {tau_e}\n")
-        f.write(f"T_ref = {T_ref}\n")
-        if FEEDBACK_MODE == 'depression':
-            f.write(f"tau_s_rec = {tau_s_rec}\n")
-            f.write(f"delta_dep = {delta_dep}\n")
-            f.write(f"I_DIST_DEP = {I_DIST_DEP}\n")
-        elif FEEDBACK_MODE == 'adaptation':
-            f.write(f"gbar_theta_min = {gbar_theta_min}\n")
-            f.write(f"gbar_theta_max = {gbar_theta_max}\n")
-            f.write(f"gbar_theta_mean = {gbar_theta}\n")
-            f.write(f"tau_a = {tau_a}\n")
-            f.write(f"I_min_adapt = {I_min_adapt}\n")
-            f.write(f"I_max_adapt = {I_max_adapt}\n")
+        f.write(f"FEEDBACK_MODE = {cfg.FEEDBACK_MODE}\n")
+        f.write(f"STDP_ENABLED = {cfg.STDP_ENABLED}\n")
+        f.write(f"STDP_MODE = {cfg.STDP_MODE}\n")
+        f.write(f"A_LTP = {cfg.A_LTP}\n")
+        f.write(f"A_LTD = {cfg.A_LTD}\n")
+        f.write(f"eta = {cfg.eta}\n")
+        f.write(f"W_MIN = {cfg.W_MIN}\n")
+        f.write(f"W_MAX = {cfg.W_MAX}\n")
+        f.write(f"N = {cfg.N}\n")
+        f.write(f"gbar_syn = {cfg.gbar_syn}\n")
+        f.write(f"tau_e = {cfg.tau_e}\n")
+        f.write(f"T_ref = {cfg.T_ref}\n")
+        f.write(f"RANDOM_SEED = {cfg.RANDOM_SEED}\n")
+        f.write(f"I_ORDER = {cfg.I_ORDER}\n")
+        f.write(f"I_SEED = {cfg.I_SEED}\n")
+        f.write(f"EXECUTION_MODE = {cfg.EXECUTION_MODE}\n")
+        f.write(f"DT = {cfg.DT}\n")
+        f.write(f"INTEGRATION_METHOD = {cfg.INTEGRATION_METHOD}\n")
+        if cfg.FEEDBACK_MODE == 'depression':
+            f.write(f"tau_s_rec = {cfg.tau_s_rec}\n")
+            f.write(f"delta_dep = {cfg.delta_dep}\n")
+            f.write(f"I_DIST_DEP = {cfg.I_DIST_DEP}\n")
+        elif cfg.FEEDBACK_MODE == 'adaptation':
+            f.write(f"gbar_theta_min = {cfg.gbar_theta_min}\n")
+            f.write(f"gbar_theta_max = {cfg.gbar_theta_max}\n")
+            f.write(f"gbar_theta_mean = {cfg.gbar_theta}\n")
+            f.write(f"tau_a = {cfg.tau_a}\n")
+            f.write(f"I_min_adapt = {cfg.I_min_adapt}\n")
+            f.write(f"I_max_adapt = {cfg.I_max_adapt}\n")
+
+    return results_dir
+
+
+def _rate_window(rate):
+    """Largura (amostras) da média móvel de 10 ms de rate_hz.npy."""
+    return int(10 * ms / 2 / rate.clock.dt) * 2 + 1
+
+
+def _early_stop_reached(detector, slow_mon, cfg):
+    """
+    Regra de parada: nenhum episódio há pelo menos EARLY_STOP_QUIET e a
+    variável lenta saturada no repouso (<s> → 1 na depressão, <θ> → 0 na
+    adaptação).
+    """
+    if detector.quiet_ms() < float(cfg.EARLY_STOP_QUIET / ms):
+        return False
+    if slow_mon is None:
+        return True
+    slow = slow_mon.mean()
+    if not len(slow):
+        return False
+    rest = 1.0 if cfg.FEEDBACK_MODE == 'depression' else 0.0
+    return abs(float(slow[-1]) - rest) <= cfg.EARLY_STOP_SLOW_TOL
+
+
+def _run_runtime_loop(net, S, spk, rate, slow_mon, monitors, cfg, results_dir,
+                      codegen_target, t_build, use_batch_stdp, resume_meta=None,
+                      stream=None):
+    """
+    Modo runtime: net.run() em blocos de 500 ms, com o batch STDP aplicado
+    em Python a cada STDP_BATCH_INTERVAL_MS (entre os blocos ou, com stride
+    menor, por uma NetworkOperation), um snapshot dos pesos ao fim de cada bloco e
+    um checkpoint a cada cfg.CHECKPOINT_EVERY blocos. Com stream (RunStream),
+    spikes e taxa de cada bloco vão para o disco e os monitores são esvaziados.
+    Com ONLINE_EPISODES/EARLY_STOP, os episódios são detectados entre os
+    blocos e a execução pode parar antes de SIM_TIME.
+    Retorna (t_compile, t_sim, weight_log, checkpoint, t_stop_ms), com
+    t_stop_ms = None se a execução foi até SIM_TIME.
+    """
+    # ---- Loop de simulação ----
+    SNAPSHOT_INTERVAL = 500 * ms
+    simulation_steps = np.arange(0, cfg.SIM_TIME / second, SNAPSHOT_INTERVAL / second) * second
 
-    # ---- Criar componentes ----
-    G = make_neurons()
-    S = make_synapses(G)
+    first_step = 0
+    if resume_meta is not None:
+        first_step = resume_meta['next_step']
 
-    # Salvar g_theta_inc para reproducibilidade futura (adaptação)
-    if FEEDBACK_MODE == 'adaptation':
-        np.save(os.path.join(results_dir, "gtheta_inc.npy"),
-                np.array(G.g_theta_inc))
-    spk, rate, wmon, slow_mon = make_monitors(G, S)
+    # Log de evolução dos pesos (para diagnóstico)
+    weight_log = [] if resume_meta is None else resume_meta['weight_log']
+
+    if use_batch_stdp:
+        from batch_stdp import (BatchSTDPSchedule, SpikeWindow, format_block_stats,
+                                stdp_network_operation, stdp_time_constants_ms)
+        _, _, max_dt_ms = stdp_time_constants_ms(cfg.tau_pre, cfg.tau_post)
+        # Cursor no SpikeMonitor: cada batch lê só os spikes novos
+        spike_window = SpikeWindow(spk, max_dt_ms)
+        schedule = BatchSTDPSchedule(
+            S, spike_window.advance, cfg, weight_log,
+            t_ms=float(first_step * SNAPSHOT_INTERVAL / ms))
+        if schedule.stride_ms < float(SNAPSHOT_INTERVAL / ms):
+            # Lotes dentro de net.run(); o relógio da operação entra no checkpoint
+            net.add(stdp_network_operation([schedule], schedule.stride_ms))
+
+    # ---- Compilar objetos de código (cache do Brian2 no alvo cython) ----
+    t_compile = compile_network(net)
+    print(f"[INFO] Codegen = {codegen_target} | montagem = {t_build:.2f} s | "
+          f"compilação = {t_compile:.2f} s")
+
+    weight_store = None
+    if cfg.STDP_ENABLED:
+        from weight_store import open_weight_writer
+        weight_store = open_weight_writer(
+            results_dir, len(S.w), len(simulation_steps) + 1, cfg,
+            resume_rows=None if resume_meta is None else resume_meta['next_step'] + 1)
+
+    detector = None
+    if cfg.ONLINE_EPISODES or cfg.EARLY_STOP:
+        from episodes import OnlineEpisodeDetector
+        detector = OnlineEpisodeDetector(float(rate.clock.dt / ms), _rate_window(rate))
+
+    ckpt = None
+    if cfg.CHECKPOINT_EVERY > 0 or resume_meta is not None:
+        from checkpoint import RunCheckpoint
+        ckpt = RunCheckpoint(results_dir, net, monitors)
+
+    if resume_meta is not None:
+        ckpt.restore(resume_meta)
+        if stream is not None and use_batch_stdp:
+            # Os spikes do bloco anterior já estão no disco, não no monitor
+            t_first_ms = float(simulation_steps[first_step] / ms)
+            spike_window.preload(*stream.spikes_since(t_first_ms - max_dt_ms))
+        if stream is not None and detector is not None:
+            # Sem streaming, a taxa anterior volta no monitor restaurado
+            detector.feed(stream.rate_raw())
+        print(f"[INFO] Estado restaurado do checkpoint (t = {net.t}).")
+    elif cfg.STDP_ENABLED:
+        weight_store.write(0, 0.0, np.asarray(S.w))
+        print(f"[INFO] Snapshot inicial dos pesos salvo.")
+
+    t_stop_ms = None
+    t_sim_start = time.time()
+    for step in range(first_step, len(simulation_steps)):
+        t_start = simulation_steps[step]
+        t_end = t_start + SNAPSHOT_INTERVAL
+        print(f"[RUNNING] Simulando de {t_start} até {t_end}...")
+        net.run(SNAPSHOT_INTERVAL, report='text')
+
+        # ---- Batch STDP: lotes que terminam até t_end (o último do bloco,
+        #      ou todos, se o stride não for menor que o bloco) ----
+        if use_batch_stdp:
+            schedule.advance_to(float(t_end / ms))
+            print(format_block_stats(schedule.take_block()))
+
+        # ---- Salvar snapshot dos pesos ----
+        if weight_store is not None:
+            weight_store.write(step + 1, float(t_end / ms), np.asarray(S.w))
+
+        # ---- Episódios online e parada antecipada ----
+        if detector is not None:
+            detector.feed_monitor(rate)
+            episodes = detector.update()
+            t_lepis = detector.t_lepis_ms
+            print(f"  [EPIS] {len(episodes)} episódio(s) | T_LEPIS ≈ "
+                  f"{'—' if t_lepis is None else f'{t_lepis / 1000:.2f} s'} | "
+                  f"sem episódio há {detector.quiet_ms() / 1000:.1f} s")
+            if cfg.EARLY_STOP and _early_stop_reached(detector, slow_mon, cfg):
+                # update() usa o limiar do último recálculo; a parada é
+                # confirmada com a detecção completa sobre a série inteira
+                detector.update(exact=True)
+                if _early_stop_reached(detector, slow_mon, cfg):
+                    t_stop_ms = float(t_end / ms)
+
+        # ---- Streaming: spikes/taxa do bloco para o disco ----
+        if stream is not None:
+            stream.flush()
+            if use_batch_stdp:
+                spike_window.cursor = 0
+            if detector is not None:
+                detector.cursor = 0
+
+        if t_stop_ms is not None:
+            print(f"[INFO] Parada antecipada em t = {t_stop_ms / 1000:.1f} s: sem episódio há "
+                  f"{detector.quiet_ms() / 1000:.1f} s e variável lenta saturada.")
+            break
+
+        # ---- Checkpoint (não no último bloco: a execução já termina) ----
+        next_step = step + 1
+        if (cfg.CHECKPOINT_EVERY > 0 and next_step < len(simulation_steps)
+                and next_step % cfg.CHECKPOINT_EVERY == 0):
+            ckpt.save(cfg, next_step, weight_log,
+                      stream.state() if stream is not None else None)
+
+    t_sim = time.time() - t_sim_start
+    if weight_store is not None:
+        weight_store.close()
+
+    return t_compile, t_sim, weight_log, ckpt, t_stop_ms
+
+
+def _run_brian2(cfg, results_dir, resume_meta=None):
+    """
+    Monta a rede no Brian2 (runtime ou cpp_standalone), simula e salva
+    spikes, taxa, variável lenta e pesos em results_dir.
+    Retorna (backend, t_build, t_compile, t_sim, t_stop_ms).
+    """
+    standalone = (cfg.EXECUTION_MODE == 'standalone')
+    if standalone and resume_meta is not None:
+        raise ValueError("--resume não se aplica ao modo standalone (execução única em C++).")
+
+    # ---- Backend: runtime (cython/numpy) ou cpp_standalone ----
+    if standalone:
+        from standalone_backend import (
+            configure_standalone, make_weight_snapshot_monitor,
+            build_and_run, save_weight_snapshots, release_device
+        )
+        codegen_target, build_dir = configure_standalone(cfg, results_dir)
+    else:
+        codegen_target = configure_codegen(cfg)
+    start_scope()
+
+    # ---- Criar componentes ----
+    t_build_start = time.time()
+    G = make_neurons(cfg)
+    S = make_synapses(G, cfg)
+    spk, rate, wmon, slow_mon = make_monitors(G, S, cfg)
 
-    print(f"[INFO] FEEDBACK_MODE = {FEEDBACK_MODE} | STDP = {STDP_ENABLED} "
-          f"({STDP_MODE if STDP_ENABLED else 'N/A'}) | "
+    print(f"[INFO] FEEDBACK_MODE = {cfg.FEEDBACK_MODE} | STDP = {cfg.STDP_ENABLED} "
+          f"({cfg.STDP_MODE if cfg.STDP_ENABLED else 'N/A'}) | "
           f"sinapses = {S.N} | dt = {defaultclock.dt}")
 
     # ---- Montar a rede ----
@@ -79,112 +261,78 @@ def main():
     if wmon is not None:
         components.append(wmon)
     if slow_mon is not None:
-        components.append(slow_mon)
+        components.extend(slow_mon.objects)
+
+    wsnap = None
+    if standalone and cfg.STDP_ENABLED:
+        wsnap = make_weight_snapshot_monitor(S)
+        components.append(wsnap)
 
     net = Network(*components)
+    t_build = time.time() - t_build_start
 
-    # ---- Importar batch STDP se necessário ----
-    use_batch_stdp = STDP_ENABLED and (STDP_MODE == 'batch')
+    use_batch_stdp = cfg.STDP_ENABLED and (cfg.STDP_MODE == 'batch')
     if use_batch_stdp:
-        from batch_stdp import apply_batch_stdp
-        print(f"[INFO] Batch STDP ativo. Intervalo = {STDP_BATCH_INTERVAL_MS} ms")
-
-    # ---- Loop de simulação ----
-    SNAPSHOT_INTERVAL = 500 * ms
-    simulation_steps = np.arange(0, SIM_TIME / second, SNAPSHOT_INTERVAL / second) * second
-
-    if STDP_ENABLED:
-        initial_weights = np.asarray(S.w)
-        np.save(os.path.join(results_dir, "weights_t_00000.npy"), initial_weights)
-        print(f"[INFO] Snapshot inicial dos pesos salvo.")
-
-    # Variável para rastrear spike index no monitor (para batch STDP)
-    prev_spike_count = 0
-
-    # Log de evolução dos pesos (para diagnóstico)
-    weight_log = []
-
-    for t_start in simulation_steps:
-        t_end = t_start + SNAPSHOT_INTERVAL
-        print(f"[RUNNING] Simulando de {t_start} até {t_end}...")
-        net.run(SNAPSHOT_INTERVAL, report='text')
-
-        # ---- Batch STDP: aplicar atualizações de peso ----
-        if use_batch_stdp:
-            current_spike_count = spk.num_spikes
-            if current_spike_count > prev_spike_count:
-                # Obter todos os spikes e filtrar pelo intervalo atual
-                all_spike_i = np.asarray(spk.i)
-                all_spike_t = np.asarray(spk.t / ms, dtype=float)
-
-                t_start_ms = float(t_start / ms)
-                t_end_ms   = float(t_end / ms)
-
-                stats = apply_batch_stdp(
-                    S, all_spike_i, all_spike_t,
-                    t_start_ms, t_end_ms
-                )
-
-                weight_log.append({
-                    't_ms': t_end_ms,
-                    **stats
-                })
-
-                print(f"  [STDP] <w>={stats['mean_w']:.4f}  "
-                      f"[{stats['min_w']:.3f}, {stats['max_w']:.3f}]  "
-                      f"<Δw>={stats['mean_dw']:.6f}  "
-                      f"LTP_pairs={stats['n_ltp_pairs']}  "
-                      f"LTD_pairs={stats['n_ltd_pairs']}")
-            else:
-                print(f"  [STDP] Sem spikes neste intervalo — pesos inalterados.")
-
-            prev_spike_count = current_spike_count
+        print(f"[INFO] Batch STDP ativo. Intervalo = {cfg.STDP_BATCH_INTERVAL_MS} ms")
+
+    stream = None
+    t_stop_ms = None
+    if standalone:
+        # ---- Executável C++ único: o batch STDP roda no código gerado ----
+        print(f"[INFO] Backend = {codegen_target} | montagem = {t_build:.2f} s | "
+              f"build = {build_dir}")
+        t_compile, t_sim = build_and_run(net, cfg, build_dir)
+        print(f"[INFO] Compilação = {t_compile:.2f} s | simulação = {t_sim:.2f} s")
+
+        weight_log = []
+        if cfg.STDP_ENABLED:
+            weight_log = save_weight_snapshots(
+                results_dir, S, wsnap, cfg, np.asarray(spk.t / ms, dtype=float)
+            )
+    else:
+        ckpt_monitors = [spk, rate, wmon] + (slow_mon.monitors if slow_mon else [])
+        if cfg.STREAM_OUTPUTS:
+            from stream_writer import RunStream
+            stream = RunStream(results_dir, spk, rate,
+                               resume_meta.get('stream') if resume_meta else None)
+            ckpt_monitors = ckpt_monitors[2:]
+
+        t_compile, t_sim, weight_log, ckpt, t_stop_ms = _run_runtime_loop(
+            net, S, spk, rate, slow_mon, ckpt_monitors, cfg, results_dir,
+            codegen_target, t_build, use_batch_stdp, resume_meta, stream
+        )
 
-        # ---- Salvar snapshot dos pesos ----
-        if STDP_ENABLED:
-            current_weights = np.asarray(S.w)
-            time_ms = int(t_end / ms)
-            np.save(os.path.join(results_dir, f"weights_t_{time_ms:05d}.npy"), current_weights)
+    # Salvar g_theta_inc para reproducibilidade futura (adaptação)
+    if cfg.FEEDBACK_MODE == 'adaptation':
+        np.save(os.path.join(results_dir, "gtheta_inc.npy"),
+                np.array(G.g_theta_inc))
 
     # ---- Salvar dados de spikes e taxa ----
-    np.save(os.path.join(results_dir, "spike_i.npy"), np.asarray(spk.i))
-    np.save(os.path.join(results_dir, "spike_t.npy"), np.asarray(spk.t / ms, dtype=float))
-    np.save(os.path.join(results_dir, "rate_t.npy"), np.asarray(rate.t / ms, dtype=float))
-    np.save(os.path.join(results_dir, "rate_hz.npy"),
-            np.asarray(rate.smooth_rate(window='flat', width=10 * ms) / Hz, dtype=float))
+    if stream is not None:
+        # Mesma janela de smooth_rate(window='flat', width=10 ms)
+        stream.finalize(_rate_window(rate))
+    else:
+        np.save(os.path.join(results_dir, "spike_i.npy"), np.asarray(spk.i))
+        np.save(os.path.join(results_dir, "spike_t.npy"), np.asarray(spk.t / ms, dtype=float))
+        np.save(os.path.join(results_dir, "rate_t.npy"), np.asarray(rate.t / ms, dtype=float))
+        np.save(os.path.join(results_dir, "rate_hz.npy"),
+                np.asarray(rate.smooth_rate(window='flat', width=10 * ms) / Hz, dtype=float))
 
-    # ---- Salvar dados da variável lenta (depressão: s, adaptação: ga) ----
+    # ---- Salvar dados da variável lenta (depressão: <s>, adaptação: <θ>) ----
     if slow_mon is not None:
-        if FEEDBACK_MODE == 'depression':
-            s_all = np.array(slow_mon.s)           # shape: (N_neurons, n_timesteps)
-            s_mean = s_all.mean(axis=0)
-            s_t_ms = np.asarray(slow_mon.t / ms, dtype=float)
-            np.save(os.path.join(results_dir, "s_mean.npy"), s_mean)
-            np.save(os.path.join(results_dir, "s_t.npy"), s_t_ms)
-            print(f"[INFO] Dados de <s> salvos ({len(s_mean)} amostras).")
-
-        elif FEEDBACK_MODE == 'adaptation':
-            ga_all = np.array(slow_mon.ga)          # shape: (N_neurons, n_timesteps)
-            # Normalizar ga para adimensional: theta_i = ga_i / gbar_theta
-            # Assim <theta> fica entre 0 e ~1, comparável ao Tabak Fig. 5
-            ga_mean = ga_all.mean(axis=0)            # média em nS
-            theta_mean = ga_mean / float(gbar_theta) # adimensional
-            theta_t_ms = np.asarray(slow_mon.t / ms, dtype=float)
-            np.save(os.path.join(results_dir, "theta_mean.npy"), theta_mean)
-            np.save(os.path.join(results_dir, "theta_t.npy"), theta_t_ms)
-            print(f"[INFO] Dados de <θ> salvos ({len(theta_mean)} amostras).")
+        slow_mon.save(results_dir)
 
     # ---- Salvar dados de pesos (STDP) ----
-    if STDP_ENABLED and (wmon is not None):
+    if cfg.STDP_ENABLED and (wmon is not None):
         np.save(os.path.join(results_dir, "w_t.npy"), np.asarray(wmon.t / ms, dtype=float))
         if len(wmon.record) > 0:
             w_stack = np.vstack([wmon.w[k] for k in range(len(wmon.record))])
             np.save(os.path.join(results_dir, "w_mean.npy"), w_stack.mean(axis=0))
         else:
-            np.save(os.path.join(results_dir, "w_mean.npy"), np.array([float(W_INIT_FIXED)]))
+            np.save(os.path.join(results_dir, "w_mean.npy"), np.array([float(cfg.W_INIT_FIXED)]))
     else:
         np.save(os.path.join(results_dir, "w_t.npy"), np.array([0.0]))
-        np.save(os.path.join(results_dir, "w_mean.npy"), np.array([float(W_INIT_FIXED)]))
+        np.save(os.path.join(results_dir, "w_mean.npy"), np.array([float(cfg.W_INIT_FIXED)]))
 
     # ---- Salvar log de evolução dos pesos (batch STDP) ----
     if use_batch_stdp and weight_log:
@@ -193,92 +341,103 @@ def main():
             json.dump(weight_log, f, indent=2)
         print(f"[INFO] Log STDP salvo ({len(weight_log)} entradas).")
 
-    end_time = time.time()
-    duration = end_time - start_time
-    print(f"\n[INFO] Tempo total de execução: {duration:.2f} segundos.")
-    print(f"[OK] Arquivos salvos em: {os.path.abspath(results_dir)}")
+    if standalone:
+        release_device()
+    elif ckpt is not None:
+        # Saídas finais completas: o checkpoint não é mais necessário
+        ckpt.discard()
+
+    return codegen_target, t_build, t_compile, t_sim, t_stop_ms
+
 
+def postprocess_results(results_dir, cfg):
+    """
+    Relatório de métricas, T_LEPIS, snapshots de pesos e figura TCC de uma
+    pasta de resultados já completa; registro no catálogo de execuções e,
+    por fim, lista dos próximos passos.
+    """
     # ---- Gerar relatório de métricas automaticamente ----
+    report = None
     try:
         from relatorio_metricas import gerar_relatorio
         print("\n[INFO] Gerando relatorio de metricas...")
-        gerar_relatorio(results_dir, verbose=False)
+        report = gerar_relatorio(results_dir, verbose=False)
     except Exception as e:
         print(f"[AVISO] Nao foi possivel gerar relatorio de metricas: {e}")
 
     # ---- Calcular e salvar T_LEPIS (tempo do último episódio) ----
-try:
-    from relatorio_metricas import _detectar_episodios as _det_ep
-
-    _rate_hz_tlepis = np.load(os.path.join(results_dir, "rate_hz.npy"))
-    _rate_t_ms = np.load(os.path.join(results_dir, "rate_t.npy"))
+    try:
+        from episodes import load_episodes
 
-    # Calcula automaticamente o passo temporal real do PopulationRateMonitor.
-    # Isso evita erro quando DT = 0.1 ms.
-    if len(_rate_t_ms) > 1:
-        _dt_ms = float(np.median(np.diff(_rate_t_ms)))
-    else:
-        _dt_ms = float(DT / ms)
+        _rate_hz_tlepis = np.load(os.path.join(results_dir, "rate_hz.npy"))
+        _rate_t_ms = np.load(os.path.join(results_dir, "rate_t.npy"))
 
-    _sim_time_s = float(_rate_t_ms[-1]) / 1000.0
+        # Calcula automaticamente o passo temporal real do PopulationRateMonitor.
+        # Isso evita erro quando DT = 0.1 ms.
+        if len(_rate_t_ms) > 1:
+            _dt_ms = float(np.median(np.diff(_rate_t_ms)))
+        else:
+            _dt_ms = float(cfg.DT / ms)
 
-    print(f"[INFO] T_LEPIS usando dt_ms = {_dt_ms:.6f} ms")
+        _sim_time_s = float(_rate_t_ms[-1]) / 1000.0
 
-    _episodes = _det_ep(_rate_hz_tlepis, dt_ms=_dt_ms)
+        print(f"[INFO] T_LEPIS usando dt_ms = {_dt_ms:.6f} ms")
 
-    if _episodes:
-        # T_LEPIS = onset do último episódio detectado
-        _last_ep = _episodes[-1]
-        _tlepis_ms = float(_last_ep['onset_ms'])
-        _tlepis_s = _tlepis_ms / 1000.0
-        _n_ep = len(_episodes)
-    else:
-        _last_ep = None
-        _tlepis_ms = 0.0
-        _tlepis_s = 0.0
-        _n_ep = 0
+        _episodes = load_episodes(results_dir, rate_hz=_rate_hz_tlepis, dt_ms=_dt_ms)
 
-    # Diagnóstico de segurança
-    if _tlepis_s > _sim_time_s:
-        print(
-            f"[ALERTA] T_LEPIS maior que o tempo de simulação: "
-            f"T_LEPIS={_tlepis_s:.3f}s, SIM_TIME={_sim_time_s:.3f}s. "
-            f"Verifique dt_ms ou detecção de episódios."
-        )
-
-    _tlepis_lines = [
-        "# Tempo do último episódio detectado na simulação.",
-        "# T_LEPIS = onset do último episódio (ms / s).",
-        "# Se N_EPISODES = 0, nenhum episódio foi detectado.",
-        f"DT_USADO_MS      = {_dt_ms:.6f}",
-        f"T_LEPIS_MS       = {_tlepis_ms:.3f}",
-        f"T_LEPIS_S        = {_tlepis_s:.6f}",
-        f"N_EPISODES       = {_n_ep}",
-        f"SIM_TIME_S       = {_sim_time_s:.3f}",
-    ]
-
-    if _last_ep is not None:
-        _tlepis_lines += [
-            f"LAST_EP_ONSET_MS  = {_last_ep['onset_ms']:.3f}",
-            f"LAST_EP_OFFSET_MS = {_last_ep['offset_ms']:.3f}",
-            f"LAST_EP_DUR_MS    = {_last_ep['duration_ms']:.3f}",
+        if len(_episodes):
+            # T_LEPIS = onset do último episódio detectado
+            _last_ep = _episodes[-1]
+            _tlepis_ms = float(_last_ep['onset_ms'])
+            _tlepis_s = _tlepis_ms / 1000.0
+            _n_ep = len(_episodes)
+        else:
+            _last_ep = None
+            _tlepis_ms = 0.0
+            _tlepis_s = 0.0
+            _n_ep = 0
+
+        # Diagnóstico de segurança
+        if _tlepis_s > _sim_time_s:
+            print(
+                f"[ALERTA] T_LEPIS maior que o tempo de simulação: "
+                f"T_LEPIS={_tlepis_s:.3f}s, SIM_TIME={_sim_time_s:.3f}s. "
+                f"Verifique dt_ms ou detecção de episódios."
+            )
+
+        _tlepis_lines = [
+            "# Tempo do último episódio detectado na simulação.",
+            "# T_LEPIS = onset do último episódio (ms / s).",
+            "# Se N_EPISODES = 0, nenhum episódio foi detectado.",
+            f"DT_USADO_MS      = {_dt_ms:.6f}",
+            f"T_LEPIS_MS       = {_tlepis_ms:.3f}",
+            f"T_LEPIS_S        = {_tlepis_s:.6f}",
+            f"N_EPISODES       = {_n_ep}",
+            f"SIM_TIME_S       = {_sim_time_s:.3f}",
         ]
 
-    _tlepis_path = os.path.join(results_dir, "tlepis.txt")
+        if _last_ep is not None:
+            _tlepis_lines += [
+                f"LAST_EP_ONSET_MS  = {_last_ep['onset_ms']:.3f}",
+                f"LAST_EP_OFFSET_MS = {_last_ep['offset_ms']:.3f}",
+                f"LAST_EP_DUR_MS    = {_last_ep['duration_ms']:.3f}",
+            ]
 
-    with open(_tlepis_path, "w", encoding="utf-8") as _f:
-        _f.write("\n".join(_tlepis_lines) + "\n")
+        _tlepis_path = os.path.join(results_dir, "tlepis.txt")
 
-    print(
-        f"[INFO] T_LEPIS = {_tlepis_s:.2f} s "
-        f"(episodio {_n_ep}/{_n_ep}) → salvo em tlepis.txt"
-    )
+        with open(_tlepis_path, "w", encoding="utf-8") as _f:
+            _f.write("\n".join(_tlepis_lines) + "\n")
 
-except Exception as e:
-    print(f"[AVISO] Nao foi possivel calcular T_LEPIS: {e}")
+        print(
+            f"[INFO] T_LEPIS = {_tlepis_s:.2f} s "
+            f"(episodio {_n_ep}/{_n_ep}) → salvo em tlepis.txt"
+        )
+
+    except Exception as e:
+        print(f"[AVISO] Nao foi possivel calcular T_LEPIS: {e}")
 
     # ---- Gerar snapshots de distribuição de pesos (0%, 25%, 50%, 100%) ----
-    if STDP_ENABLED:
+    if cfg.STDP_ENABLED:
         try:
             from plot_weight_snapshots import run_weight_snapshots
             print("\n[INFO] Gerando snapshots de distribuicao de pesos (0/25/50/100%)...")
@@ -300,6 +459,15 @@ except Exception as e:
     except Exception as e:
         print(f"[AVISO] Nao foi possivel gerar figura TCC: {e}")
 
+    # ---- Registrar no catálogo (results/run_catalog.sqlite) ----
+    if cfg.RUN_CATALOG:
+        try:
+            from run_catalog import register_run, catalog_path_for
+            register_run(results_dir, report)
+            print(f"\n[INFO] Execução registrada em {catalog_path_for(results_dir)}")
+        except Exception as e:
+            print(f"[AVISO] Nao foi possivel registrar no catálogo: {e}")
+
     print("\nPROXIMOS PASSOS:")
     print(f"1. Painel resumo (raster+correlações): python plot_summary.py --dir \"{results_dir}\"")
     print(f"2. Exporte dados para o raster plot com: python export_for_plot.py --root \"{results_dir}\" --base N_TESTE")
@@ -307,10 +475,89 @@ except Exception as e:
     print(f"4. Distribuição completa de pesos: python plot_weight_evolution.py --dir \"{results_dir}\"")
     print(f"5. [NOVO] Snapshots 0/25/50/100%: python plot_weight_snapshots.py --dir \"{results_dir}\"")
     print(f"6. [NOVO] Gráfico T_LEPIS: python plot_tlepis_comparison.py --root \"./results\"")
+    print("   Consultar execuções: python run_catalog.py list --root \"./results\"")
 
-    if FEEDBACK_MODE in ('depression', 'adaptation'):
+    if cfg.FEEDBACK_MODE in ('depression', 'adaptation'):
         print(f"7. Análise Tabak (auto-detecta modo): python plot_tabak_analysis.py --dir \"{results_dir}\"")
 
 
+def main(cfg=None, run_tag=None, resume_dir=None):
+    """
+    Executa uma simulação completa e salva os resultados em ./results/<RUN_NAME>.
+
+    cfg : RunConfig, opcional
+        Configuração da execução (padrão: RunConfig(), isto é, os valores
+        de parameter_values.py / iappInit.py).
+    run_tag : str, opcional
+        Sufixo anexado ao nome da pasta de resultados. Usado pelo sweep.py
+        para que execuções paralelas iniciadas no mesmo segundo não
+        compartilhem a mesma pasta.
+    resume_dir : str, opcional
+        Pasta de uma execução interrompida. A configuração e o ponto de
+        partida vêm do último checkpoint (ver checkpoint.py); cfg e run_tag
+        são ignorados.
+    """
+    if cfg is None:
+        cfg = RunConfig()
+
+    start_time = time.time()
+
+    if resume_dir is not None:
+        # ---- Retomada: configuração e pasta vêm do checkpoint ----
+        from checkpoint import load_checkpoint_meta
+        resume_meta = load_checkpoint_meta(resume_dir)
+        cfg = resume_meta['cfg']
+        results_dir = resume_dir
+        print(f"[INFO] Retomando {os.path.abspath(results_dir)} a partir de "
+              f"t = {resume_meta['next_step'] * 500} ms")
+    else:
+        resume_meta = None
+        results_dir = _prepare_results_dir(cfg, run_tag)
+
+    if cfg.EXECUTION_MODE == 'dense':
+        if resume_meta is not None:
+            raise ValueError("--resume não se aplica ao modo dense.")
+        from dense_engine import run_dense
+        codegen_target, t_build, t_compile, t_sim = run_dense(cfg, results_dir)
+        t_stop_ms = None
+    else:
+        if cfg.QUIESCENT_FASTFORWARD:
+            print("[AVISO] QUIESCENT_FASTFORWARD só tem efeito no modo dense; ignorado.")
+        codegen_target, t_build, t_compile, t_sim, t_stop_ms = _run_brian2(
+            cfg, results_dir, resume_meta)
+    if cfg.EARLY_STOP and cfg.EXECUTION_MODE != 'runtime':
+        print("[AVISO] EARLY_STOP só tem efeito no modo runtime; ignorado.")
+
+    end_time = time.time()
+    duration = end_time - start_time
+
+    # ---- Log de execução: backend e tempos de compilação/simulação ----
+    with open(os.path.join(results_dir, "run_log.txt"), "w", encoding="utf-8") as f:
+        f.write(f"CODEGEN_TARGET = {codegen_target}\n")
+        f.write(f"T_BUILD_S      = {t_build:.3f}\n")
+        f.write(f"T_COMPILE_S    = {t_compile:.3f}\n")
+        f.write(f"T_SIM_S        = {t_sim:.3f}\n")
+        f.write(f"T_TOTAL_S      = {duration:.3f}\n")
+        if resume_meta is not None:
+            f.write(f"RESUMED_AT_MS  = {resume_meta['next_step'] * 500}\n")
+        if t_stop_ms is not None:
+            f.write(f"EARLY_STOP_MS  = {t_stop_ms:.0f}\n")
+
+    print(f"\n[INFO] Tempo total de execução: {duration:.2f} segundos "
+          f"(compilação {t_compile:.2f} s, simulação {t_sim:.2f} s, {codegen_target}).")
+    print(f"[OK] Arquivos salvos em: {os.path.abspath(results_dir)}")
+
+    postprocess_results(results_dir, cfg)
+
+    return results_dir
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulação LIF com STDP.")
+    parser.add_argument("--resume", default=None, metavar="RESULTS_DIR",
+                        help="Retoma uma execução interrompida a partir do último checkpoint.")
+    args = parser.parse_args()
+
+    main(resume_dir=args.resume)
\ No newline at end of file
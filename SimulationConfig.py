@@ -0,0 +1,225 @@
+# SimulationConfig.py
+"""
+Configuração explícita e imutável de uma execução.
+
+RunConfig reúne todos os parâmetros de SimulationParameters.py (e a ordem
+e a seed das correntes, I_ORDER e I_SEED, de iappInit.py) em um único
+objeto congelado, que é passado para make_neurons, make_synapses,
+make_monitors, make_iapp e apply_batch_stdp. Assim várias redes com
+parâmetros diferentes (ex.: depressão e adaptação) podem ser montadas e
+simuladas no mesmo processo.
+
+Os valores padrão são lidos dos módulos de parâmetros no momento em que o
+objeto é criado; portanto editar parameter_values.py (os valores sem
+unidades que SimulationParameters.py converte para o Brian2) continua
+sendo a forma de mudar o padrão. Para variações pontuais:
+
+    cfg = RunConfig(A_LTP=0.005, FEEDBACK_MODE='adaptation')
+    cfg2 = cfg.replace(RANDOM_SEED=7)
+"""
+from dataclasses import dataclass, field, fields, replace as _dc_replace
+from functools import partial
+
+from brian2 import Quantity
+
+import SimulationParameters as _P
+import iappInit as _iapp
+
+_VALID_FEEDBACK_MODES = ('depression', 'adaptation')
+_VALID_STDP_MODES     = ('batch', 'event_driven')
+_VALID_I_ORDERS       = ('RAND', 'ASC', 'DES')
+_VALID_CODEGEN        = ('cython', 'numpy')
+_VALID_EXEC_MODES     = ('runtime', 'standalone', 'dense')
+_VALID_INTEGRATION    = ('euler', 'exponential_euler')
+_VALID_WEIGHT_DTYPES  = ('float64', 'float32', 'float16')
+_VALID_WEIGHT_FORMATS = ('dense', 'delta')
+_VALID_STDP_KERNELS   = ('trace', 'pairwise')
+
+
+def _default(name, module=_P):
+    return field(default_factory=partial(getattr, module, name))
+
+
+# Constantes referenciadas nas strings de equações do Brian2
+_NAMESPACE_KEYS = (
+    'Cm', 'gL', 'EL', 'V_th', 'V_reset', 'V_syn',
+    'V_theta', 'tau_a', 'gbar_theta_min', 'gbar_theta_max',
+    'tau_s_rec', 'delta_dep',
+    'tau_pre', 'tau_post', 'A_LTP', 'A_LTD', 'eta', 'W_MIN', 'W_MAX',
+)
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    # ---- Tempo de simulação ----
+    SIM_TIME: Quantity = _default('SIM_TIME')
+    DT:       Quantity = _default('DT')
+    INTEGRATION_METHOD: str = _default('INTEGRATION_METHOD')
+
+    # ---- Tamanho da rede ----
+    N:         int   = _default('N')
+    P_CONNECT: float = _default('P_CONNECT')
+    AUTAPSES:  bool  = _default('AUTAPSES')
+    CONNECTIVITY_CACHE_DIR: object = _default('CONNECTIVITY_CACHE_DIR')
+
+    # ---- Modo de feedback lento ----
+    FEEDBACK_MODE: str = _default('FEEDBACK_MODE')
+
+    # ---- LIF — comuns ----
+    Cm:      Quantity = _default('Cm')
+    gL:      Quantity = _default('gL')
+    EL:      Quantity = _default('EL')
+    V_th:    Quantity = _default('V_th')
+    V_reset: Quantity = _default('V_reset')
+    V_syn:   Quantity = _default('V_syn')
+
+    # ---- Adaptação ----
+    T_ref_adapt:    Quantity = _default('T_ref_adapt')
+    gbar_syn_adapt: Quantity = _default('gbar_syn_adapt')
+    tau_e_adapt:    Quantity = _default('tau_e_adapt')
+    V_theta:        Quantity = _default('V_theta')
+    tau_a:          Quantity = _default('tau_a')
+    gbar_theta_min: Quantity = _default('gbar_theta_min')
+    gbar_theta_max: Quantity = _default('gbar_theta_max')
+    I_min_adapt:    Quantity = _default('I_min_adapt')
+    I_max_adapt:    Quantity = _default('I_max_adapt')
+
+    # ---- Depressão ----
+    T_ref_dep:    Quantity = _default('T_ref_dep')
+    gbar_syn_dep: Quantity = _default('gbar_syn_dep')
+    tau_e_dep:    Quantity = _default('tau_e_dep')
+    tau_s_rec:    Quantity = _default('tau_s_rec')
+    delta_dep:    float    = _default('delta_dep')
+    I_DIST_DEP:   str      = _default('I_DIST_DEP')
+    I_min_dep:    Quantity = _default('I_min_dep')
+    I_max_dep:    Quantity = _default('I_max_dep')
+    I_mean_dep:   Quantity = _default('I_mean_dep')
+    I_std_dep:    Quantity = _default('I_std_dep')
+
+    # ---- Corrente externa ----
+    I_ORDER: str = _default('I_ORDER', _iapp)
+    I_SEED:  int = _default('I_SEED', _iapp)
+
+    # ---- STDP ----
+    STDP_ENABLED: bool     = _default('STDP_ENABLED')
+    STDP_MODE:    str      = _default('STDP_MODE')
+    tau_pre:      Quantity = _default('tau_pre')
+    tau_post:     Quantity = _default('tau_post')
+    A_LTP:        float    = _default('A_LTP')
+    A_LTD:        float    = _default('A_LTD')
+    eta:          float    = _default('eta')
+    STDP_BATCH_INTERVAL_MS: float = _default('STDP_BATCH_INTERVAL_MS')
+    STDP_KERNEL:  str      = _default('STDP_KERNEL')
+    STDP_THREADS: int      = _default('STDP_THREADS')
+
+    # ---- Pesos ----
+    W_MIN:                 float = _default('W_MIN')
+    W_MAX:                 float = _default('W_MAX')
+    W_INIT_FIXED:          float = _default('W_INIT_FIXED')
+    W_INIT_MIN:            float = _default('W_INIT_MIN')
+    W_INIT_MAX:            float = _default('W_INIT_MAX')
+    W_INIT_NORMALIZE_MEAN: bool  = _default('W_INIT_NORMALIZE_MEAN')
+    RANDOM_SEED:           object = _default('RANDOM_SEED')
+
+    # ---- Monitoramento / atraso ----
+    N_W_SAMPLES: int      = _default('N_W_SAMPLES')
+    W_MON_DT:    Quantity = _default('W_MON_DT')
+    DELAY:       Quantity = _default('DELAY')
+
+    # ---- Registro da variável lenta ----
+    SLOW_RECORD_STD:    bool     = _default('SLOW_RECORD_STD')
+    SLOW_TRACE_NEURONS: int      = _default('SLOW_TRACE_NEURONS')
+    SLOW_TRACE_DT:      Quantity = _default('SLOW_TRACE_DT')
+
+    # ---- Histórico de pesos ----
+    WEIGHT_STORE_DTYPE:    str = _default('WEIGHT_STORE_DTYPE')
+    WEIGHT_STORE_FORMAT:   str = _default('WEIGHT_STORE_FORMAT')
+    WEIGHT_KEYFRAME_EVERY: int = _default('WEIGHT_KEYFRAME_EVERY')
+
+    # ---- Geração de código ----
+    CODEGEN_TARGET:    str    = _default('CODEGEN_TARGET')
+    CODEGEN_CACHE_DIR: object = _default('CODEGEN_CACHE_DIR')
+
+    # ---- Modo de execução ----
+    EXECUTION_MODE:            str    = _default('EXECUTION_MODE')
+    QUIESCENT_FASTFORWARD:     bool   = _default('QUIESCENT_FASTFORWARD')
+    STANDALONE_OPENMP_THREADS: int    = _default('STANDALONE_OPENMP_THREADS')
+    STANDALONE_BUILD_DIR:      object = _default('STANDALONE_BUILD_DIR')
+
+    # ---- Streaming e checkpoints (modo runtime) ----
+    STREAM_OUTPUTS:   bool = _default('STREAM_OUTPUTS')
+    CHECKPOINT_EVERY: int  = _default('CHECKPOINT_EVERY')
+
+    # ---- Episódios online e parada antecipada (modo runtime) ----
+    ONLINE_EPISODES:     bool     = _default('ONLINE_EPISODES')
+    EARLY_STOP:          bool     = _default('EARLY_STOP')
+    EARLY_STOP_QUIET:    Quantity = _default('EARLY_STOP_QUIET')
+    EARLY_STOP_SLOW_TOL: float    = _default('EARLY_STOP_SLOW_TOL')
+
+    # ---- Catálogo de execuções ----
+    RUN_CATALOG: bool = _default('RUN_CATALOG')
+
+    def __post_init__(self):
+        if self.FEEDBACK_MODE not in _VALID_FEEDBACK_MODES:
+            raise ValueError(f"FEEDBACK_MODE inválido: '{self.FEEDBACK_MODE}'.")
+        if self.STDP_MODE not in _VALID_STDP_MODES:
+            raise ValueError(f"STDP_MODE inválido: '{self.STDP_MODE}'.")
+        if self.STDP_KERNEL not in _VALID_STDP_KERNELS:
+            raise ValueError(f"STDP_KERNEL inválido: '{self.STDP_KERNEL}'.")
+        if not self.STDP_BATCH_INTERVAL_MS > 0:
+            raise ValueError("STDP_BATCH_INTERVAL_MS deve ser > 0.")
+        if self.STDP_THREADS < 0:
+            raise ValueError("STDP_THREADS deve ser ≥ 0.")
+        if self.I_ORDER not in _VALID_I_ORDERS:
+            raise ValueError(f"I_ORDER inválido: '{self.I_ORDER}'.")
+        if self.CODEGEN_TARGET not in _VALID_CODEGEN:
+            raise ValueError(f"CODEGEN_TARGET inválido: '{self.CODEGEN_TARGET}'.")
+        if self.EXECUTION_MODE not in _VALID_EXEC_MODES:
+            raise ValueError(f"EXECUTION_MODE inválido: '{self.EXECUTION_MODE}'.")
+        if self.INTEGRATION_METHOD not in _VALID_INTEGRATION:
+            raise ValueError(f"INTEGRATION_METHOD inválido: '{self.INTEGRATION_METHOD}'.")
+        if self.WEIGHT_STORE_DTYPE not in _VALID_WEIGHT_DTYPES:
+            raise ValueError(f"WEIGHT_STORE_DTYPE inválido: '{self.WEIGHT_STORE_DTYPE}'.")
+        if self.WEIGHT_STORE_FORMAT not in _VALID_WEIGHT_FORMATS:
+            raise ValueError(f"WEIGHT_STORE_FORMAT inválido: '{self.WEIGHT_STORE_FORMAT}'.")
+        if self.WEIGHT_KEYFRAME_EVERY < 1:
+            raise ValueError("WEIGHT_KEYFRAME_EVERY deve ser ≥ 1.")
+        if self.EARLY_STOP_SLOW_TOL < 0:
+            raise ValueError("EARLY_STOP_SLOW_TOL deve ser ≥ 0.")
+
+    # ---- Atalhos resolvidos em função do modo ativo ----
+    @property
+    def T_ref(self):
+        return self.T_ref_dep if self.FEEDBACK_MODE == 'depression' else self.T_ref_adapt
+
+    @property
+    def gbar_syn(self):
+        return self.gbar_syn_dep if self.FEEDBACK_MODE == 'depression' else self.gbar_syn_adapt
+
+    @property
+    def tau_e(self):
+        return self.tau_e_dep if self.FEEDBACK_MODE == 'depression' else self.tau_e_adapt
+
+    @property
+    def gbar_theta(self):
+        return 0.5 * (self.gbar_theta_min + self.gbar_theta_max)
+
+    # ---- Utilidades ----
+    def replace(self, **changes):
+        """Retorna uma cópia com os campos indicados alterados."""
+        return _dc_replace(self, **changes)
+
+    def as_dict(self):
+        """Todos os campos (sem os atalhos derivados)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def brian_namespace(self):
+        """Namespace explícito para NeuronGroup/Synapses desta configuração."""
+        ns = {k: getattr(self, k) for k in _NAMESPACE_KEYS}
+        ns.update(gbar_syn=self.gbar_syn, tau_e=self.tau_e)
+        return ns
+
+
+def field_names():
+    """Nomes aceitos como sobrescrita (ex.: pelo sweep.py)."""
+    return [f.name for f in fields(RunConfig)]
@@ -2,22 +2,33 @@
 from brian2 import *
 import os
 import numpy as np
-from SimulationParameters import *
+from SimulationConfig import RunConfig
+from connectivity import connection_pairs
 from iappInit import make_iapp
+from slow_variable import SlowVariableRecorder
+from synapse_index import SynapseIndex
 
 _RESULTS_DIR = "./results"
 
 
-def make_neurons():
+def make_neurons(cfg=None, replicas=None):
     """
-    Cria o NeuronGroup com equações que dependem de FEEDBACK_MODE.
+    Cria o NeuronGroup com equações que dependem de cfg.FEEDBACK_MODE.
 
     - 'adaptation': inclui variável ga (corrente de adaptação lenta).
     - 'depression': inclui variável s (disponibilidade sináptica pré-sináptica).
+
+    cfg : RunConfig, opcional (padrão: RunConfig()).
+    replicas : lista de RunConfig, opcional
+        Modo ensemble (ensemble.py): um único grupo de K·N neurônios, em
+        que o bloco k usa as correntes externas de replicas[k].
     """
-    defaultclock.dt = DT
+    if cfg is None:
+        cfg = RunConfig()
+
+    defaultclock.dt = cfg.DT
 
-    if FEEDBACK_MODE == 'adaptation':
+    if cfg.FEEDBACK_MODE == 'adaptation':
         eqs = '''
         dv/dt = ( -gL*(v - EL) - ge*(v - V_syn) - ga*(v - V_theta) + I_app ) / Cm : volt (unless refractory)
         dge/dt = -ge / tau_e : siemens
@@ -27,7 +38,7 @@ def make_neurons():
         '''
         reset_str = 'v = V_reset; ga += g_theta_inc'
 
-    elif FEEDBACK_MODE == 'depression':
+    elif cfg.FEEDBACK_MODE == 'depression':
         eqs = '''
         dv/dt = ( -gL*(v - EL) - ge*(v - V_syn) + I_app ) / Cm : volt (unless refractory)
         dge/dt = -ge / tau_e : siemens
@@ -36,21 +47,24 @@ def make_neurons():
         '''
         reset_str = 'v = V_reset; s = s * (1.0 - delta_dep)'
     else:
-        raise ValueError(f"FEEDBACK_MODE inválido: '{FEEDBACK_MODE}'")
+        raise ValueError(f"FEEDBACK_MODE inválido: '{cfg.FEEDBACK_MODE}'")
+
+    n_total = cfg.N * len(replicas) if replicas else cfg.N
 
     G = NeuronGroup(
-        N, eqs,
+        n_total, eqs,
         threshold='v > V_th',
         reset=reset_str,
-        refractory=T_ref,
-        method='euler',
+        refractory=cfg.T_ref,
+        method=cfg.INTEGRATION_METHOD,
+        namespace=cfg.brian_namespace(),
         name='neurongroup'
     )
 
     # ---- Estados iniciais ----
-    G.v = EL + (V_th - EL) * 0.2
+    G.v = cfg.EL + (cfg.V_th - cfg.EL) * 0.2
 
-    if FEEDBACK_MODE == 'adaptation':
+    if cfg.FEEDBACK_MODE == 'adaptation':
         G.ge = 0 * nS
         G.ga = 0 * nS
 
@@ -58,16 +72,19 @@ def make_neurons():
         # Mantido como estava no seu modelo.
         G.g_theta_inc = 'gbar_theta_min + rand() * (gbar_theta_max - gbar_theta_min)'
 
-    elif FEEDBACK_MODE == 'depression':
+    elif cfg.FEEDBACK_MODE == 'depression':
         G.ge = 0 * nS
         G.s  = 1.0
 
-    G.I_app = make_iapp()
+    if replicas:
+        G.I_app = np.concatenate([np.asarray(make_iapp(r)) for r in replicas]) * amp
+    else:
+        G.I_app = make_iapp(cfg)
 
     return G
 
 
-def make_synapses(G):
+def make_synapses(G, cfg=None, replicas=None):
     """
     Cria as sinapses.
 
@@ -85,16 +102,25 @@ def make_synapses(G):
     - Se STDP_MODE == 'event_driven':
       traces apre/apost do Brian2.
       AVISO: pode causar viés LTD em redes episódicas.
+
+    - Se STDP_MODE == 'batch' e EXECUTION_MODE == 'standalone':
+      o batch STDP é reescrito no código gerado (ver _standalone_batch_stdp).
+
+    replicas : lista de RunConfig, opcional
+        Modo ensemble: conectividade bloco-diagonal, um bloco (e seus pesos
+        iniciais) por réplica.
     """
+    if cfg is None:
+        cfg = RunConfig()
 
     # ---------- String de transmissão sináptica ----------
-    if FEEDBACK_MODE == 'depression':
+    if cfg.FEEDBACK_MODE == 'depression':
         syn_transmit = 'ge_post += w * gbar_syn * s_pre'
     else:
         syn_transmit = 'ge_post += w * gbar_syn'
 
     # ---------- Escolher modelo de STDP ----------
-    if STDP_ENABLED and STDP_MODE == 'event_driven':
+    if cfg.STDP_ENABLED and cfg.STDP_MODE == 'event_driven':
         print("[AVISO] Usando STDP event-driven — pode causar viés LTD e morte da rede.")
 
         model_str = '''
@@ -116,7 +142,10 @@ def make_synapses(G):
 
         syn_name = 'synapses_stdp_ed'
 
-    elif STDP_ENABLED and STDP_MODE == 'batch':
+    elif cfg.STDP_ENABLED and cfg.STDP_MODE == 'batch' and cfg.EXECUTION_MODE == 'standalone':
+        return _standalone_batch_stdp(G, cfg, syn_transmit)
+
+    elif cfg.STDP_ENABLED and cfg.STDP_MODE == 'batch':
         # Batch STDP: sinapses com peso w mas SEM traces.
         # As atualizações são feitas por batch_stdp.apply_batch_stdp().
         model_str = 'w : 1'
@@ -139,6 +168,7 @@ def make_synapses(G):
             on_pre=on_pre_str,
             on_post=on_post_str,
             method='euler',
+            namespace=cfg.brian_namespace(),
             name=syn_name
         )
     else:
@@ -147,17 +177,49 @@ def make_synapses(G):
             model=model_str,
             on_pre=on_pre_str,
             method='euler',
+            namespace=cfg.brian_namespace(),
             name=syn_name
         )
 
-    # ---------- Conectividade ----------
-    if AUTAPSES:
-        S.connect(p=P_CONNECT)
-    else:
-        S.connect(condition='i != j', p=P_CONNECT)
+    _connect_and_init_weights(S, cfg, replicas)
 
-    S.delay = DELAY
+    if cfg.STDP_ENABLED and cfg.STDP_MODE == 'batch' and not replicas:
+        # Índice CSR/CSC para o batch STDP, construído uma única vez
+        # (no ensemble cada bloco de réplica tem o seu, em ensemble.py).
+        S.add_attribute('syn_index')
+        S.syn_index = SynapseIndex.from_synapses(S)
+    return S
 
+
+def _connect_and_init_weights(S, cfg, replicas=None):
+    """Conectividade, atraso e pesos iniciais (comum a todos os modelos)."""
+    # ---------- Conectividade ----------
+    if replicas:
+        # Réplicas independentes: bloco k liga apenas os neurônios
+        # [k·N, (k+1)·N) entre si, com os pares e pesos de replicas[k].
+        pre_all, post_all, w_all = [], [], []
+        for k, rcfg in enumerate(replicas):
+            pre_idx, post_idx = connection_pairs(rcfg)
+            pre_all.append(pre_idx + k * rcfg.N)
+            post_all.append(post_idx + k * rcfg.N)
+            w_all.append(initial_weights(len(pre_idx), rcfg))
+        S.connect(i=np.concatenate(pre_all), j=np.concatenate(post_all))
+        S.delay = cfg.DELAY
+        S.w = np.concatenate(w_all)
+        return
+
+    # Pares gerados em NumPy (e lidos do cache, se já sorteados) em vez de
+    # S.connect(condition='i != j', p=...), que avalia os N² candidatos.
+    # No standalone isso também torna o número de sinapses conhecido aqui.
+    pre_idx, post_idx = connection_pairs(cfg)
+    S.connect(i=pre_idx, j=post_idx)
+
+    S.delay = cfg.DELAY
+    S.w = initial_weights(len(S), cfg)
+
+
+def initial_weights(n_synapses, cfg):
+    """Pesos iniciais de n_synapses sinapses (ordem das sinapses do Brian2)."""
     # ---------- Inicialização dos pesos ----------
     #
     # Antes:
@@ -173,16 +235,14 @@ def make_synapses(G):
     # Isso permite que o histograma inicial não fique em uma barra só,
     # mas também evita mudar demais o comportamento calibrado da rede.
 
-    n_synapses = len(S.w[:])
-
-    if RANDOM_SEED is not None:
-        rng = np.random.RandomState(RANDOM_SEED)
+    if cfg.RANDOM_SEED is not None:
+        rng = np.random.RandomState(cfg.RANDOM_SEED)
     else:
         rng = np.random.RandomState()
 
-    initial_weights = rng.uniform(
-        W_INIT_MIN,
-        W_INIT_MAX,
+    weights = rng.uniform(
+        cfg.W_INIT_MIN,
+        cfg.W_INIT_MAX,
         size=n_synapses
     )
 
@@ -192,39 +252,126 @@ def make_synapses(G):
     #   média depois = 1.0000
     #
     # Isso ajuda a comparar com a versão antiga em que todos os pesos eram 1.0.
-    if W_INIT_NORMALIZE_MEAN:
-        initial_weights = initial_weights / np.mean(initial_weights) * W_INIT_FIXED
+    if cfg.W_INIT_NORMALIZE_MEAN:
+        weights = weights / np.mean(weights) * cfg.W_INIT_FIXED
 
     # Garante que nenhum peso ultrapasse os limites do modelo.
-    initial_weights = np.clip(initial_weights, W_MIN, W_MAX)
-
-    S.w = initial_weights
+    weights = np.clip(weights, cfg.W_MIN, cfg.W_MAX)
 
     print(
         f"[INFO] Pesos iniciais uniformes: "
-        f"seed={RANDOM_SEED}, "
-        f"min={np.min(initial_weights):.4f}, "
-        f"max={np.max(initial_weights):.4f}, "
-        f"media={np.mean(initial_weights):.4f}, "
-        f"dp={np.std(initial_weights):.4f}"
+        f"seed={cfg.RANDOM_SEED}, "
+        f"min={np.min(weights):.4f}, "
+        f"max={np.max(weights):.4f}, "
+        f"media={np.mean(weights):.4f}, "
+        f"dp={np.std(weights):.4f}"
+    )
+
+    return weights
+
+
+def _standalone_batch_stdp(G, cfg, syn_transmit):
+    """
+    Batch STDP dentro do código gerado (modo standalone).
+
+    Em apply_batch_stdp() cada par (pré, pós) com 0 < |Δt| < max_dt_ms é
+    contado exatamente uma vez: no batch que contém o spike MAIS TARDIO
+    do par (o overlap-ignore descarta os pares cujos dois spikes caem no
+    batch anterior). Isso equivale a acumular, a cada spike, a soma sobre
+    os spikes do outro lado nos últimos max_dt_ms:
+
+      spike pós em t: dw_acc += A_LTP · Σ exp(−(t − t_pre)/tau_pre)
+      spike pré em t: dw_acc += A_LTD · Σ exp(−(t − t_post)/tau_post)
+
+    Essas somas são traces (apre, apost) com janela de corte exata: cada
+    spike soma 1 ao trace e, max_dt_ms depois, uma via com atraso retira
+    a mesma contribuição já decaída (exp(−max_dt_ms/tau)).
+
+    Ordem dentro de um passo de tempo (atributo order das vias):
+      -4 retirar spikes que completaram max_dt_ms  (Δt = 100 ms excluído)
+      -3 ler o trace do outro lado                  (Δt = 0 excluído)
+      -2 somar o spike atual ao próprio trace
+      -1 transmissão sináptica (via 'pre', atraso DELAY)
+
+    A cada STDP_BATCH_INTERVAL_MS, antes do passo de tempo, o lote é
+    aplicado: w = clip(w + eta · dw_acc, W_MIN, W_MAX) e dw_acc = 0.
+    O último lote (em t = SIM_TIME) é aplicado pelo standalone_backend
+    depois da execução.
+    """
+    from batch_stdp import stdp_time_constants_ms
+
+    _, _, max_dt_ms = stdp_time_constants_ms(cfg.tau_pre, cfg.tau_post)
+    window = max_dt_ms * ms
+
+    model_str = '''
+    w : 1
+    dw_acc : 1
+    dapre/dt  = -apre / tau_pre  : 1 (event-driven)
+    dapost/dt = -apost / tau_post : 1 (event-driven)
+    '''
+
+    on_pre = {
+        'pre':              syn_transmit,
+        'stdp_expire_pre':  'apre -= exp(-stdp_window / tau_pre)',
+        'stdp_read_pre':    'dw_acc += A_LTD * apost',
+        'stdp_push_pre':    'apre += 1',
+    }
+    on_post = {
+        'stdp_expire_post': 'apost -= exp(-stdp_window / tau_post)',
+        'stdp_read_post':   'dw_acc += A_LTP * apre',
+        'stdp_push_post':   'apost += 1',
+    }
+    delays = {
+        'stdp_expire_pre':  window, 'stdp_read_pre':  0 * ms, 'stdp_push_pre':  0 * ms,
+        'stdp_expire_post': window, 'stdp_read_post': 0 * ms, 'stdp_push_post': 0 * ms,
+    }
+
+    S = Synapses(
+        G, G,
+        model=model_str,
+        on_pre=on_pre,
+        on_post=on_post,
+        delay=delays,
+        method='euler',
+        namespace={**cfg.brian_namespace(), 'stdp_window': window},
+        name='synapses_stdp_batch'
+    )
+
+    for side in ('pre', 'post'):
+        getattr(S, f'stdp_expire_{side}').order = -4
+        getattr(S, f'stdp_read_{side}').order   = -3
+        getattr(S, f'stdp_push_{side}').order   = -2
+
+    _connect_and_init_weights(S, cfg)
+
+    S.run_regularly(
+        'w = clip(w + eta * dw_acc, W_MIN, W_MAX)\n'
+        'dw_acc = 0',
+        dt=cfg.STDP_BATCH_INTERVAL_MS * ms,
+        when='start',
+        name='synapses_stdp_batch_apply'
     )
 
     return S
 
 
-def make_monitors(G, S):
+def make_monitors(G, S, cfg=None):
     """
     Cria monitores de spikes, taxa, pesos e variável lenta.
 
     Retorna:
         spikemon, ratemon, wmon, slow_mon
+    (slow_mon é um SlowVariableRecorder: incluir slow_mon.objects na Network)
     """
+    if cfg is None:
+        cfg = RunConfig()
+
     spk  = SpikeMonitor(G, name='spikemon')
     rate = PopulationRateMonitor(G, name='ratemon')
 
     # Monitor de pesos.
     # Mantido apenas se STDP estiver ativo.
-    nrec = min(N_W_SAMPLES, S.N)
+    nrec = min(cfg.N_W_SAMPLES, S.N)
 
     idx = np.random.RandomState(123).choice(
         S.N,
@@ -233,15 +380,14 @@ def make_monitors(G, S):
     )
 
     wmon = (
-        StateMonitor(S, 'w', record=idx, dt=W_MON_DT, name='wmon')
-        if STDP_ENABLED else None
+        StateMonitor(S, 'w', record=idx, dt=cfg.W_MON_DT, name='wmon')
+        if cfg.STDP_ENABLED else None
     )
 
-    # Monitor da variável lenta.
-    if FEEDBACK_MODE == 'depression':
-        slow_mon = StateMonitor(G, 's', record=True, dt=1*ms, name='smon')
-    elif FEEDBACK_MODE == 'adaptation':
-        slow_mon = StateMonitor(G, 'ga', record=True, dt=1*ms, name='gamon')
+    # Variável lenta: média populacional acumulada durante a simulação
+    # (ver slow_variable.py), sem a matriz N×T de StateMonitor(G, record=True).
+    if cfg.FEEDBACK_MODE in ('depression', 'adaptation'):
+        slow_mon = SlowVariableRecorder(G, cfg)
     else:
         slow_mon = None
 
@@ -29,25 +29,187 @@
 #   • Amplitude: A_LTP/A_LTD = 0.0005 (HH: 0.005) — reescalonamento
 #     para topologia all-to-all com N=100 neurônios.
 #   • W_MIN: 0.5 (HH: 0.0) — piso elevado para evitar morte da rede LIF.
-#   • Stride: 500ms (HH: 50ms) — lote maior compatível com loop do Brian2;
-#     o overlap-ignore garante que os pares de fronteira não sejam
-#     perdidos nem contados duas vezes.
+#   • Stride: 500ms por padrão (HH: 50ms); STDP_BATCH_INTERVAL_MS=50
+#     reproduz a cadência do HH. O overlap-ignore garante que os pares de
+#     fronteira não sejam perdidos nem contados duas vezes com qualquer
+#     stride: cada par é contado no lote do seu spike mais tardio.
+#
+# Stride e snapshots: os pesos são gravados a cada 500 ms, e o stride é
+# independente disso (BatchSTDPSchedule). No modo runtime, com stride
+# menor que o bloco, os lotes são aplicados por uma NetworkOperation
+# dentro de net.run(), sem dividir o bloco em várias chamadas a net.run()
+# (cada uma com o custo fixo de preparar a rede).
+#
+# Kernels (cfg.STDP_KERNEL): 'pairwise' monta, para cada sinapse, a matriz
+# t_post − t_pre; 'trace' obtém as mesmas somas de trens ordenados com
+# somas acumuladas de exp(±t/τ) e buscas binárias, sem o produto
+# n_pre · n_post por sinapse. check_batch_stdp.py compara os dois.
+# Com cfg.STDP_THREADS > 1, o 'trace' divide as linhas das somas entre um
+# pool de threads, com resultado idêntico ao sequencial.
+
+import os
 
 import numpy as np
-from SimulationParameters import (
-    A_LTP, A_LTD, eta,
-    tau_pre, tau_post,
-    W_MIN, W_MAX,
-    N
-)
 
-# Converter constantes de tempo para ms (float)
-_TAU_PRE_MS  = float(tau_pre / 1e-3)   # ex: 20.0
-_TAU_POST_MS = float(tau_post / 1e-3)  # ex: 20.0
-_MAX_DT_MS   = 5.0 * max(_TAU_PRE_MS, _TAU_POST_MS)  # janela máxima = 100 ms
+from parameter_values import tau_pre, tau_post
+from synapse_index import synapse_index
+
+
+def stdp_time_constants_ms(tau_pre, tau_post):
+    """Retorna (tau_pre_ms, tau_post_ms, max_dt_ms) como floats em ms."""
+    tau_pre_ms  = float(tau_pre / 1e-3)
+    tau_post_ms = float(tau_post / 1e-3)
+    return tau_pre_ms, tau_post_ms, 5.0 * max(tau_pre_ms, tau_post_ms)
+
+
+# Converter constantes de tempo para ms (float) — valores padrão
+_TAU_PRE_MS, _TAU_POST_MS, _MAX_DT_MS = stdp_time_constants_ms(tau_pre, tau_post)
+# ex: 20.0, 20.0, janela máxima = 100 ms
 
 
-def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms):
+class SpikeWindow:
+    """
+    Janela dos spikes de um SpikeMonitor usada pelo batch STDP.
+
+    Reler spk.i e spk.t inteiros a cada batch custa O(spikes desde t = 0),
+    e o custo total de uma execução cresce com T². Aqui um cursor no
+    monitor lê, a cada batch, só os spikes gravados desde o batch anterior
+    e descarta os anteriores a t_start − max_dt_ms: o custo por batch não
+    depende da duração da execução.
+
+    spk : SpikeMonitor (modo runtime)
+    max_dt_ms : float, opcional
+        Extensão da janela para trás de t_start (padrão: 5·max(τ_pre, τ_post)).
+    """
+
+    def __init__(self, spk, max_dt_ms=_MAX_DT_MS):
+        self.spk = spk
+        self.max_dt_ms = max_dt_ms
+        self.cursor = 0
+        self.i = np.zeros(0, dtype=np.int32)
+        self.t_ms = np.zeros(0)
+
+    def preload(self, spike_i, spike_t_ms):
+        """Insere spikes anteriores aos do monitor (retomada com streaming)."""
+        self.i = np.concatenate([np.asarray(spike_i, dtype=self.i.dtype), self.i])
+        self.t_ms = np.concatenate([np.asarray(spike_t_ms, dtype=float), self.t_ms])
+
+    def advance(self, t_start_ms):
+        """
+        Incorpora os spikes novos do monitor e retorna (spike_i, spike_t_ms)
+        com os spikes de [t_start_ms − max_dt_ms, agora).
+        """
+        new_i, new_t = self._read_new()
+        if len(new_i):
+            self.i = np.concatenate([self.i, new_i])
+            self.t_ms = np.concatenate([self.t_ms, new_t])
+
+        keep = np.searchsorted(self.t_ms, t_start_ms - self.max_dt_ms, side='left')
+        self.i, self.t_ms = self.i[keep:], self.t_ms[keep:]
+        return self.i, self.t_ms
+
+    def _read_new(self):
+        """Spikes gravados no monitor desde o cursor (avança o cursor)."""
+        n = self.spk.num_spikes
+        if n <= self.cursor:
+            return self.i[:0], self.t_ms[:0]
+        # get_value() devolve o array interno do monitor, sem cópia
+        new_i = self.spk.variables['i'].get_value()[self.cursor:n]
+        new_t = self.spk.variables['t'].get_value()[self.cursor:n] / 1e-3
+        self.cursor = n
+        return new_i, new_t
+
+
+class BatchSTDPSchedule:
+    """
+    Lotes do batch STDP a cada cfg.STDP_BATCH_INTERVAL_MS (stride),
+    independente dos blocos de 500 ms dos snapshots: o lote k cobre
+    [k·stride, (k+1)·stride). advance_to(t_ms) aplica, em ordem, todos os
+    lotes que terminam até t_ms; lotes sem spikes são pulados (pesos e
+    weight_log inalterados), como antes.
+
+    S : Synapses (ou objeto com i, j, w)
+    spikes : função t_start_ms → (spike_i, spike_t_ms) com ao menos os
+             spikes de [t_start_ms − max_dt_ms, agora), em ordem temporal
+             (ex.: SpikeWindow.advance)
+    log : lista de {'t_ms': fim do lote, **stats} (weight_log); cada lote
+          aplicado acrescenta uma entrada
+    t_ms : lotes que terminam até t_ms já foram aplicados (retomada)
+
+    Com stride menor que o bloco, stdp_network_operation() chama
+    advance_to() dentro de net.run(), sem interromper a simulação.
+    """
+
+    def __init__(self, S, spikes, cfg, log=None, t_ms=0.0):
+        self.S = S
+        self.spikes = spikes
+        self.cfg = cfg
+        self.stride_ms = float(cfg.STDP_BATCH_INTERVAL_MS)
+        self.log = [] if log is None else log
+        self.next_batch = int(np.floor(t_ms / self.stride_ms + 1e-9))
+        self.n_applied = 0
+        self._block = []
+
+    def advance_to(self, t_ms):
+        """Aplica os lotes com fim ≤ t_ms. Retorna quantos foram aplicados."""
+        n = 0
+        while (self.next_batch + 1) * self.stride_ms <= t_ms + 1e-6:
+            t_start_ms = self.next_batch * self.stride_ms
+            t_end_ms = t_start_ms + self.stride_ms
+            self.next_batch += 1
+
+            spike_i, spike_t_ms = self.spikes(t_start_ms)
+            lo, hi = np.searchsorted(spike_t_ms, [t_start_ms, t_end_ms], side='left')
+            if hi <= lo:
+                continue
+
+            stats = apply_batch_stdp(self.S, spike_i, spike_t_ms, t_start_ms, t_end_ms, self.cfg)
+            self.log.append({'t_ms': t_end_ms, **stats})
+            self._block.append(stats)
+            n += 1
+        self.n_applied += n
+        return n
+
+    def take_block(self):
+        """Estatísticas dos lotes aplicados desde a última chamada."""
+        block, self._block = self._block, []
+        return block
+
+
+def stdp_network_operation(schedules, stride_ms, name='batch_stdp_apply'):
+    """
+    NetworkOperation do Brian2 (modo runtime) que aplica os lotes pendentes
+    de cada BatchSTDPSchedule no início de cada passo múltiplo do stride.
+    Os spikes do passo atual ainda não foram gravados: o lote [t − stride, t)
+    está completo.
+    """
+    from brian2 import Clock, NetworkOperation, ms
+
+    def _apply(t):
+        t_ms = float(t / ms)
+        for schedule in schedules:
+            schedule.advance_to(t_ms)
+
+    # Relógio com nome fixo: o checkpoint restaura os relógios pelo nome
+    clock = Clock(dt=stride_ms * ms, name=f"{name}_clock")
+    return NetworkOperation(_apply, clock=clock, when='start', name=name)
+
+
+def format_block_stats(block):
+    """Linha [STDP] de um bloco de snapshot (block: stats de take_block())."""
+    if not block:
+        return "  [STDP] Sem spikes neste intervalo — pesos inalterados."
+    last = block[-1]
+    line = (f"<w>={last['mean_w']:.4f}  [{last['min_w']:.3f}, {last['max_w']:.3f}]  "
+            f"<Δw>={sum(b['mean_dw'] for b in block):.6f}  "
+            f"LTP_pairs={sum(b['n_ltp_pairs'] for b in block)}  "
+            f"LTD_pairs={sum(b['n_ltd_pairs'] for b in block)}")
+    if len(block) > 1:
+        line = f"{len(block)} lotes | " + line
+    return "  [STDP] " + line
+
+
+def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms, cfg=None):
     """
     Calcula e aplica atualizações STDP em lote para o intervalo
     [t_start_ms, t_end_ms], com tratamento de fronteira equivalente
@@ -62,7 +224,9 @@ def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms):
     Parâmetros
     ----------
     S : brian2.Synapses
-        Objeto de sinapses (deve ter S.w, S.i, S.j).
+        Objeto de sinapses (deve ter S.w, S.i, S.j). O índice CSR/CSC
+        S.syn_index (synapse_index.py) é construído na primeira chamada se
+        make_synapses não o tiver criado.
     spike_i : array-like
         Índices dos neurônios que dispararam (de SpikeMonitor.i).
     spike_t_ms : array-like
@@ -71,19 +235,29 @@ def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms):
         Início do batch atual (ms).
     t_end_ms : float
         Fim do batch atual (ms).
+    cfg : RunConfig, opcional
+        Configuração da execução (padrão: RunConfig()).
 
     Retorna
     -------
     dict com estatísticas: mean_dw, std_dw, mean_w, min_w, max_w,
                            n_ltp_pairs, n_ltd_pairs
     """
+    if cfg is None:
+        from SimulationConfig import RunConfig
+        cfg = RunConfig()
+
+    A_LTP, A_LTD, eta = cfg.A_LTP, cfg.A_LTD, cfg.eta
+    W_MIN, W_MAX      = cfg.W_MIN, cfg.W_MAX
+    tau_pre_ms, tau_post_ms, max_dt_ms = stdp_time_constants_ms(cfg.tau_pre, cfg.tau_post)
+
     spike_i    = np.asarray(spike_i)
     spike_t_ms = np.asarray(spike_t_ms)
 
     # --- Zona de sobreposição (overlap-ignore) ---
-    # Inclui spikes de até _MAX_DT_MS antes de t_start_ms para capturar
+    # Inclui spikes de até max_dt_ms antes de t_start_ms para capturar
     # pares que cruzam a fronteira do batch.
-    overlap_start_ms = t_start_ms - _MAX_DT_MS  # = t_start - 100ms
+    overlap_start_ms = t_start_ms - max_dt_ms  # = t_start - 100ms
     is_first_batch   = (t_start_ms == 0.0)
 
     # Coletar spikes na janela estendida: [overlap_start, t_end)
@@ -101,9 +275,56 @@ def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms):
             'n_ltp_pairs': 0, 'n_ltd_pairs': 0
         }
 
+    # --- Só as sinapses com pré e pós ativos na janela (índice CSR/CSC) ---
+    index  = synapse_index(S)
+    active = index.between(np.unique(si_ext))
+    kernel = _KERNELS[cfg.STDP_KERNEL]
+    dw_active, n_ltp_total, n_ltd_total = kernel(
+        index.pre[active], index.post[active], si_ext, st_ext, t_start_ms,
+        is_first_batch, A_LTP, A_LTD, tau_pre_ms, tau_post_ms, max_dt_ms,
+        n_threads=stdp_threads(cfg)
+    )
+
+    # --- Aplicar fator global e atualizar pesos ---
+    dw    = np.zeros(len(index), dtype=np.float64)
+    dw[active] = dw_active * eta
+    w_arr = np.asarray(S.w)
+    w_new = np.clip(w_arr + dw, W_MIN, W_MAX)
+    S.w   = w_new
+
+    return {
+        'mean_dw':     float(np.mean(dw)),
+        'std_dw':      float(np.std(dw)),
+        'mean_w':      float(np.mean(w_new)),
+        'min_w':       float(np.min(w_new)),
+        'max_w':       float(np.max(w_new)),
+        'n_ltp_pairs': n_ltp_total,
+        'n_ltd_pairs': n_ltd_total
+    }
+
+
+# ------------------------------------------------------------
+# Kernels: Δw (sem eta) e número de pares LTP/LTD por batch
+# ------------------------------------------------------------
+# Ambos recebem os spikes da janela estendida [t_start − max_dt, t_end) e
+# devolvem (dw, n_ltp_pairs, n_ltd_pairs) com os mesmos pares e as mesmas
+# somas (a menos de arredondamento): ver check_batch_stdp.py. n_threads só
+# é usado pelo 'trace'; o 'pairwise' (referência) é sempre sequencial.
+
+def stdp_threads(cfg):
+    """Threads do kernel para cfg.STDP_THREADS (0 = todos os núcleos)."""
+    return int(cfg.STDP_THREADS) or (os.cpu_count() or 1)
+
+
+def _pairwise_dw(syn_pre, syn_post, spike_i, spike_t_ms, t_start_ms, is_first_batch,
+                 A_LTP, A_LTD, tau_pre_ms, tau_post_ms, max_dt_ms, n_threads=1):
+    """
+    Implementação de referência: para cada sinapse, a matriz completa
+    t_post[:, None] − t_pre[None, :]. Custo O(n_syn · n_post · n_pre).
+    """
     # --- Agrupar spikes por neurônio ---
     spike_trains = {}
-    for neuron_id, t in zip(si_ext, st_ext):
+    for neuron_id, t in zip(spike_i, spike_t_ms):
         nid = int(neuron_id)
         if nid not in spike_trains:
             spike_trains[nid] = []
@@ -112,10 +333,7 @@ def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms):
     for nid in spike_trains:
         spike_trains[nid] = np.sort(np.array(spike_trains[nid]))
 
-    # --- Índices das sinapses ---
-    syn_pre  = np.asarray(S.i)
-    syn_post = np.asarray(S.j)
-    n_syn    = len(syn_pre)
+    n_syn = len(syn_pre)
 
     dw          = np.zeros(n_syn, dtype=np.float64)
     n_ltp_total = 0
@@ -149,35 +367,195 @@ def apply_batch_stdp(S, spike_i, spike_t_ms, t_start_ms, t_end_ms):
             in_overlap = (t_post_mat < t_start_ms) & (t_pre_mat < t_start_ms)
 
         # --- Pares causais: dt > 0 (pré antes de pós) → LTP ---
-        causal_mask = (dt_matrix > 0) & (dt_matrix < _MAX_DT_MS) & (~in_overlap)
+        causal_mask = (dt_matrix > 0) & (dt_matrix < max_dt_ms) & (~in_overlap)
         if np.any(causal_mask):
             dt_causal   = dt_matrix[causal_mask]
-            ltp_contrib = A_LTP * np.sum(np.exp(-dt_causal / _TAU_PRE_MS))
+            ltp_contrib = A_LTP * np.sum(np.exp(-dt_causal / tau_pre_ms))
             dw[syn_idx] += ltp_contrib
             n_ltp_total += int(np.sum(causal_mask))
 
         # --- Pares anti-causais: dt < 0 (pós antes de pré) → LTD ---
         # A_LTD é negativo; dt_anti < 0 → exp(dt_anti/τ) ∈ (0,1)
         # → contribuição é negativa (LTD), igual ao HH: −aLTD·exp(dt/τ)
-        anti_mask = (dt_matrix < 0) & (dt_matrix > -_MAX_DT_MS) & (~in_overlap)
+        anti_mask = (dt_matrix < 0) & (dt_matrix > -max_dt_ms) & (~in_overlap)
         if np.any(anti_mask):
             dt_anti     = dt_matrix[anti_mask]
-            ltd_contrib = A_LTD * np.sum(np.exp(dt_anti / _TAU_POST_MS))
+            ltd_contrib = A_LTD * np.sum(np.exp(dt_anti / tau_post_ms))
             dw[syn_idx] += ltd_contrib
             n_ltd_total += int(np.sum(anti_mask))
 
-    # --- Aplicar fator global e atualizar pesos ---
-    dw   *= eta
-    w_arr = np.asarray(S.w)
-    w_new = np.clip(w_arr + dw, W_MIN, W_MAX)
-    S.w   = w_new
+    return dw, n_ltp_total, n_ltd_total
 
-    return {
-        'mean_dw':     float(np.mean(dw)),
-        'std_dw':      float(np.std(dw)),
-        'mean_w':      float(np.mean(w_new)),
-        'min_w':       float(np.min(w_new)),
-        'max_w':       float(np.max(w_new)),
-        'n_ltp_pairs': n_ltp_total,
-        'n_ltd_pairs': n_ltd_total
-    }
+
+def _window_sums(times, starts, neuron, later, max_dt_ms, tau_ms, t_ref, rows):
+    """
+    Somas exponenciais entre os trens dos neurônios `rows` e os spikes
+    `later` (índices em times):
+
+        sums[r, k] = Σ exp(−(t_k − s)/τ)  sobre os spikes s de rows[r]
+                                          com 0 < t_k − s < max_dt_ms
+        counts[r, k] = número desses spikes
+
+    times está ordenado por (neurônio, tempo) e starts[n]:starts[n+1] é o
+    trem do neurônio n. Os limites de cada janela vêm de buscas binárias
+    e a soma, de diferenças de somas acumuladas por neurônio: o custo não
+    depende do produto dos tamanhos dos trens.
+    """
+    t_k = times[later][None, :]
+    row_start = starts[rows][:, None]
+    row_end = starts[rows + 1][:, None]
+
+    # Busca por neurônio numa só chamada: chave = neurônio·W + (t − t0)
+    t0 = times.min() - max_dt_ms - 1.0
+    W = times.max() - t0 + 1.0
+    keys = neuron * W + (times - t0)
+    base = rows[:, None] * W - t0
+    hi = np.searchsorted(keys, base + t_k, side='left')
+    lo = np.searchsorted(keys, base + (t_k - max_dt_ms), side='right')
+
+    # Arredondamento da chave pode deslocar o limite em uma posição: os
+    # critérios finais são os da referência (t_k − s > 0 e t_k − s < max_dt)
+    def _t(idx):
+        return times[np.clip(idx, 0, len(times) - 1)]
+    hi -= (hi > row_start) & (_t(hi - 1) >= t_k)
+    hi += (hi < row_end) & (_t(hi) < t_k)
+    lo += (lo < row_end) & (t_k - _t(lo) >= max_dt_ms)
+    lo -= (lo > row_start) & (t_k - _t(lo - 1) < max_dt_ms)
+    lo = np.minimum(lo, hi)
+
+    # Somas acumuladas por neurônio (linhas com zeros à direita), com
+    # tempos relativos a t_ref para manter as exponenciais em faixa
+    n_spk = starts[rows + 1] - starts[rows]
+    cum = np.zeros((len(rows), int(n_spk.max()) + 1))
+    pos = np.arange(len(times)) - starts[neuron]
+    in_rows = np.zeros(len(starts) - 1, dtype=np.int64) - 1
+    in_rows[rows] = np.arange(len(rows))
+    sel = in_rows[neuron] >= 0
+    cum[in_rows[neuron[sel]], pos[sel] + 1] = np.exp((times[sel] - t_ref) / tau_ms)
+    np.cumsum(cum, axis=1, out=cum)
+
+    r = np.arange(len(rows))[:, None]
+    window = cum[r, hi - row_start] - cum[r, lo - row_start]
+    return np.exp(-(t_k - t_ref) / tau_ms) * window, hi - lo
+
+
+def _trace_dw(syn_pre, syn_post, spike_i, spike_t_ms, t_start_ms, is_first_batch,
+              A_LTP, A_LTD, tau_pre_ms, tau_post_ms, max_dt_ms, n_threads=1):
+    """
+    Kernel linear: trens ordenados e núcleo exponencial. A soma de um
+    spike "posterior" t_k sobre os spikes de um neurônio em
+    (t_k − max_dt, t_k) vem de somas acumuladas de exp(s/τ), e os
+    limites, de buscas binárias. Custo O(n_neurônios · n_spikes · log)
+    por batch, vetorizado sobre todos os pares (neurônio, spike).
+
+    Overlap-ignore: um par é ignorado quando os dois spikes estão antes de
+    t_start, isto é, quando o spike posterior do par está antes de
+    t_start. Basta então tomar como posteriores só os spikes ≥ t_start
+    (no primeiro batch não há spikes antes de t_start = 0).
+
+    LTP da sinapse (a → b): spikes posteriores de b, trem de a, τ_pre.
+    LTD da sinapse (a → b): spikes posteriores de a, trem de b, τ_post.
+
+    Paralelismo (n_threads > 1): as linhas (neurônios cujo trem é somado)
+    são divididas em grupos processados por um pool de threads; as
+    operações do NumPy liberam o GIL. As somas de uma linha não dependem
+    das outras linhas do grupo, e cada sinapse recebe um único termo LTP
+    (da linha do pré) e um único LTD (da linha do pós): o resultado é
+    idêntico bit a bit para qualquer número de threads.
+    """
+    n_syn = len(syn_pre)
+    dw = np.zeros(n_syn, dtype=np.float64)
+    if n_syn == 0:
+        return dw, 0, 0
+
+    n_neurons = int(max(syn_pre.max(), syn_post.max(), spike_i.max())) + 1
+    order = np.lexsort((spike_t_ms, spike_i))
+    neuron = spike_i[order].astype(np.int64)
+    times = spike_t_ms[order].astype(np.float64)
+    starts = np.zeros(n_neurons + 1, dtype=np.int64)
+    np.cumsum(np.bincount(neuron, minlength=n_neurons), out=starts[1:])
+
+    later = np.flatnonzero(times >= t_start_ms) if not is_first_batch else np.arange(len(times))
+    if not len(later):
+        return dw, 0, 0
+
+    # Neurônio → coluna (posteriores agrupados por neurônio, em ordem)
+    later_neurons, first = np.unique(neuron[later], return_index=True)
+    col_of = np.full(n_neurons, -1, dtype=np.int64)
+    col_of[later_neurons] = np.arange(len(later_neurons))
+    t_ref = 0.5 * (times.min() + times.max())
+
+    # Linhas em grupos de até ~4M elementos por matriz (somados entre as
+    # threads), com ao menos um grupo por thread
+    rows_all = np.flatnonzero(np.diff(starts) > 0)
+    row_pos = np.full(n_neurons, -1, dtype=np.int64)
+    row_pos[rows_all] = np.arange(len(rows_all))
+    n_threads = max(1, min(int(n_threads), len(rows_all)))
+    block = max(1, 4_000_000 // (len(later) * n_threads))
+    block = min(block, -(-len(rows_all) // n_threads))
+    n_groups = -(-len(rows_all) // block)
+
+    # LTP: linhas = pré (trem), colunas = pós (spikes posteriores)
+    # LTD: linhas = pós (trem), colunas = pré (spikes posteriores)
+    # Para cada termo, as sinapses válidas agrupadas pelo grupo da linha
+    terms = []
+    for tau_ms, amp, row_syn, col_syn in ((tau_pre_ms, A_LTP, syn_pre, syn_post),
+                                          (tau_post_ms, A_LTD, syn_post, syn_pre)):
+        r, c = row_pos[row_syn], col_of[col_syn]
+        syn = np.flatnonzero((r >= 0) & (c >= 0))
+        group = r[syn] // block
+        by_group = np.argsort(group, kind='stable')
+        syn = syn[by_group]
+        bounds = np.searchsorted(group[by_group], np.arange(n_groups + 1))
+        terms.append((tau_ms, amp, r, c, syn, bounds, np.zeros(n_syn)))
+
+    # τ_pre = τ_post: LTP e LTD usam as mesmas somas de cada grupo
+    shared = (tau_pre_ms == tau_post_ms)
+    tasks = [(g, (0, 1)) for g in range(n_groups)] if shared else \
+            [(g, (t,)) for t in (0, 1) for g in range(n_groups)]
+
+    def run_task(task):
+        g, which = task
+        rows = rows_all[g * block:(g + 1) * block]
+        sums, counts = _window_sums(times, starts, neuron, later, max_dt_ms,
+                                    terms[which[0]][0], t_ref, rows)
+        red_sum = np.add.reduceat(sums, first, axis=1)
+        red_cnt = np.add.reduceat(counts, first, axis=1)
+        n_pairs = []
+        for t in which:
+            _, amp, r, c, syn, bounds, out = terms[t]
+            sel = syn[bounds[g]:bounds[g + 1]]
+            # Cada sinapse aparece num único grupo por termo: escritas disjuntas
+            out[sel] += amp * red_sum[r[sel] - g * block, c[sel]]
+            n_pairs.append((t, int(red_cnt[r[sel] - g * block, c[sel]].sum())))
+        return n_pairs
+
+    if n_threads > 1 and len(tasks) > 1:
+        results = list(_thread_pool(n_threads).map(run_task, tasks))
+    else:
+        results = [run_task(task) for task in tasks]
+
+    n_pairs = [0, 0]
+    for res in results:
+        for t, n in res:
+            n_pairs[t] += n
+
+    dw += terms[0][-1]
+    dw += terms[1][-1]
+    return dw, n_pairs[0], n_pairs[1]
+
+
+_POOLS = {}
+
+
+def _thread_pool(n_threads):
+    """Pool de threads do kernel 'trace' (um por tamanho, reutilizado)."""
+    pool = _POOLS.get(n_threads)
+    if pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix='batch_stdp')
+        _POOLS[n_threads] = pool
+    return pool
+
+
+_KERNELS = {'pairwise': _pairwise_dw, 'trace': _trace_dw}
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+bench_dt.py
+===========
+Benchmark do passo de integração: estatísticas dos episódios vs. tempo
+de parede para vários dt e métodos de integração (INTEGRATION_METHOD).
+
+Para cada combinação (método, dt, seed) roda LIF_EMILLY.main() e lê:
+  - número de episódios, duração média dos episódios, T_LEPIS e taxa
+    média (relatorio_metricas.gerar_relatorio);
+  - T_SIM_S e T_TOTAL_S (run_log.txt).
+
+A referência é o menor dt com o primeiro método da lista (padrão:
+Euler com dt = 0.05 ms). Cada combinação passa se, para todas as
+métricas, a média entre seeds satisfaz
+  |média − média_ref| ≤ max(atol, rtol·|média_ref|, 2·EP)
+(EP = erro padrão combinado; check_dense_engine.compare). No fim,
+informa o maior dt aprovado de cada método e o ganho de tempo.
+
+Uso:
+  python bench_dt.py --sim-time 60 --seeds 1 2 3
+  python bench_dt.py --dts 0.1 0.2 0.5 --methods exponential_euler --set FEEDBACK_MODE=adaptation
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from check_dense_engine import METRIC_ATOL, compare as compare_metrics
+
+_RESULTS_DIR = "./results"
+
+# Tolerâncias absolutas de check_dense_engine.py, mais a duração média
+_ATOL = {**METRIC_ATOL, 'dur_mean_s': 0.05}
+
+
+def run_point(cfg, run_tag):
+    """Executa uma simulação e retorna suas métricas e tempos."""
+    from LIF_EMILLY import main as lif_main
+    from relatorio_metricas import gerar_relatorio
+    from run_catalog import read_kv
+
+    results_dir = lif_main(cfg, run_tag=run_tag)
+    rel = gerar_relatorio(results_dir, verbose=False)
+    log = read_kv(os.path.join(results_dir, "run_log.txt"))
+    return {
+        'n_episodes':  float(rel['n_episodes']),
+        'dur_mean_s':  float(rel['duracao_media_s']),
+        't_lepis_s':   float(rel['tlepis_s']),
+        'rate_hz':     float(rel['taxa_media_hz']),
+        't_sim_s':     float(log['T_SIM_S']),
+        't_total_s':   float(log['T_TOTAL_S']),
+        'results_dir': results_dir,
+    }
+
+
+def compare(ref, points, rtol):
+    """Retorna {métrica: (média_ref, média, tolerância, ok)}."""
+    return {key: tuple(row) for key, *row in compare_metrics(ref, points, rtol, _ATOL)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estatísticas dos episódios vs. tempo de parede para vários dt."
+    )
+    parser.add_argument("--dts", type=float, nargs="+", default=[0.05, 0.1, 0.2, 0.5],
+                        help="Valores de DT em ms (padrão: 0.05 0.1 0.2 0.5).")
+    parser.add_argument("--methods", nargs="+", default=['euler', 'exponential_euler'],
+                        help="Métodos de integração (padrão: euler exponential_euler).")
+    parser.add_argument("--sim-time", type=float, default=60.0,
+                        help="SIM_TIME de cada execução, em segundos (padrão: 60).")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[99],
+                        help="Valores de RANDOM_SEED (padrão: 99).")
+    parser.add_argument("--set", action="append", metavar="PARAM=valor",
+                        help="Sobrescrita de parâmetro comum às execuções (pode repetir).")
+    parser.add_argument("--rtol", type=float, default=0.10,
+                        help="Tolerância relativa das médias (padrão: 0.10).")
+    args = parser.parse_args()
+
+    from brian2 import second, ms
+    from SimulationConfig import RunConfig
+    from sweep import parse_value
+
+    overrides = {}
+    for item in args.set or []:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = parse_value(value)
+
+    base = RunConfig(**overrides).replace(SIM_TIME=args.sim_time * second)
+    dts = sorted(args.dts)
+
+    # ---- Execuções ----
+    results = {}
+    for method in args.methods:
+        for dt in dts:
+            points = []
+            for seed in args.seeds:
+                cfg = base.replace(DT=dt * ms, INTEGRATION_METHOD=method, RANDOM_SEED=seed)
+                print(f"\n[INFO] {method} | dt = {dt:g} ms | seed {seed}")
+                points.append(run_point(cfg, run_tag=f"BENCHDT_{method.upper()}_{dt:g}MS_S{seed}"))
+            results[(method, dt)] = points
+
+    ref_key = (args.methods[0], dts[0])
+    ref = results[ref_key]
+    ref_time = np.mean([p['t_sim_s'] for p in ref])
+
+    # ---- Tabela ----
+    print("\n" + "=" * 100)
+    print(f"  BENCHMARK DE dt  |  SIM_TIME = {args.sim_time:g} s | seeds = {args.seeds} | "
+          f"referência = {ref_key[0]}, dt = {ref_key[1]:g} ms")
+    print("=" * 100)
+    print(f"  {'método':<18} {'dt (ms)':>7} {'T_SIM (s)':>10} {'ganho':>6} "
+          f"{'episódios':>10} {'dur. (s)':>9} {'T_LEPIS (s)':>12} {'taxa (Hz)':>10}  status")
+    print("-" * 100)
+
+    summary = []
+    best = {}
+    for (method, dt), points in results.items():
+        rows = compare(ref, points, args.rtol)
+        ok = all(r[3] for r in rows.values())
+        t_sim = float(np.mean([p['t_sim_s'] for p in points]))
+        speedup = ref_time / t_sim if t_sim > 0 else float('inf')
+        flags = [k for k, r in rows.items() if not r[3]]
+        print(f"  {method:<18} {dt:>7g} {t_sim:>10.2f} {speedup:>5.2f}x "
+              f"{rows['n_episodes'][1]:>10.1f} {rows['dur_mean_s'][1]:>9.3f} "
+              f"{rows['t_lepis_s'][1]:>12.2f} {rows['rate_hz'][1]:>10.3f}  "
+              f"{'[OK]' if ok else '[FORA] ' + ','.join(flags)}")
+        if ok:
+            best[method] = max(best.get(method, 0.0), dt)
+        summary.append({
+            'method': method, 'dt_ms': dt, 't_sim_s': t_sim, 'speedup': speedup, 'ok': ok,
+            'metrics': {k: {'ref': r[0], 'mean': r[1], 'tol': r[2], 'ok': r[3]}
+                        for k, r in rows.items()},
+            'runs': points,
+        })
+    print("-" * 100)
+
+    for method in args.methods:
+        if method in best:
+            t_best = np.mean([p['t_sim_s'] for p in results[(method, best[method])]])
+            print(f"  [OK] {method}: maior dt dentro da tolerância = {best[method]:g} ms "
+                  f"({ref_time / t_best:.2f}x mais rápido que a referência)")
+        else:
+            print(f"  [AVISO] {method}: nenhum dt dentro da tolerância.")
+    print("=" * 100)
+
+    os.makedirs(_RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(_RESULTS_DIR, f"bench_dt_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            'sim_time_s': args.sim_time, 'seeds': args.seeds, 'rtol': args.rtol,
+            'overrides': {k: repr(v) for k, v in overrides.items()},
+            'reference': {'method': ref_key[0], 'dt_ms': ref_key[1]},
+            'points': summary,
+        }, f, indent=2)
+    print(f"[OK] Resultados do benchmark salvos em: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
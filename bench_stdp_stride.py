@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_stdp_stride.py
+====================
+Benchmark do stride do batch STDP (STDP_BATCH_INTERVAL_MS): tempo de
+parede vs. stride, com os snapshots dos pesos mantidos a cada 500 ms.
+
+Para cada (modo de execução, stride) roda a simulação com
+bench_dt.run_point() e usa:
+  - T_SIM_S (run_log.txt);
+  - número de episódios e T_LEPIS (relatorio_metricas.gerar_relatorio),
+    só como referência: com outro stride os pesos mudam em outros
+    instantes e a trajetória não é a mesma;
+  - número de lotes aplicados (stdp_weight_log.json), lido aqui.
+
+A referência de cada modo é o maior stride da lista (padrão: 500 ms).
+A tabela mostra a razão de tempo em relação a ela e o custo marginal por
+lote: (T_SIM − T_SIM_ref) / (lotes − lotes_ref).
+
+Uso:
+  python bench_stdp_stride.py --sim-time 60
+  python bench_stdp_stride.py --strides 500 100 50 --modes runtime dense
+"""
+import argparse
+import json
+import os
+import time
+
+from bench_dt import run_point as run_dt_point
+
+_RESULTS_DIR = "./results"
+
+
+def run_point(cfg, run_tag):
+    """bench_dt.run_point() mais o número de lotes do batch STDP aplicados."""
+    point = run_dt_point(cfg, run_tag)
+
+    n_batches = 0
+    log_path = os.path.join(point['results_dir'], "stdp_weight_log.json")
+    if os.path.exists(log_path):
+        with open(log_path, encoding="utf-8") as f:
+            n_batches = len(json.load(f))
+
+    point['n_batches'] = n_batches
+    point['n_episodes'] = int(point['n_episodes'])
+    return point
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tempo de parede vs. stride do batch STDP (STDP_BATCH_INTERVAL_MS)."
+    )
+    parser.add_argument("--strides", type=float, nargs="+", default=[500.0, 250.0, 100.0, 50.0],
+                        help="Valores de STDP_BATCH_INTERVAL_MS em ms (padrão: 500 250 100 50).")
+    parser.add_argument("--modes", nargs="+", default=['runtime'],
+                        help="Valores de EXECUTION_MODE (padrão: runtime).")
+    parser.add_argument("--sim-time", type=float, default=60.0,
+                        help="SIM_TIME de cada execução, em segundos (padrão: 60).")
+    parser.add_argument("--set", action="append", metavar="PARAM=valor",
+                        help="Sobrescrita de parâmetro comum às execuções (pode repetir).")
+    args = parser.parse_args()
+
+    from brian2 import second
+    from SimulationConfig import RunConfig
+    from sweep import parse_value
+
+    overrides = {}
+    for item in args.set or []:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = parse_value(value)
+
+    base = RunConfig(**overrides).replace(SIM_TIME=args.sim_time * second,
+                                          STDP_ENABLED=True, STDP_MODE='batch')
+    strides = sorted(args.strides, reverse=True)
+
+    # ---- Execuções ----
+    results = {}
+    for mode in args.modes:
+        for stride in strides:
+            cfg = base.replace(EXECUTION_MODE=mode, STDP_BATCH_INTERVAL_MS=stride)
+            print(f"\n[INFO] {mode} | stride = {stride:g} ms")
+            results[(mode, stride)] = run_point(
+                cfg, run_tag=f"BENCHSTRIDE_{mode.upper()}_{stride:g}MS")
+
+    # ---- Tabela ----
+    print("\n" + "=" * 92)
+    print(f"  BENCHMARK DO STRIDE DO BATCH STDP  |  SIM_TIME = {args.sim_time:g} s | "
+          f"referência = stride {strides[0]:g} ms")
+    print("=" * 92)
+    print(f"  {'modo':<10} {'stride (ms)':>11} {'lotes':>6} {'T_SIM (s)':>10} {'razão':>6} "
+          f"{'ms/lote extra':>14} {'episódios':>10} {'T_LEPIS (s)':>12}")
+    print("-" * 92)
+
+    summary = []
+    for (mode, stride), p in results.items():
+        ref = results[(mode, strides[0])]
+        ratio = p['t_sim_s'] / ref['t_sim_s'] if ref['t_sim_s'] > 0 else float('nan')
+        extra = p['n_batches'] - ref['n_batches']
+        per_batch_ms = 1e3 * (p['t_sim_s'] - ref['t_sim_s']) / extra if extra > 0 else float('nan')
+        print(f"  {mode:<10} {stride:>11g} {p['n_batches']:>6d} {p['t_sim_s']:>10.2f} "
+              f"{ratio:>5.2f}x {per_batch_ms:>14.2f} {p['n_episodes']:>10d} "
+              f"{p['t_lepis_s']:>12.2f}")
+        summary.append({'mode': mode, 'stride_ms': stride, 'ratio': ratio,
+                        'extra_ms_per_batch': per_batch_ms, **p})
+    print("=" * 92)
+
+    os.makedirs(_RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(_RESULTS_DIR,
+                            f"bench_stdp_stride_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            'sim_time_s': args.sim_time, 'strides_ms': strides, 'modes': args.modes,
+            'overrides': {k: repr(v) for k, v in overrides.items()},
+            'points': summary,
+        }, f, indent=2)
+    print(f"[OK] Resultados do benchmark salvos em: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
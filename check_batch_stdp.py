@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+check_batch_stdp.py
+===================
+Verificação de igualdade entre os kernels do batch STDP (batch_stdp.py):
+'trace' (somas acumuladas e buscas binárias) e 'pairwise' (referência,
+matriz t_post − t_pre por sinapse).
+
+Casos aleatórios: trens de Poisson em rajadas numa grade de dt = 0.1 ms
+(com pares a exatamente max_dt_ms de distância), conectividade
+all-to-all ou esparsa, τ_pre ≠ τ_post, primeiro batch e batches
+seguintes (overlap-ignore) e spikes fora da janela estendida.
+Com --dir, repete os batches de 500 ms de uma execução gravada.
+
+Também verifica o stride (BatchSTDPSchedule): sem limites de peso, os
+lotes de 250, 100, 50 e 30 ms sobre o mesmo trem de spikes somam o mesmo
+Δw e os mesmos pares que um único lote (cada par é contado uma vez, no
+lote do spike mais tardio).
+
+Para cada caso exige:
+  - n_ltp_pairs e n_ltd_pairs iguais
+  - |Δw_trace − Δw_pairwise| ≤ rtol · max|Δw_pairwise| em todas as sinapses
+  - 'trace' com 2, 3 e 8 threads (STDP_THREADS) idêntico bit a bit ao
+    sequencial
+(os pesos não são limitados a [W_MIN, W_MAX] na comparação).
+
+Uso:
+  python check_batch_stdp.py --cases 300
+  python check_batch_stdp.py --dir ./results/DEPRESSION_STDP_BATCH_... --threads 8
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from brian2 import ms
+
+from SimulationConfig import RunConfig
+from batch_stdp import BatchSTDPSchedule, apply_batch_stdp
+
+
+def _run_kernel(kernel, syn_i, syn_j, w0, spike_i, spike_t, t_start, t_end, cfg, threads=1):
+    S = SimpleNamespace(i=syn_i, j=syn_j, w=w0.copy())
+    t0 = time.perf_counter()
+    stats = apply_batch_stdp(S, spike_i, spike_t, t_start, t_end,
+                             cfg.replace(STDP_KERNEL=kernel, STDP_THREADS=threads))
+    return np.asarray(S.w) - w0, stats, time.perf_counter() - t0
+
+
+def compare_batch(syn_i, syn_j, spike_i, spike_t, t_start, t_end, cfg, rtol,
+                  threads=1, threads_list=()):
+    """
+    Roda os dois kernels num batch ('trace' com threads threads e, para
+    comparação bit a bit, com cada valor de threads_list). Retorna (ok,
+    erro relativo, pares, tempos).
+    """
+    w0 = np.ones(len(syn_i))
+    dw_ref, st_ref, t_ref = _run_kernel('pairwise', syn_i, syn_j, w0,
+                                        spike_i, spike_t, t_start, t_end, cfg)
+    dw_new, st_new, t_new = _run_kernel('trace', syn_i, syn_j, w0,
+                                        spike_i, spike_t, t_start, t_end, cfg, threads)
+    scale = max(float(np.max(np.abs(dw_ref))), 1e-300)
+    err = float(np.max(np.abs(dw_new - dw_ref))) / scale if len(dw_ref) else 0.0
+    ok = (st_ref['n_ltp_pairs'] == st_new['n_ltp_pairs']
+          and st_ref['n_ltd_pairs'] == st_new['n_ltd_pairs']
+          and err <= rtol)
+    # Com threads, o 'trace' deve ser idêntico bit a bit ao sequencial
+    for threads in threads_list:
+        dw_thr, st_thr, _ = _run_kernel('trace', syn_i, syn_j, w0,
+                                        spike_i, spike_t, t_start, t_end, cfg, threads)
+        ok = ok and np.array_equal(dw_thr, dw_new) and st_thr == st_new
+    return ok, err, (st_ref['n_ltp_pairs'], st_ref['n_ltd_pairs']), (t_ref, t_new)
+
+
+def random_case(rng, base_cfg):
+    """Rede, spikes e janela de um caso aleatório."""
+    n = int(rng.integers(2, 40))
+    if rng.random() < 0.5:
+        pre, post = np.nonzero(~np.eye(n, dtype=bool))
+    else:
+        mask = rng.random((n, n)) < rng.uniform(0.05, 0.6)
+        mask[0, 1] = True
+        np.fill_diagonal(mask, False)
+        pre, post = np.nonzero(mask)
+
+    tau_pre = float(rng.choice([5.0, 10.0, 20.0]))
+    tau_post = tau_pre if rng.random() < 0.5 else float(rng.choice([5.0, 15.0, 20.0]))
+    cfg = base_cfg.replace(tau_pre=tau_pre * ms, tau_post=tau_post * ms,
+                           W_MIN=-np.inf, W_MAX=np.inf, eta=1.0)
+    max_dt = 5.0 * max(tau_pre, tau_post)
+
+    interval = float(rng.choice([50.0, 200.0, 500.0]))
+    t_start = 0.0 if rng.random() < 0.25 else interval * int(rng.integers(1, 6))
+    t_end = t_start + interval
+
+    # Rajadas (episódios) sobre fundo esparso, em passos de 0.1 ms
+    lo_step = int(round((t_start - 1.5 * max_dt) / 0.1))
+    hi_step = int(round((t_end + 0.5 * max_dt) / 0.1))
+    spikes = []
+    for k in range(n):
+        rate = rng.uniform(0.0, 0.02) if rng.random() < 0.3 else rng.uniform(0.0, 0.003)
+        steps = np.flatnonzero(rng.random(hi_step - lo_step) < rate) + lo_step
+        # pares a exatamente max_dt de distância
+        if len(steps) and rng.random() < 0.5:
+            steps = np.union1d(steps, steps[:3] + int(round(max_dt / 0.1)))
+        spikes.append((np.full(len(steps), k), steps))
+    spike_i = np.concatenate([s[0] for s in spikes]).astype(np.int32)
+    steps = np.concatenate([s[1] for s in spikes])
+    spike_t = (steps * 1e-4) / 1e-3          # como spk.t / ms
+    if t_start == 0.0:
+        keep = spike_t >= 0.0
+        spike_i, spike_t = spike_i[keep], spike_t[keep]
+    order = np.argsort(spike_t, kind='stable')
+    return pre, post, spike_i[order], spike_t[order], t_start, t_end, cfg
+
+
+def check_random(n_cases, seed, rtol, threads_list=(2, 3, 8)):
+    rng = np.random.default_rng(seed)
+    base = RunConfig()
+    n_fail, worst = 0, 0.0
+    for c in range(n_cases):
+        pre, post, si, st, t0, t1, cfg = random_case(rng, base)
+        ok, err, pairs, _ = compare_batch(pre, post, si, st, t0, t1, cfg, rtol,
+                                          threads_list=threads_list)
+        worst = max(worst, err)
+        if not ok:
+            n_fail += 1
+            print(f"[ERRO] caso {c}: erro relativo {err:.2e}, pares (LTP, LTD) ref = {pairs}")
+    print(f"[INFO] {n_cases} casos aleatórios | falhas = {n_fail} | "
+          f"maior erro relativo = {worst:.2e}")
+    return n_fail == 0
+
+
+def check_strides(n_cases, seed, rtol, strides=(250.0, 100.0, 50.0, 30.0)):
+    """Lotes de vários strides vs. um único lote de [0, 500 ms)."""
+    rng = np.random.default_rng(seed)
+    base = RunConfig()
+    n_fail, worst = 0, 0.0
+    for c in range(n_cases):
+        pre, post, si, st, _, _, cfg = random_case(rng, base)
+        keep = (st >= 0.0) & (st < 500.0)
+        si, st = si[keep], st[keep]
+        w0 = np.ones(len(pre))
+
+        S = SimpleNamespace(i=pre, j=post, w=w0.copy())
+        ref = apply_batch_stdp(S, si, st, 0.0, 500.0, cfg)
+        dw_ref = np.asarray(S.w) - w0
+        scale = max(float(np.max(np.abs(dw_ref))), 1e-300)
+
+        for stride in strides:
+            S = SimpleNamespace(i=pre, j=post, w=w0.copy())
+            schedule = BatchSTDPSchedule(S, lambda t_start: (si, st),
+                                         cfg.replace(STDP_BATCH_INTERVAL_MS=stride))
+            schedule.advance_to(np.ceil(500.0 / stride) * stride)
+            err = float(np.max(np.abs(np.asarray(S.w) - w0 - dw_ref))) / scale
+            n_ltp = sum(b['n_ltp_pairs'] for b in schedule.log)
+            n_ltd = sum(b['n_ltd_pairs'] for b in schedule.log)
+            worst = max(worst, err)
+            if err > rtol or (n_ltp, n_ltd) != (ref['n_ltp_pairs'], ref['n_ltd_pairs']):
+                n_fail += 1
+                print(f"[ERRO] caso {c}, stride {stride} ms: erro relativo {err:.2e}, "
+                      f"pares {(n_ltp, n_ltd)} vs {(ref['n_ltp_pairs'], ref['n_ltd_pairs'])}")
+    print(f"[INFO] {n_cases} casos × strides {list(strides)} | falhas = {n_fail} | "
+          f"maior erro relativo = {worst:.2e}")
+    return n_fail == 0
+
+
+def check_run(results_dir, rtol, threads=1):
+    """Batches de 500 ms de uma execução gravada (rede all-to-all de params.txt)."""
+    from connectivity import connection_pairs
+
+    cfg = RunConfig().replace(W_MIN=-np.inf, W_MAX=np.inf)
+    spike_i = np.load(os.path.join(results_dir, "spike_i.npy"))
+    spike_t = np.load(os.path.join(results_dir, "spike_t.npy"))
+    pre, post = connection_pairs(cfg)
+
+    interval = float(cfg.STDP_BATCH_INTERVAL_MS)
+    n_fail, worst, t_ref, t_new = 0, 0.0, 0.0, 0.0
+    n_batches = int(np.ceil(spike_t[-1] / interval)) if len(spike_t) else 0
+    for b in range(n_batches):
+        t0, t1 = b * interval, (b + 1) * interval
+        ok, err, pairs, (tr, tn) = compare_batch(pre, post, spike_i, spike_t, t0, t1, cfg, rtol, threads)
+        worst, t_ref, t_new = max(worst, err), t_ref + tr, t_new + tn
+        if not ok:
+            n_fail += 1
+            print(f"[ERRO] batch {t0:.0f}–{t1:.0f} ms: erro relativo {err:.2e}, pares = {pairs}")
+    print(f"[INFO] {n_batches} batches de {results_dir} | falhas = {n_fail} | "
+          f"maior erro relativo = {worst:.2e}")
+    print(f"[INFO] Tempo: pairwise {t_ref:.2f} s | trace ({threads} thread(s)) {t_new:.2f} s "
+          f"({t_ref / max(t_new, 1e-9):.0f}×)")
+    return n_fail == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Igualdade entre os kernels 'trace' e 'pairwise' do batch STDP.")
+    parser.add_argument("--cases", type=int, default=200, help="Casos aleatórios.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rtol", type=float, default=1e-9,
+                        help="Erro máximo relativo ao maior |Δw| do batch.")
+    parser.add_argument("--dir", default=None,
+                        help="Pasta de resultados: compara os batches dessa execução.")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="STDP_THREADS do 'trace' nos batches de --dir (tempo medido).")
+    args = parser.parse_args()
+
+    ok = check_random(args.cases, args.seed, args.rtol)
+    ok = check_strides(max(args.cases // 4, 1), args.seed, args.rtol) and ok
+    if args.dir:
+        ok = check_run(args.dir, args.rtol, args.threads) and ok
+
+    print("[OK] Kernels e strides equivalentes." if ok else "[ERRO] Kernels ou strides divergem.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+check_dense_engine.py
+=====================
+Verificação de equivalência estatística entre o motor NumPy denso
+(EXECUTION_MODE = 'dense', dense_engine.py) e o caminho Brian2 (runtime).
+
+Para cada seed, roda LIF_EMILLY.main() com os dois motores e compara:
+  - número de episódios (tlepis.txt → N_EPISODES)
+  - T_LEPIS (tlepis.txt → T_LEPIS_S)
+  - taxa média de disparo por neurônio (spike_t.npy)
+e informa também até que instante os trens de spikes coincidem
+exatamente (a dinâmica é caótica: diferenças de arredondamento acabam
+separando as trajetórias).
+
+Critério por métrica, sobre as médias entre seeds:
+  |média_dense − média_brian2| ≤ max(atol, rtol·|média_brian2|, 2·EP)
+onde EP é o erro padrão combinado das duas amostras.
+
+Uso:
+  python check_dense_engine.py --sim-time 60 --seeds 1 2 3
+  python check_dense_engine.py --sim-time 30 --set FEEDBACK_MODE=adaptation
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from run_catalog import read_kv
+
+# Tolerância absoluta por métrica (usada quando os valores são pequenos)
+METRIC_ATOL = {'n_episodes': 1.0, 't_lepis_s': 1.0, 'rate_hz': 0.1}
+
+
+def run_metrics(results_dir, cfg):
+    """Métricas de uma pasta de resultados."""
+    tlepis = read_kv(os.path.join(results_dir, "tlepis.txt"))
+    spike_i = np.load(os.path.join(results_dir, "spike_i.npy"))
+    spike_t = np.load(os.path.join(results_dir, "spike_t.npy"))
+    sim_s = float(cfg.SIM_TIME)
+    return {
+        'n_episodes': float(tlepis['N_EPISODES']),
+        't_lepis_s':  float(tlepis['T_LEPIS_S']),
+        'rate_hz':    len(spike_t) / cfg.N / sim_s,
+        '_spikes':    (spike_i, spike_t),
+    }
+
+
+def identical_until_ms(spikes_a, spikes_b):
+    """Instante do primeiro spike diferente (ou do último spike, se iguais)."""
+    (ia, ta), (ib, tb) = spikes_a, spikes_b
+    n = min(len(ta), len(tb))
+    diff = np.flatnonzero((ia[:n] != ib[:n]) | (ta[:n] != tb[:n]))
+    if len(diff):
+        return float(min(ta[diff[0]], tb[diff[0]]))
+    if len(ta) != len(tb):
+        return float(ta[n - 1]) if n else 0.0
+    return float('inf')
+
+
+def compare(brian, dense, rtol, atol=None):
+    """
+    Retorna lista de (métrica, média_b, média_d, tolerância, ok), com
+    tolerância max(atol, rtol·|média_b|, 2·EP) (EP = erro padrão
+    combinado). atol: {métrica: tolerância absoluta} (padrão: METRIC_ATOL).
+    Usado também pelo bench_dt.py.
+    """
+    rows = []
+    for key, atol in (METRIC_ATOL if atol is None else atol).items():
+        b = np.array([m[key] for m in brian])
+        d = np.array([m[key] for m in dense])
+        se = np.sqrt(b.var(ddof=1) / len(b) + d.var(ddof=1) / len(d)) if len(b) > 1 else 0.0
+        tol = max(atol, rtol * abs(b.mean()), 2.0 * se)
+        rows.append((key, b.mean(), d.mean(), tol, bool(abs(d.mean() - b.mean()) <= tol)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Equivalência estatística: motor denso vs. Brian2."
+    )
+    parser.add_argument("--sim-time", type=float, default=30.0,
+                        help="SIM_TIME de cada execução, em segundos (padrão: 30).")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[99],
+                        help="Valores de RANDOM_SEED (padrão: 99).")
+    parser.add_argument("--set", action="append", metavar="PARAM=valor",
+                        help="Sobrescrita de parâmetro comum às execuções (pode repetir).")
+    parser.add_argument("--rtol", type=float, default=0.10,
+                        help="Tolerância relativa das médias (padrão: 0.10).")
+    args = parser.parse_args()
+
+    from brian2 import second
+    from SimulationConfig import RunConfig
+    from sweep import parse_value
+    from LIF_EMILLY import main as lif_main
+
+    overrides = {}
+    for item in args.set or []:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = parse_value(value)
+
+    base = RunConfig(**overrides).replace(SIM_TIME=args.sim_time * second)
+
+    brian, dense = [], []
+    for seed in args.seeds:
+        cfg = base.replace(RANDOM_SEED=seed)
+        dir_b = lif_main(cfg.replace(EXECUTION_MODE='runtime'), run_tag=f"CHK_BRIAN2_S{seed}")
+        dir_d = lif_main(cfg.replace(EXECUTION_MODE='dense'), run_tag=f"CHK_DENSE_S{seed}")
+        brian.append(run_metrics(dir_b, cfg))
+        dense.append(run_metrics(dir_d, cfg))
+
+    print("\n" + "=" * 66)
+    print("  EQUIVALÊNCIA: motor denso (NumPy) vs. Brian2 (runtime)")
+    print("=" * 66)
+    print(f"  SIM_TIME = {args.sim_time:g} s | seeds = {args.seeds} | rtol = {args.rtol}")
+    print("-" * 66)
+    for seed, mb, md in zip(args.seeds, brian, dense):
+        t_eq = identical_until_ms(mb['_spikes'], md['_spikes'])
+        t_eq_txt = "todos" if np.isinf(t_eq) else f"{t_eq / 1e3:.3f} s"
+        print(f"  seed {seed:>4}: episódios {mb['n_episodes']:.0f} / {md['n_episodes']:.0f} | "
+              f"T_LEPIS {mb['t_lepis_s']:.2f} / {md['t_lepis_s']:.2f} s | "
+              f"taxa {mb['rate_hz']:.3f} / {md['rate_hz']:.3f} Hz | "
+              f"spikes idênticos até {t_eq_txt}")
+    print("-" * 66)
+
+    all_ok = True
+    for key, mb, md, tol, ok in compare(brian, dense, args.rtol):
+        all_ok &= ok
+        tag = "[OK]  " if ok else "[ERRO]"
+        print(f"  {tag} {key:<11} Brian2 = {mb:10.4f} | dense = {md:10.4f} | "
+              f"|Δ| = {abs(md - mb):.4f} (tol {tol:.4f})")
+    print("=" * 66)
+
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# checkpoint.py — checkpoints periódicos e retomada de simulações longas
+#
+# Sem checkpoint, uma execução de 480 s interrompida em 400 s (falta de
+# memória, preempção do nó) perde tudo: spikes, taxa e variável lenta só
+# são gravados no fim de LIF_EMILLY.main().
+#
+# Nas fronteiras de 500 ms (modo runtime), RunCheckpoint grava em
+# <results_dir>/checkpoint/:
+#
+#   state.pkl          estado interno de todos os objetos da rede (variáveis,
+#                      fila de spikes com atraso, relógios, gerador
+#                      aleatório), exceto os dados já gravados pelos
+#                      monitores; mais weight_log, o índice do próximo
+#                      bloco e o RunConfig da execução.
+#   <mon>.<var>.bin    dados dos monitores (spikes, taxa, variável lenta,
+#                      pesos amostrados), só acrescentados: cada checkpoint
+#                      escreve apenas as amostras novas desde o anterior.
+#                      Com STREAM_OUTPUTS, spikes e taxa já estão nos .npy
+#                      da pasta de resultados (stream_writer.py) e o
+#                      state.pkl guarda só o tamanho de cada arquivo.
+#
+# state.pkl é substituído de forma atômica e guarda o tamanho válido de
+# cada .bin; se a execução morrer entre as duas escritas, a retomada
+# descarta o excesso. Restaurar esse estado e continuar o loop produz
+# exatamente os mesmos arquivos de uma execução sem interrupção.
+#
+# Uso:  python LIF_EMILLY.py --resume results/<RUN_NAME>
+
+import os
+import pickle
+
+import numpy as np
+from brian2 import get_device
+from brian2.core.network import _get_all_objects
+from brian2.core.variables import ArrayVariable, DynamicArrayVariable
+
+CHECKPOINT_SUBDIR = "checkpoint"
+_STATE_FILE = "state.pkl"
+
+
+def checkpoint_dir(results_dir):
+    return os.path.join(results_dir, CHECKPOINT_SUBDIR)
+
+
+def has_checkpoint(results_dir):
+    return os.path.exists(os.path.join(checkpoint_dir(results_dir), _STATE_FILE))
+
+
+def load_checkpoint_meta(results_dir):
+    """
+    Lê o state.pkl de uma execução interrompida. Retorna o dict salvo
+    (inclui 'cfg', 'next_step' e 'weight_log').
+    """
+    path = os.path.join(checkpoint_dir(results_dir), _STATE_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Nenhum checkpoint em: {checkpoint_dir(results_dir)}")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _own_array_variables(obj):
+    """Mesmo filtro de Group._full_state: só as variáveis-array do próprio objeto."""
+    for name, var in obj.variables.items():
+        if not isinstance(var, ArrayVariable):
+            continue
+        if var.owner is None or var.owner.name != obj.name:
+            continue
+        yield name, var
+
+
+class RunCheckpoint:
+    """
+    Grava e restaura checkpoints de uma Network do Brian2 (modo runtime).
+
+    net : Network
+    monitors : lista de monitores cujos dados crescem durante a execução
+               (SpikeMonitor, PopulationRateMonitor, StateMonitor).
+    """
+
+    def __init__(self, results_dir, net, monitors):
+        self.dir = checkpoint_dir(results_dir)
+        self.net = net
+        self.monitors = {m.name: m for m in monitors if m is not None}
+        # (monitor, variável) → tamanho (nº de linhas) já gravado no .bin
+        self.rows = {}
+
+    def _bin_path(self, mon_name, var_name):
+        return os.path.join(self.dir, f"{mon_name}.{var_name}.bin")
+
+    # ------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------
+    def save(self, cfg, next_step, weight_log, stream_state=None):
+        """
+        Grava o checkpoint do estado atual (chamado ao fim de um bloco).
+        stream_state: RunStream.state(), se spikes e taxa são gravados em
+        streaming (esses monitores então não entram em monitors).
+        """
+        os.makedirs(self.dir, exist_ok=True)
+
+        objects = {}
+        monitor_layout = {}
+        for obj in _get_all_objects(self.net.objects):
+            if not hasattr(obj, "_full_state"):
+                continue
+            if obj.name not in self.monitors:
+                objects[obj.name] = obj._full_state()
+                continue
+
+            fixed = {}
+            layout = {}
+            for name, var in _own_array_variables(obj):
+                if isinstance(var, DynamicArrayVariable):
+                    values = var.get_value()
+                    n_old = self.rows.get((obj.name, name), 0)
+                    with open(self._bin_path(obj.name, name), "ab") as f:
+                        np.ascontiguousarray(values[n_old:]).tofile(f)
+                    self.rows[(obj.name, name)] = values.shape[0]
+                    layout[name] = (values.shape, values.dtype.str, var.size)
+                else:
+                    fixed[name] = (var.get_value().copy(), var.size)
+            objects[obj.name] = fixed
+            monitor_layout[obj.name] = layout
+
+        clocks = {obj.clock for obj in _get_all_objects(self.net.objects)}
+        state = {
+            'cfg':              cfg,
+            'next_step':        next_step,
+            'weight_log':       list(weight_log),
+            'stream':           stream_state,
+            't_':               self.net.t_,
+            'objects':          objects,
+            'clocks':           {c.name: c._full_state() for c in clocks},
+            'monitor_layout':   monitor_layout,
+            'random_state':     get_device().get_random_state(),
+        }
+
+        path = os.path.join(self.dir, _STATE_FILE)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    # ------------------------------------------------------------
+    # Retomada
+    # ------------------------------------------------------------
+    def restore(self, meta):
+        """
+        Restaura na rede (já montada com os mesmos objetos e nomes) o estado
+        lido por load_checkpoint_meta(). Descarta dados de monitor gravados
+        depois do último state.pkl válido.
+        """
+        state = dict(meta['objects'])
+
+        for mon_name, layout in meta['monitor_layout'].items():
+            mon_state = dict(state[mon_name])
+            for var_name, (shape, dtype, size) in layout.items():
+                path = self._bin_path(mon_name, var_name)
+                n_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                with open(path, "r+b") as f:
+                    f.truncate(n_bytes)
+                values = np.fromfile(path, dtype=dtype).reshape(shape)
+                mon_state[var_name] = (values, size)
+                self.rows[(mon_name, var_name)] = shape[0]
+            state[mon_name] = mon_state
+
+        state.update(meta['clocks'])
+        state['0_t'] = meta['t_']
+        state['_random_generator_state'] = meta['random_state']
+
+        self.net._stored_state['checkpoint'] = state
+        self.net.restore('checkpoint', restore_random_state=True)
+        del self.net._stored_state['checkpoint']
+
+    def discard(self):
+        """Remove os arquivos de checkpoint (execução concluída)."""
+        import shutil
+        shutil.rmtree(self.dir, ignore_errors=True)
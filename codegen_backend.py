@@ -0,0 +1,113 @@
+# codegen_backend.py — escolha do alvo de geração de código do Brian2
+#
+# O alvo 'numpy' não compila nada, mas é o mais lento para a rede
+# all-to-all (100 neurônios, 9.900 sinapses, dt = 0.1 ms). O alvo 'cython'
+# compila cada objeto de código uma vez e guarda a extensão no cache do
+# Brian2; execuções seguintes (e os workers do sweep.py) reaproveitam o
+# cache e só pagam o custo de carregar o módulo.
+#
+# As constantes de SimulationParameters entram no código como namespace
+# em tempo de execução, não como literais; por isso configurações que
+# diferem só em valores (A_LTP, seed, ...) compartilham o mesmo código
+# compilado. O que muda o código é a estrutura da rede: FEEDBACK_MODE,
+# STDP_ENABLED/STDP_MODE, AUTAPSES, EXECUTION_MODE, INTEGRATION_METHOD e
+# os monitores opcionais da variável lenta (ver structural_key()).
+#
+# No modo standalone (EXECUTION_MODE = 'standalone') estas preferências
+# não se aplicam; ver standalone_backend.py.
+
+import os
+import time
+
+from brian2 import prefs, Network, start_scope, ms
+
+
+def select_codegen_target(requested):
+    """
+    Retorna o alvo efetivo. 'cython' cai para 'numpy' se o Cython ou um
+    compilador C++ não estiverem disponíveis.
+    """
+    if requested == 'numpy':
+        return 'numpy'
+
+    if requested == 'cython':
+        try:
+            from brian2.codegen.runtime.cython_rt import CythonCodeObject
+            available = CythonCodeObject.is_available()
+        except Exception:
+            available = False
+
+        if available:
+            return 'cython'
+
+        print("[AVISO] Cython/compilador indisponível — usando CODEGEN_TARGET = 'numpy'.")
+        return 'numpy'
+
+    raise ValueError(f"CODEGEN_TARGET inválido: '{requested}'.")
+
+
+def configure_codegen(cfg):
+    """Aplica as preferências do Brian2 para cfg e retorna o alvo efetivo."""
+    target = select_codegen_target(cfg.CODEGEN_TARGET)
+    prefs.codegen.target = target
+
+    if target == 'cython' and cfg.CODEGEN_CACHE_DIR:
+        cache_dir = os.path.abspath(cfg.CODEGEN_CACHE_DIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        prefs.codegen.runtime.cython.cache_dir = cache_dir
+        # Vários workers podem compilar o mesmo módulo ao mesmo tempo
+        prefs.codegen.runtime.cython.multiprocess_safe = True
+
+    return target
+
+
+def structural_key(cfg):
+    """Campos que alteram o código gerado (e, portanto, o cache)."""
+    return (cfg.FEEDBACK_MODE, cfg.STDP_ENABLED, cfg.STDP_MODE,
+            cfg.EXECUTION_MODE, cfg.INTEGRATION_METHOD,
+            cfg.SLOW_RECORD_STD, cfg.SLOW_TRACE_NEURONS > 0)
+
+
+def compile_network(net):
+    """
+    Compila todos os objetos de código da rede sem avançar o tempo
+    (net.run de duração zero). Retorna o tempo gasto em segundos.
+    """
+    t0 = time.time()
+    net.run(0 * ms)
+    return time.time() - t0
+
+
+def warmup_codegen(cfg):
+    """
+    Monta a rede de cfg e compila seus objetos de código, populando o cache
+    do Brian2. Retorna (alvo efetivo, segundos gastos).
+
+    Usado pelo sweep.py uma vez por estrutura de rede antes de iniciar o
+    pool, para que os workers não compilem o mesmo código em paralelo.
+    """
+    from SimulationInitialization import make_neurons, make_synapses, make_monitors
+
+    if cfg.EXECUTION_MODE == 'standalone':
+        # O projeto C++ é compilado dentro de cada execução; não há cache
+        # de extensões a aquecer.
+        return 'cpp_standalone', 0.0
+    if cfg.EXECUTION_MODE == 'dense':
+        # O motor NumPy (dense_engine.py) não usa objetos do Brian2.
+        return 'numpy_dense', 0.0
+
+    target = configure_codegen(cfg)
+    if target != 'cython':
+        return target, 0.0
+
+    t0 = time.time()
+    start_scope()
+    G = make_neurons(cfg)
+    S = make_synapses(G, cfg)
+    spk, rate, wmon, slow_mon = make_monitors(G, S, cfg)
+    components = [G, S, spk, rate] + ([wmon] if wmon is not None else [])
+    if slow_mon is not None:
+        components += slow_mon.objects
+    compile_network(Network(*components))
+
+    return target, time.time() - t0
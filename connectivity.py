@@ -0,0 +1,96 @@
+# connectivity.py — pares (pré, pós) da rede, vetorizados e com cache em disco
+#
+# No modo runtime, make_synapses usava S.connect(condition='i != j',
+# p=P_CONNECT): o gerador do Brian2 avalia os N² pares candidatos, o que
+# com N = 10k são 10⁸ avaliações a cada execução e em cada worker do
+# sweep. Os modos standalone e dense já usavam connection_pairs(), que
+# sorteava uma matriz N×N de uniformes de uma vez (N² floats na memória).
+#
+# connection_pairs() agora é usado por todos os modos e pelo ensemble:
+#   - P_CONNECT = 1: todos os pares (i, j), i ≠ j sem AUTAPSES, na ordem
+#     do S.connect do Brian2 (i, depois j);
+#   - P_CONNECT < 1: o mesmo sorteio de antes (RandomState(RANDOM_SEED + 1),
+#     uniformes linha a linha), gerado em blocos de linhas: memória
+#     O(bloco·N) e os mesmos pares de antes para a mesma seed.
+#
+# Com P_CONNECT < 1 e RANDOM_SEED definida, os pares são gravados em
+# CONNECTIVITY_CACHE_DIR/conn_N<N>_p<P>_a<AUTAPSES>_s<seed>.npz; execuções
+# seguintes (e os outros workers do sweep) só leem o arquivo. A gravação
+# é atômica (arquivo temporário + os.replace). CONNECTIVITY_CACHE_DIR =
+# None desliga o cache.
+
+import os
+
+import numpy as np
+
+# Uniformes sorteados por bloco de linhas (~32 MB em float64)
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _all_pairs(n, autapses):
+    pre = np.repeat(np.arange(n, dtype=np.int64), n)
+    post = np.tile(np.arange(n, dtype=np.int64), n)
+    if not autapses:
+        keep = pre != post
+        pre, post = pre[keep], post[keep]
+    return pre, post
+
+
+def _sampled_pairs(n, p_connect, autapses, seed):
+    """Pares com probabilidade p_connect, na ordem (i, j), por blocos de linhas."""
+    rng = np.random.RandomState(seed)
+    rows = max(1, _BLOCK_ELEMENTS // max(n, 1))
+    pre_all, post_all = [], []
+    for r0 in range(0, n, rows):
+        r1 = min(n, r0 + rows)
+        # random_sample = uniform(0, 1), mesmos valores e menos operações
+        i, j = np.divmod(np.flatnonzero(rng.random_sample((r1 - r0, n)) < p_connect), n)
+        i += r0
+        if not autapses:
+            keep = i != j
+            i, j = i[keep], j[keep]
+        pre_all.append(i)
+        post_all.append(j)
+    if not pre_all:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(pre_all), np.concatenate(post_all)
+
+
+def cache_path(cfg, seed):
+    """Arquivo do cache para cfg (None se o cache não se aplica)."""
+    if cfg.CONNECTIVITY_CACHE_DIR is None or seed is None or cfg.P_CONNECT >= 1.0:
+        return None
+    name = f"conn_N{int(cfg.N)}_p{float(cfg.P_CONNECT)!r}_a{int(bool(cfg.AUTAPSES))}_s{int(seed)}.npz"
+    return os.path.join(cfg.CONNECTIVITY_CACHE_DIR, name)
+
+
+def connection_pairs(cfg):
+    """
+    Pares (pré, pós) de cfg (N, P_CONNECT, AUTAPSES, RANDOM_SEED), na
+    ordem do S.connect do Brian2 (i, depois j). Com P_CONNECT = 1 o
+    resultado é o mesmo de S.connect(condition='i != j').
+    """
+    seed = None if cfg.RANDOM_SEED is None else cfg.RANDOM_SEED + 1
+    if cfg.P_CONNECT >= 1.0:
+        return _all_pairs(int(cfg.N), cfg.AUTAPSES)
+
+    path = cache_path(cfg, seed)
+    if path is not None and os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                return data['pre'].astype(np.int64), data['post'].astype(np.int64)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[AVISO] Cache de conectividade ilegível ({e}); sorteando de novo.")
+
+    pre, post = _sampled_pairs(int(cfg.N), float(cfg.P_CONNECT), cfg.AUTAPSES, seed)
+
+    if path is not None:
+        dtype = np.int32 if cfg.N < 2**31 else np.int64
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(tmp_path, pre=pre.astype(dtype), post=post.astype(dtype))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[AVISO] Não foi possível gravar o cache de conectividade: {e}")
+    return pre, post
@@ -0,0 +1,492 @@
+# dense_engine.py — motor NumPy denso para a rede all-to-all
+#
+# Com N = 100 e P_CONNECT = 1.0 a rede inteira cabe numa matriz de pesos
+# 100×100. Em vez da propagação sinapse a sinapse do Brian2, a entrada
+# sináptica de cada passo é um único produto vetor-matriz, e o atraso
+# DELAY (1.5 ms = 15 passos) vira um buffer circular de vetores de spikes.
+#
+# Usado com EXECUTION_MODE = 'dense'. Os parâmetros são os mesmos de
+# make_neurons/make_synapses (RunConfig), e a ordem das operações em cada
+# passo segue o escalonamento do Brian2:
+#
+#   start      StateMonitor (variável lenta, pesos amostrados)
+#   groups     Euler ou Euler exponencial (INTEGRATION_METHOD): v (exceto
+#              em refratário), ge, s | ga
+#   thresholds v > V_th e fora do refratário
+#   synapses   entrega dos spikes de DELAY atrás: ge += gbar_syn·(W^T·(spk·s))
+#   resets     v = V_reset; s *= (1 − delta_dep) | ga += g_theta_inc
+#   end        PopulationRateMonitor
+#
+# O batch STDP reutiliza batch_stdp.BatchSTDPSchedule através de
+# DenseSynapses (mesma interface i, j, w das Synapses do Brian2): com
+# stride menor que o bloco de 500 ms, run() pára em cada fim de lote.
+# As saídas têm os mesmos nomes e formatos das do modo runtime.
+#
+# Diferenças em relação ao Brian2: a ordem das operações de ponto
+# flutuante não é a mesma do código gerado, então as trajetórias divergem
+# depois de algum tempo (a dinâmica é caótica); a equivalência é
+# estatística (ver check_dense_engine.py). Checkpoints e STDP
+# event-driven não são suportados.
+
+import json
+import os
+import time
+
+import numpy as np
+
+from SimulationInitialization import initial_weights
+from batch_stdp import SpikeWindow
+from connectivity import connection_pairs
+from iappInit import make_iapp
+from slow_variable import trace_indices, save_slow_variable
+from synapse_index import SynapseIndex
+from weight_store import open_weight_writer
+
+SNAPSHOT_INTERVAL_MS = 500.0
+
+# Avanço rápido das fases silenciosas (QUIESCENT_FASTFORWARD):
+# passos resolvidos por bloco de produtos acumulados (o primeiro bloco de
+# cada tentativa é curto, para que tentativas frustradas custem pouco) e
+# folga, em passos, deixada antes do primeiro cruzamento previsto de V_th.
+_FF_FIRST_BLOCK = 32
+_FF_BLOCK = 256
+_FF_MARGIN = 2
+
+
+class DenseSynapses:
+    """
+    Pesos em matriz densa W[pré, pós], com a interface de Synapses usada
+    por apply_batch_stdp e pelos snapshots (i, j, w, N).
+    """
+
+    def __init__(self, pre, post, weights, n_neurons):
+        self.i = np.asarray(pre, dtype=np.int32)
+        self.j = np.asarray(post, dtype=np.int32)
+        self.W = np.zeros((n_neurons, n_neurons))
+        self.W[self.i, self.j] = weights
+        self.syn_index = SynapseIndex(self.i, self.j, n_neurons)
+
+    @property
+    def N(self):
+        return len(self.i)
+
+    def __len__(self):
+        return len(self.i)
+
+    @property
+    def w(self):
+        return self.W[self.i, self.j]
+
+    @w.setter
+    def w(self, values):
+        self.W[self.i, self.j] = values
+
+
+class DenseNetwork:
+    """Estado e integração da rede LIF (depressão ou adaptação)."""
+
+    def __init__(self, cfg):
+        if cfg.STDP_ENABLED and cfg.STDP_MODE == 'event_driven':
+            raise ValueError("EXECUTION_MODE = 'dense' não suporta STDP_MODE = 'event_driven'.")
+
+        self.cfg = cfg
+        self.mode = cfg.FEEDBACK_MODE
+        n = self.n = cfg.N
+
+        # ---- Constantes em unidades SI (floats) ----
+        self.dt      = float(cfg.DT)
+        self.dt_ms   = self.dt * 1e3
+        self.Cm      = float(cfg.Cm)
+        self.gL      = float(cfg.gL)
+        self.EL      = float(cfg.EL)
+        self.V_th    = float(cfg.V_th)
+        self.V_reset = float(cfg.V_reset)
+        self.V_syn   = float(cfg.V_syn)
+        self.gbar    = float(cfg.gbar_syn)
+        # Euler: fator 1 − dt/τ; Euler exponencial: exp(−dt/τ) (exato)
+        self.exp_euler = (cfg.INTEGRATION_METHOD == 'exponential_euler')
+        self.decay_e = self._decay(float(cfg.tau_e))
+
+        # Mesmo arredondamento do Brian2 para refratário e atraso
+        self.ref_steps   = int((float(cfg.T_ref) + 1e-3 * self.dt) / self.dt)
+        self.delay_steps = int(np.round(float(cfg.DELAY) / self.dt))
+
+        # ---- Estado ----
+        self.v  = np.full(n, self.EL + (self.V_th - self.EL) * 0.2)
+        self.ge = np.zeros(n)
+        self.I  = np.asarray(make_iapp(cfg), dtype=float)
+        self.last_spike = np.full(n, -10**9, dtype=np.int64)
+
+        if self.mode == 'depression':
+            self.s = np.ones(n)
+            self.ds = 1.0 - self._decay(float(cfg.tau_s_rec))
+            self.keep_s = 1.0 - cfg.delta_dep
+        else:
+            self.ga = np.zeros(n)
+            self.V_theta = float(cfg.V_theta)
+            self.decay_a = self._decay(float(cfg.tau_a))
+            gmin, gmax = float(cfg.gbar_theta_min), float(cfg.gbar_theta_max)
+            self.g_theta_inc = gmin + np.random.rand(n) * (gmax - gmin)
+
+        pre, post = connection_pairs(cfg)
+        self.S = DenseSynapses(pre, post, initial_weights(len(pre), cfg), n)
+
+        # Buffer circular dos spikes ainda não entregues (DELAY)
+        self.buffer = np.zeros((max(self.delay_steps, 1), n), dtype=bool)
+
+        # ---- Registro (equivalente aos monitores) ----
+        self.step = 0
+        self.spike_i = []
+        self.spike_step = []
+        self.counts = []
+        self.slow_every = int(round(1e-3 / self.dt))           # 1 ms
+        self.slow_rec = []
+        self.slow_std_rec = [] if cfg.SLOW_RECORD_STD else None
+        self.trace_idx = trace_indices(cfg)
+        self.trace_every = int(round(float(cfg.SLOW_TRACE_DT) / self.dt))
+        self.trace_rec = []
+        self.w_every = int(round(float(cfg.W_MON_DT) / self.dt))
+        self.w_rec = []
+        nrec = min(cfg.N_W_SAMPLES, self.S.N)
+        self.w_idx = np.random.RandomState(123).choice(self.S.N, size=nrec, replace=False)
+
+        # ---- Avanço rápido das fases silenciosas ----
+        self.fastforward = bool(cfg.QUIESCENT_FASTFORWARD)
+        self.silent_steps = 10**9       # passos desde o último spike da população
+        self.ff_blocked_until = 0       # próximo passo em que vale tentar de novo
+        self.ff_steps = 0               # total de passos avançados analiticamente
+
+    def _decay(self, tau):
+        """Fator de decaimento por passo de dx/dt = −x/τ."""
+        return np.exp(-self.dt / tau) if self.exp_euler else 1.0 - self.dt / tau
+
+    # ------------------------------------------------------------
+    def run(self, n_steps):
+        """Integra n_steps passos de dt."""
+        cfg = self.cfg
+        depression = (self.mode == 'depression')
+        record_w = cfg.STDP_ENABLED
+
+        v, ge, I, last = self.v, self.ge, self.I, self.last_spike
+        W, buffer, D = self.S.W, self.buffer, self.delay_steps
+        EL, gL, V_syn, V_th, V_reset = self.EL, self.gL, self.V_syn, self.V_th, self.V_reset
+        dt_Cm, gbar, decay_e, ref_steps = self.dt / self.Cm, self.gbar, self.decay_e, self.ref_steps
+        exp_euler, dt, Cm = self.exp_euler, self.dt, self.Cm
+        if depression:
+            s, ds, keep_s = self.s, self.ds, self.keep_s
+        else:
+            ga, V_theta, decay_a, g_inc = self.ga, self.V_theta, self.decay_a, self.g_theta_inc
+
+        counts = np.zeros(n_steps, dtype=np.int64)
+        ff_wait = max(ref_steps, D)
+
+        k = 0
+        while k < n_steps:
+            n = self.step + k
+
+            # Fase silenciosa: ninguém em refratário e nenhum spike em trânsito
+            if self.fastforward and self.silent_steps >= ff_wait and n >= self.ff_blocked_until:
+                m = self._fast_forward(n, n_steps - k)
+                if m > 0:
+                    k += m
+                    self.silent_steps += m
+                    continue
+
+            # start: monitores de estado
+            if n % self.slow_every == 0:
+                slow = s if depression else ga
+                self.slow_rec.append(slow.mean())
+                if self.slow_std_rec is not None:
+                    self.slow_std_rec.append(slow.std())
+            if len(self.trace_idx) and n % self.trace_every == 0:
+                self.trace_rec.append((s if depression else ga)[self.trace_idx])
+            if record_w and n % self.w_every == 0:
+                self.w_rec.append(self.S.w[self.w_idx].mean())
+
+            # groups: Euler ou Euler exponencial (v congelado durante o refratário)
+            active = (n - last) >= ref_steps
+            if exp_euler:
+                # dv/dt = (b − g·v)/Cm com g, b fixos no passo:
+                # v ← v_inf + (v − v_inf)·exp(−g·dt/Cm)
+                g = gL + ge
+                b = I + gL * EL + ge * V_syn
+                if not depression:
+                    g = g + ga
+                    b = b + ga * V_theta
+                v_inf = b / g
+                dv = (v_inf - v) * -np.expm1(-g * dt / Cm)
+            elif depression:
+                dv = (I - gL * (v - EL) - ge * (v - V_syn)) * dt_Cm
+            else:
+                dv = (I - gL * (v - EL) - ge * (v - V_syn) - ga * (v - V_theta)) * dt_Cm
+            if depression:
+                s += (1.0 - s) * ds
+            else:
+                ga *= decay_a
+            ge *= decay_e
+            np.add(v, dv, out=v, where=active)
+
+            # thresholds
+            spiking = (v > V_th) & active
+
+            # synapses: spikes emitidos D passos atrás
+            if D > 0:
+                slot = n % D
+                arrived = buffer[slot]
+                if arrived.any():
+                    pre_act = (s * arrived) if depression else arrived.astype(float)
+                    ge += gbar * (pre_act @ W)
+                buffer[slot] = spiking
+            elif spiking.any():
+                pre_act = (s * spiking) if depression else spiking.astype(float)
+                ge += gbar * (pre_act @ W)
+
+            # resets
+            if spiking.any():
+                idx = np.flatnonzero(spiking)
+                last[idx] = n
+                v[idx] = V_reset
+                if depression:
+                    s[idx] *= keep_s
+                else:
+                    ga[idx] += g_inc[idx]
+                self.spike_i.append(idx)
+                self.spike_step.append(np.full(len(idx), n, dtype=np.int64))
+                counts[k] = len(idx)
+                self.silent_steps = 0
+            else:
+                self.silent_steps += 1
+            k += 1
+
+        self.counts.append(counts)
+        self.step += n_steps
+
+    def _fast_forward(self, n, max_steps):
+        """
+        Avança a rede a partir do passo n sem integrar passo a passo.
+
+        Só é chamado com a população em silêncio, sem neurônios em
+        refratário e sem spikes em trânsito. Nessa situação não há entrada
+        sináptica e cada passo é uma recorrência afim independente por
+        neurônio, v ← a_k·v + b_k, em que a_k e b_k dependem de ge e ga,
+        que decaem geometricamente (o mesmo vale para 1 − s). A recorrência
+        é resolvida em blocos de _FF_BLOCK passos com produtos acumulados:
+
+            v_k = P_k · (v_0 + Σ_{j≤k} b_j / P_j),   P_k = Π_{j≤k} a_j
+
+        O avanço para _FF_MARGIN passos antes do primeiro cruzamento
+        previsto de V_th (ou em max_steps); o cruzamento em si é integrado
+        normalmente. Os monitores recebem as amostras dos passos pulados.
+        Retorna o número de passos avançados.
+        """
+        depression = (self.mode == 'depression')
+        record_w = self.cfg.STDP_ENABLED
+        dt_Cm = self.dt / self.Cm
+
+        done = 0
+        block = _FF_FIRST_BLOCK
+        while done < max_steps:
+            L = min(block, max_steps - done)
+            block = _FF_BLOCK
+            kk = np.arange(L)[:, None]
+
+            ge_k = self.ge * self.decay_e ** kk                  # (L, n)
+            g = self.gL + ge_k
+            b = self.I + self.gL * self.EL + ge_k * self.V_syn
+            if not depression:
+                ga_k = self.ga * self.decay_a ** kk
+                g = g + ga_k
+                b = b + ga_k * self.V_theta
+            if self.exp_euler:
+                a = np.exp(-g * dt_Cm)
+                b = (b / g) * -np.expm1(-g * dt_Cm)
+            else:
+                a = 1.0 - g * dt_Cm
+                b = b * dt_Cm
+
+            P = np.cumprod(a, axis=0)
+            if not np.all(P[-1] > 1e-250):
+                # Sistema rígido demais para os produtos acumulados
+                self.ff_blocked_until = n + done + _FF_BLOCK
+                break
+            traj = P * (self.v + np.cumsum(b / P, axis=0))    # v após 1..L passos
+
+            crossing = np.flatnonzero((traj > self.V_th).any(axis=1))
+            m = L if len(crossing) == 0 else max(int(crossing[0]) - _FF_MARGIN, 0)
+
+            if m > 0:
+                n0 = n + done
+                steps = n0 + np.arange(m)
+
+                # start: monitores de estado nos passos pulados
+                # (1 − s na depressão, ga na adaptação, decai pelo fator r por passo)
+                if depression:
+                    x0, r, offset, sign = 1.0 - self.s, 1.0 - self.ds, 1.0, -1.0
+                else:
+                    x0, r, offset, sign = self.ga, self.decay_a, 0.0, 1.0
+                rec = np.flatnonzero(steps % self.slow_every == 0)
+                self.slow_rec.extend(offset + sign * np.mean(x0) * r ** rec)
+                if self.slow_std_rec is not None:
+                    self.slow_std_rec.extend(np.std(x0) * r ** rec)
+                if len(self.trace_idx):
+                    rec = np.flatnonzero(steps % self.trace_every == 0)
+                    self.trace_rec.extend(offset + sign * np.outer(r ** rec, x0[self.trace_idx]))
+                if record_w:
+                    n_w = int(np.count_nonzero(steps % self.w_every == 0))
+                    if n_w:
+                        self.w_rec.extend([self.S.w[self.w_idx].mean()] * n_w)
+
+                self.v[:] = traj[m - 1]
+                self.ge *= self.decay_e ** m
+                if depression:
+                    self.s[:] = 1.0 - (1.0 - self.s) * (1.0 - self.ds) ** m
+                else:
+                    self.ga *= self.decay_a ** m
+                done += m
+
+            if m < L:
+                self.ff_blocked_until = n + done + _FF_MARGIN + 1
+                break
+
+        self.ff_steps += done
+        return done
+
+    # ------------------------------------------------------------
+    def spikes(self, first=0):
+        """
+        Retorna (spike_i, spike_t_ms) dos spikes registrados a partir da
+        posição first das listas internas (padrão: todos).
+        """
+        if len(self.spike_i) <= first:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        si = np.concatenate(self.spike_i[first:]).astype(np.int32)
+        # Mesmo arredondamento de SpikeMonitor.t / ms (t = passo·dt em s)
+        st = (np.concatenate(self.spike_step[first:]) * self.dt) / 1e-3
+        return si, st
+
+
+class _DenseSpikeWindow(SpikeWindow):
+    """SpikeWindow sobre as listas de spikes de uma DenseNetwork."""
+
+    def _read_new(self):
+        net = self.spk
+        n = len(net.spike_i)
+        if n <= self.cursor:
+            return self.i[:0], self.t_ms[:0]
+        new_i, new_t = net.spikes(self.cursor)
+        self.cursor = n
+        return new_i, new_t
+
+
+def run_dense(cfg, results_dir):
+    """
+    Simula cfg com o motor denso e salva em results_dir os mesmos arquivos
+    do modo runtime. Retorna (backend, t_build, t_compile, t_sim).
+    """
+    t_build_start = time.time()
+    net = DenseNetwork(cfg)
+    S = net.S
+    t_build = time.time() - t_build_start
+
+    print(f"[INFO] FEEDBACK_MODE = {cfg.FEEDBACK_MODE} | STDP = {cfg.STDP_ENABLED} "
+          f"({cfg.STDP_MODE if cfg.STDP_ENABLED else 'N/A'}) | "
+          f"sinapses = {S.N} | dt = {net.dt_ms} ms | motor = numpy_dense")
+
+    use_batch_stdp = cfg.STDP_ENABLED and (cfg.STDP_MODE == 'batch')
+    weight_log = []
+    if use_batch_stdp:
+        from batch_stdp import BatchSTDPSchedule, format_block_stats, stdp_time_constants_ms
+        print(f"[INFO] Batch STDP ativo. Intervalo = {cfg.STDP_BATCH_INTERVAL_MS} ms")
+        _, _, max_dt_ms = stdp_time_constants_ms(cfg.tau_pre, cfg.tau_post)
+        schedule = BatchSTDPSchedule(S, _DenseSpikeWindow(net, max_dt_ms).advance, cfg, weight_log)
+
+    chunk_steps = int(round(SNAPSHOT_INTERVAL_MS / net.dt_ms))
+    sim_ms = float(cfg.SIM_TIME) * 1e3
+    n_chunks = int(np.ceil(sim_ms / SNAPSHOT_INTERVAL_MS - 1e-9))
+
+    weight_store = None
+    if cfg.STDP_ENABLED:
+        weight_store = open_weight_writer(results_dir, S.N, n_chunks + 1, cfg)
+        weight_store.write(0, 0.0, S.w)
+        print("[INFO] Snapshot inicial dos pesos salvo.")
+
+    t_sim_start = time.time()
+    for c in range(n_chunks):
+        t_start_ms = c * SNAPSHOT_INTERVAL_MS
+        t_end_ms = t_start_ms + SNAPSHOT_INTERVAL_MS
+        print(f"[RUNNING] Simulando de {t_start_ms / 1e3} s até {t_end_ms / 1e3} s...")
+        if not use_batch_stdp:
+            net.run(chunk_steps)
+        else:
+            # Pára a integração em cada fim de lote dentro do bloco
+            ends = np.arange(schedule.next_batch + 1, int(t_end_ms / schedule.stride_ms + 1e-9) + 1)
+            for t_cut in list(ends * schedule.stride_ms) + [t_end_ms]:
+                n_steps = int(round(t_cut / net.dt_ms)) - net.step
+                if n_steps > 0:
+                    net.run(n_steps)
+                schedule.advance_to(t_cut)
+            print(format_block_stats(schedule.take_block()))
+
+        if weight_store is not None:
+            weight_store.write(c + 1, t_end_ms, S.w)
+
+    t_sim = time.time() - t_sim_start
+    if weight_store is not None:
+        weight_store.close()
+
+    if net.fastforward:
+        print(f"[INFO] Avanço rápido: {net.ff_steps} de {net.step} passos "
+              f"({100.0 * net.ff_steps / max(net.step, 1):.1f}%) em fases silenciosas.")
+
+    _save_outputs(net, cfg, results_dir, weight_log if use_batch_stdp else [])
+    return 'numpy_dense', t_build, 0.0, t_sim
+
+
+def _t_ms(n_samples, dt_s):
+    """Tempos de n_samples amostras a cada dt_s segundos, como monitor.t / ms."""
+    return (np.arange(n_samples) * dt_s) / 1e-3
+
+
+def _save_outputs(net, cfg, results_dir, weight_log):
+    """Mesmos arquivos (nomes, formatos e unidades) do modo runtime."""
+    si, st = net.spikes()
+    np.save(os.path.join(results_dir, "spike_i.npy"), si)
+    np.save(os.path.join(results_dir, "spike_t.npy"), st)
+
+    # PopulationRateMonitor + smooth_rate(window='flat', width=10 ms)
+    counts = np.concatenate(net.counts)
+    rate = counts / (net.n * net.dt)
+    width_dt = int(10.0 / 2 / net.dt_ms) * 2 + 1
+    rate_hz = np.convolve(rate, np.ones(width_dt) / width_dt, mode='same')
+    np.save(os.path.join(results_dir, "rate_t.npy"), _t_ms(len(counts), net.dt))
+    np.save(os.path.join(results_dir, "rate_hz.npy"), rate_hz)
+
+    slow = np.asarray(net.slow_rec, dtype=float)
+    if cfg.FEEDBACK_MODE == 'depression':
+        prefix, divisor = 's', 1.0
+    else:
+        np.save(os.path.join(results_dir, "gtheta_inc.npy"), net.g_theta_inc)
+        prefix, divisor = 'theta', float(cfg.gbar_theta)
+
+    traces = None
+    if len(net.trace_idx):
+        traces = np.asarray(net.trace_rec, dtype=float).T / divisor
+    save_slow_variable(
+        results_dir, prefix, _t_ms(len(slow), 1e-3), slow / divisor,
+        std=(np.asarray(net.slow_std_rec) / divisor if net.slow_std_rec is not None else None),
+        traces=traces, trace_idx=net.trace_idx,
+        trace_t_ms=(_t_ms(traces.shape[1], float(cfg.SLOW_TRACE_DT)) if traces is not None else None),
+    )
+
+    if cfg.STDP_ENABLED:
+        w_mean = np.asarray(net.w_rec, dtype=float)
+        np.save(os.path.join(results_dir, "w_t.npy"), _t_ms(len(w_mean), float(cfg.W_MON_DT)))
+        np.save(os.path.join(results_dir, "w_mean.npy"), w_mean)
+    else:
+        np.save(os.path.join(results_dir, "w_t.npy"), np.array([0.0]))
+        np.save(os.path.join(results_dir, "w_mean.npy"), np.array([float(cfg.W_INIT_FIXED)]))
+
+    if weight_log:
+        with open(os.path.join(results_dir, "stdp_weight_log.json"), "w") as f:
+            json.dump(weight_log, f, indent=2)
+        print(f"[INFO] Log STDP salvo ({len(weight_log)} entradas).")
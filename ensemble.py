@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+ensemble.py
+===========
+Modo ensemble: K réplicas independentes da rede simuladas numa única
+Network do Brian2.
+
+Com N = 100 o custo de cada passo do Brian2 é dominado pelo overhead fixo
+por passo (chamadas de objetos de código, monitores), não pela aritmética.
+Estudos de seed (RANDOM_SEED, heterogeneidade de g_theta_inc, permutações
+de I_ORDER) precisavam de um processo e de uma montagem de rede por
+réplica. Aqui as K réplicas viram:
+
+  - um NeuronGroup de K·N neurônios (bloco k = neurônios [k·N, (k+1)·N),
+    com as correntes de I_ORDER/I_SEED/I_* da réplica k);
+  - um Synapses bloco-diagonal (pares e pesos iniciais de cada réplica);
+  - um PopulationRateMonitor por réplica (subgrupo).
+
+O batch STDP é aplicado bloco a bloco, cada um com os parâmetros de STDP
+da sua réplica. No fim, spikes, taxa, variável lenta e pesos de cada
+réplica são separados em pastas de resultados próprias, com os mesmos
+arquivos de uma execução de LIF_EMILLY.main(); em seguida cada pasta
+passa pelo pós-processamento usual (relatório, T_LEPIS, figuras).
+
+Só podem variar entre réplicas os parâmetros que não alteram as equações
+nem o namespace compartilhado (ver _PER_REPLICA_FIELDS).
+
+Uso:
+  python ensemble.py --grid RANDOM_SEED=1,2,3,4,5,6,7,8
+  python ensemble.py --grid I_ORDER=RAND,ASC,DES --set "SIM_TIME=60*second"
+  python ensemble.py --spec ensemble.json --no-post
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from synapse_index import SynapseIndex
+
+_RESULTS_DIR = "./results"
+
+# Campos que podem diferir entre réplicas: só entram em valores iniciais
+# (correntes, pesos) ou no batch STDP, que roda em Python por lote.
+_PER_REPLICA_FIELDS = (
+    'RANDOM_SEED', 'I_ORDER', 'I_SEED',
+    'I_min_adapt', 'I_max_adapt',
+    'I_DIST_DEP', 'I_min_dep', 'I_max_dep', 'I_mean_dep', 'I_std_dep',
+    'W_INIT_FIXED', 'W_INIT_MIN', 'W_INIT_MAX', 'W_INIT_NORMALIZE_MEAN',
+)
+_PER_REPLICA_BATCH_STDP = ('A_LTP', 'A_LTD', 'eta', 'W_MIN', 'W_MAX', 'tau_pre', 'tau_post')
+
+
+def validate_replicas(cfgs):
+    """Garante que as réplicas podem compartilhar um único NeuronGroup/Synapses."""
+    from SimulationConfig import field_names
+
+    if not cfgs:
+        raise ValueError("Ensemble vazio.")
+
+    base = cfgs[0]
+    if base.EXECUTION_MODE != 'runtime':
+        raise ValueError("O modo ensemble exige EXECUTION_MODE = 'runtime'.")
+
+    free = set(_PER_REPLICA_FIELDS)
+    if base.STDP_ENABLED and base.STDP_MODE == 'batch':
+        free.update(_PER_REPLICA_BATCH_STDP)
+
+    for k, cfg in enumerate(cfgs[1:], start=1):
+        shared = [name for name in field_names()
+                  if name not in free and not _same(getattr(cfg, name), getattr(base, name))]
+        if shared:
+            raise ValueError(
+                f"Réplica {k} difere da réplica 0 em parâmetro(s) compartilhado(s): {shared}"
+            )
+
+
+def _same(a, b):
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+class _SynapseBlock:
+    """
+    Bloco [start, stop) das sinapses do ensemble, com índices locais da
+    réplica e a interface usada por apply_batch_stdp (i, j, w).
+    """
+
+    def __init__(self, S, start, stop, neuron_offset):
+        self.S = S
+        self.start, self.stop = start, stop
+        self.i = np.asarray(S.i[start:stop]) - neuron_offset
+        self.j = np.asarray(S.j[start:stop]) - neuron_offset
+        self.syn_index = SynapseIndex(self.i, self.j)
+
+    @property
+    def w(self):
+        return np.asarray(self.S.w[self.start:self.stop])
+
+    @w.setter
+    def w(self, values):
+        self.S.w[self.start:self.stop] = values
+
+
+def run_ensemble(cfgs, ensemble_id=None, post=True):
+    """
+    Simula as réplicas cfgs (lista de RunConfig) numa única rede.
+    Retorna a lista de pastas de resultados (uma por réplica, na ordem).
+    """
+    from brian2 import (
+        start_scope, Network, SpikeMonitor, PopulationRateMonitor,
+        StateMonitor, ms, second, Hz
+    )
+    from codegen_backend import configure_codegen, compile_network
+    from SimulationInitialization import make_neurons, make_synapses
+    from slow_variable import SlowVariableRecorder
+    from weight_store import open_weight_writer
+    from LIF_EMILLY import _prepare_results_dir, postprocess_results
+
+    validate_replicas(cfgs)
+    start_time = time.time()
+
+    base = cfgs[0]
+    K, N = len(cfgs), base.N
+    ensemble_id = ensemble_id or time.strftime("%Y%m%d_%H%M%S")
+
+    dirs = [_prepare_results_dir(cfg, run_tag=f"ENS{ensemble_id}_{k:03d}")
+            for k, cfg in enumerate(cfgs)]
+
+    codegen_target = configure_codegen(base)
+    start_scope()
+
+    # ---- Rede: K blocos de N neurônios ----
+    t_build_start = time.time()
+    G = make_neurons(base, replicas=cfgs)
+    S = make_synapses(G, base, replicas=cfgs)
+
+    # Sinapses ordenadas por pré-sináptico → cada réplica é um trecho contíguo
+    syn_pre = np.asarray(S.i)
+    bounds = np.searchsorted(syn_pre, np.arange(K + 1) * N)
+    blocks = [_SynapseBlock(S, bounds[k], bounds[k + 1], k * N) for k in range(K)]
+
+    spk = SpikeMonitor(G, name='spikemon')
+    rates = [PopulationRateMonitor(G[k * N:(k + 1) * N], name=f'ratemon_{k}')
+             for k in range(K)]
+
+    # Média da variável lenta acumulada por réplica (ver slow_variable.py)
+    slow_rec = SlowVariableRecorder(G, base, n_pops=K)
+
+    # Mesma amostra de sinapses de make_monitors, dentro de cada bloco
+    wmon, w_rows = None, []
+    if base.STDP_ENABLED:
+        w_idx, n_rows = [], 0
+        for k, blk in enumerate(blocks):
+            n_syn = blk.stop - blk.start
+            nrec = min(cfgs[k].N_W_SAMPLES, n_syn)
+            idx = np.random.RandomState(123).choice(n_syn, size=nrec, replace=False)
+            w_idx.append(idx + blk.start)
+            w_rows.append(np.arange(n_rows, n_rows + nrec))
+            n_rows += nrec
+        wmon = StateMonitor(S, 'w', record=np.concatenate(w_idx), dt=base.W_MON_DT, name='wmon')
+
+    components = [G, S, spk] + slow_rec.objects + rates + ([wmon] if wmon is not None else [])
+    net = Network(*components)
+    t_build = time.time() - t_build_start
+
+    # Mesmos blocos de 500 ms do modo runtime
+    SNAPSHOT_INTERVAL = 500 * ms
+
+    use_batch_stdp = base.STDP_ENABLED and (base.STDP_MODE == 'batch')
+    weight_logs = [[] for _ in range(K)]
+    if use_batch_stdp:
+        from batch_stdp import (BatchSTDPSchedule, SpikeWindow, stdp_network_operation,
+                                stdp_time_constants_ms)
+        max_dt = [stdp_time_constants_ms(c.tau_pre, c.tau_post)[2] for c in cfgs]
+        spike_window = SpikeWindow(spk, max(max_dt))
+
+        def replica_spikes(k):
+            def spikes(t_start_ms):
+                win_i, win_t = spike_window.advance(t_start_ms)
+                mask = (win_i // N == k) & (win_t >= t_start_ms - max_dt[k])
+                return win_i[mask] - k * N, win_t[mask]
+            return spikes
+
+        schedules = [BatchSTDPSchedule(blk, replica_spikes(k), cfgs[k], weight_logs[k])
+                     for k, blk in enumerate(blocks)]
+        if schedules[0].stride_ms < float(SNAPSHOT_INTERVAL / ms):
+            net.add(stdp_network_operation(schedules, schedules[0].stride_ms))
+
+    t_compile = compile_network(net)
+    print(f"[INFO] Ensemble {ensemble_id}: {K} réplicas × {N} neurônios | "
+          f"sinapses = {S.N} | codegen = {codegen_target} | "
+          f"montagem = {t_build:.2f} s | compilação = {t_compile:.2f} s")
+
+    # ---- Loop de simulação ----
+    simulation_steps = np.arange(0, base.SIM_TIME / second, SNAPSHOT_INTERVAL / second) * second
+
+    weight_stores = []
+    if base.STDP_ENABLED:
+        for k, blk in enumerate(blocks):
+            store = open_weight_writer(dirs[k], len(blk.w), len(simulation_steps) + 1, cfgs[k])
+            store.write(0, 0.0, blk.w)
+            weight_stores.append(store)
+
+    t_sim_start = time.time()
+    for step, t_start in enumerate(simulation_steps):
+        t_end = t_start + SNAPSHOT_INTERVAL
+        print(f"[RUNNING] Simulando de {t_start} até {t_end}...")
+        net.run(SNAPSHOT_INTERVAL, report='text')
+
+        t_end_ms   = float(t_end / ms)
+
+        if use_batch_stdp:
+            # Mesmo critério do modo runtime: só atualiza se a réplica disparou no lote
+            for schedule in schedules:
+                schedule.advance_to(t_end_ms)
+                schedule.take_block()
+
+            means = [f"{np.mean(blk.w):.3f}" for blk in blocks]
+            print(f"  [STDP] <w> por réplica: {' '.join(means)}")
+
+        for store, blk in zip(weight_stores, blocks):
+            store.write(step + 1, t_end_ms, blk.w)
+
+    t_sim = time.time() - t_sim_start
+    for store in weight_stores:
+        store.close()
+
+    # ---- Separar as saídas por réplica ----
+    all_i = np.asarray(spk.i)
+    all_t = np.asarray(spk.t / ms, dtype=float)
+    if wmon is not None:
+        w_all = np.asarray(wmon.w)                         # (n_registradas, n_amostras)
+        w_t_ms = np.asarray(wmon.t / ms, dtype=float)
+
+    duration = time.time() - start_time
+
+    for k, (cfg, results_dir) in enumerate(zip(cfgs, dirs)):
+        mask = (all_i // N == k)
+        np.save(os.path.join(results_dir, "spike_i.npy"), all_i[mask] - k * N)
+        np.save(os.path.join(results_dir, "spike_t.npy"), all_t[mask])
+        np.save(os.path.join(results_dir, "rate_t.npy"), np.asarray(rates[k].t / ms, dtype=float))
+        np.save(os.path.join(results_dir, "rate_hz.npy"),
+                np.asarray(rates[k].smooth_rate(window='flat', width=10 * ms) / Hz, dtype=float))
+
+        slow_rec.save(results_dir, k)
+        if cfg.FEEDBACK_MODE == 'adaptation':
+            np.save(os.path.join(results_dir, "gtheta_inc.npy"),
+                    np.array(G.g_theta_inc[k * N:(k + 1) * N]))
+
+        if wmon is not None and len(w_rows[k]) > 0:
+            np.save(os.path.join(results_dir, "w_t.npy"), w_t_ms)
+            np.save(os.path.join(results_dir, "w_mean.npy"), w_all[w_rows[k]].mean(axis=0))
+        else:
+            np.save(os.path.join(results_dir, "w_t.npy"), np.array([0.0]))
+            np.save(os.path.join(results_dir, "w_mean.npy"), np.array([float(cfg.W_INIT_FIXED)]))
+
+        if use_batch_stdp and weight_logs[k]:
+            with open(os.path.join(results_dir, "stdp_weight_log.json"), "w") as f:
+                json.dump(weight_logs[k], f, indent=2)
+
+        with open(os.path.join(results_dir, "run_log.txt"), "w", encoding="utf-8") as f:
+            f.write(f"CODEGEN_TARGET = {codegen_target}\n")
+            f.write(f"T_BUILD_S      = {t_build:.3f}\n")
+            f.write(f"T_COMPILE_S    = {t_compile:.3f}\n")
+            f.write(f"T_SIM_S        = {t_sim:.3f}\n")
+            f.write(f"T_TOTAL_S      = {duration:.3f}\n")
+            f.write(f"ENSEMBLE_ID    = {ensemble_id}\n")
+            f.write(f"ENSEMBLE_K     = {K}\n")
+            f.write(f"ENSEMBLE_INDEX = {k}\n")
+
+    print(f"\n[INFO] Ensemble de {K} réplicas: simulação {t_sim:.2f} s "
+          f"({t_sim / K:.2f} s por réplica), total {duration:.2f} s.")
+
+    if post:
+        for results_dir, cfg in zip(dirs, cfgs):
+            postprocess_results(results_dir, cfg)
+
+    return dirs
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main():
+    from sweep import build_configs, _parse_grid_args
+
+    parser = argparse.ArgumentParser(
+        description="Simula K réplicas independentes da rede LIF numa única rede Brian2."
+    )
+    parser.add_argument("--grid", action="append", metavar="PARAM=v1,v2,...",
+                        help="Eixo da grade de réplicas (pode repetir).")
+    parser.add_argument("--set", action="append", metavar="PARAM=valor",
+                        help="Sobrescrita comum a todas as réplicas (pode repetir).")
+    parser.add_argument("--spec", default=None,
+                        help="Arquivo JSON com 'base', 'grid' e/ou 'runs' (como no sweep.py).")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Apenas lista e valida as réplicas, sem simular.")
+    parser.add_argument("--no-post", action="store_true",
+                        help="Não gera relatório/figuras de cada réplica.")
+    args = parser.parse_args()
+
+    base, grid, runs = {}, {}, []
+    if args.spec:
+        with open(args.spec, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        base.update(spec.get("base", {}))
+        grid.update(spec.get("grid", {}))
+        runs.extend(spec.get("runs", []))
+
+    for item in args.set or []:
+        key, value = item.split("=", 1)
+        base[key.strip()] = value
+    grid.update(_parse_grid_args(args.grid))
+
+    from SimulationConfig import RunConfig
+    overrides = build_configs(base=base, grid=grid, runs=runs)
+    cfgs = [RunConfig(**o) for o in overrides]
+    validate_replicas(cfgs)
+
+    if args.dry_run:
+        for idx, o in enumerate(overrides):
+            print(f"#{idx:03d}  {o}")
+        print(f"[INFO] {len(cfgs)} réplica(s).")
+        return
+
+    ensemble_id = time.strftime("%Y%m%d_%H%M%S")
+    dirs = run_ensemble(cfgs, ensemble_id=ensemble_id, post=not args.no_post)
+
+    os.makedirs(_RESULTS_DIR, exist_ok=True)
+    manifest_path = os.path.join(_RESULTS_DIR, f"ensemble_{ensemble_id}.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            'ensemble_id': ensemble_id,
+            'replicas': [
+                {'index': k, 'overrides': {key: repr(v) for key, v in o.items()}, 'results_dir': d}
+                for k, (o, d) in enumerate(zip(overrides, dirs))
+            ],
+        }, f, indent=2)
+    print(f"[OK] Manifesto do ensemble salvo em: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+# episodes.py — detecção de episódios de atividade, vetorizada e com cache
+#
+# A mesma detecção (limiar entre os percentis 5 e 95 da taxa, duração
+# mínima, fusão de episódios próximos) estava copiada em
+# relatorio_metricas.py, plot_summary.py, plot_summary_tcc.py e
+# plot_tabak_analysis.py, cada cópia com laços em Python e percentis sobre
+# o rate_hz inteiro (4.8 milhões de amostras em 480 s) a cada chamada.
+#
+# detect_episodes() faz a detecção com operações de array e devolve uma
+# tabela estruturada (EPISODE_DTYPE), indexável como as listas de dicts de
+# antes: episodes[k]['onset_ms'], len(episodes), episodes[1:], ...
+#
+# load_episodes() guarda cada tabela em <pasta>/episodes.npz, com chave
+# derivada do hash de rate_hz e dos parâmetros da detecção: a segunda
+# chamada com os mesmos dados e parâmetros só lê o arquivo. Tabelas de um
+# rate_hz diferente (pasta regravada) são descartadas na próxima gravação.
+#
+# Parâmetros usados no projeto:
+#   REPORT_PARAMS  relatório de métricas e T_LEPIS
+#   PLOT_PARAMS    figuras (plot_summary, plot_summary_tcc, plot_tabak_analysis),
+#                  com threshold_frac escolhido na linha de comando
+#
+# OnlineEpisodeDetector refaz a detecção durante a simulação (modo
+# runtime), entre os blocos de net.run(), para acompanhar T_LEPIS e
+# aplicar a parada antecipada (EARLY_STOP).
+#
+# A detecção é feita sobre rate_hz em Hz. As figuras detectavam sobre a
+# atividade normalizada; o limiar por percentis é invariante a mudança de
+# escala, então os episódios são os mesmos.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_FILE = "episodes.npz"
+
+EPISODE_DTYPE = np.dtype([
+    ('onset_idx',   np.int64),
+    ('offset_idx',  np.int64),
+    ('onset_ms',    np.float64),
+    ('offset_ms',   np.float64),
+    ('duration_ms', np.float64),
+    ('peak_hz',     np.float64),
+])
+
+REPORT_PARAMS = {'threshold_frac': 0.35, 'min_episode_ms': 80, 'min_gap_ms': 300,
+                 'min_peak_frac': 0.25}
+PLOT_PARAMS = {'threshold_frac': 0.15, 'min_episode_ms': 10, 'min_gap_ms': 50,
+               'min_peak_frac': 0.0}
+
+
+def rate_dt_ms(rate_t):
+    """Passo temporal real do vetor rate_t (ms)."""
+    rate_t = np.asarray(rate_t, dtype=float)
+    if len(rate_t) > 1:
+        return float(np.median(np.diff(rate_t)))
+    return 1.0
+
+
+def detect_episodes(activity, dt_ms=1.0, threshold_frac=0.35, min_episode_ms=80,
+                    min_gap_ms=300, min_peak_frac=0.0):
+    """
+    Episódios de atividade populacional em activity (amostras a cada dt_ms).
+
+    - threshold_frac : limiar = p5 + threshold_frac·(p95 − p5)
+    - min_episode_ms : duração mínima de um episódio
+    - min_gap_ms     : episódios separados por menos que isso são fundidos
+    - min_peak_frac  : descarta episódios cujo pico é menor que essa
+                       fração do pico global (0 = sem filtro)
+
+    Retorna um array estruturado EPISODE_DTYPE, em ordem temporal.
+    """
+    a = np.asarray(activity, dtype=float)
+    if len(a) == 0:
+        return np.zeros(0, dtype=EPISODE_DTYPE)
+    thr, peak_min = episode_threshold(a, threshold_frac, min_peak_frac)
+    return _detect_fixed(a, thr, peak_min, dt_ms, min_episode_ms, min_gap_ms)
+
+
+def episode_threshold(activity, threshold_frac=0.35, min_peak_frac=0.0):
+    """
+    (limiar, pico mínimo) de detect_episodes para activity: o limiar entre
+    os percentis 5 e 95 e min_peak_frac · pico global (None sem filtro).
+    """
+    a = np.asarray(activity, dtype=float)
+    lo, hi = np.percentile(a, [5, 95])
+    thr = lo + threshold_frac * (hi - lo)
+    peak_min = min_peak_frac * float(np.max(a)) if min_peak_frac > 0 else None
+    return thr, peak_min
+
+
+def _detect_fixed(a, thr, peak_min, dt_ms, min_episode_ms, min_gap_ms, base_idx=0):
+    """
+    Episódios de a com limiar e pico mínimo dados. base_idx: índice de a[0]
+    na série completa (os índices e tempos da tabela são os da série).
+    """
+    n = len(a)
+    if n == 0:
+        return np.zeros(0, dtype=EPISODE_DTYPE)
+
+    above = a > thr
+    diff = np.diff(above.astype(np.int8))
+    onsets = np.flatnonzero(diff == 1) + 1
+    offsets = np.flatnonzero(diff == -1) + 1
+    if above[0]:
+        onsets = np.concatenate([[0], onsets])
+    if above[-1]:
+        offsets = np.concatenate([offsets, [n - 1]])
+
+    n_ep = min(len(onsets), len(offsets))
+    on, off = onsets[:n_ep], offsets[:n_ep]
+
+    # Pico de cada trecho a[on:off+1] (trechos disjuntos e em ordem)
+    if n_ep:
+        bounds = np.empty(2 * n_ep, dtype=np.int64)
+        bounds[0::2], bounds[1::2] = on, off + 1
+        peak = np.maximum.reduceat(np.append(a, -np.inf), bounds)[0::2]
+    else:
+        peak = np.zeros(0)
+
+    dur = (off - on) * dt_ms
+    keep = (off > on) & (dur >= min_episode_ms)
+    if peak_min is not None:
+        keep &= peak >= peak_min
+    on, off, dur, peak = on[keep], off[keep], dur[keep], peak[keep]
+
+    table = np.zeros(0, dtype=EPISODE_DTYPE)
+    if not len(on):
+        return table
+
+    on, off = on + base_idx, off + base_idx
+    onset_ms, offset_ms = on * dt_ms, off * dt_ms
+
+    # Fusão: um episódio começa novo grupo se dista ≥ min_gap_ms do anterior
+    new_group = np.concatenate([[True], (onset_ms[1:] - offset_ms[:-1]) >= min_gap_ms])
+    first = np.flatnonzero(new_group)
+    last = np.concatenate([first[1:] - 1, [len(on) - 1]])
+
+    table = np.zeros(len(first), dtype=EPISODE_DTYPE)
+    table['onset_idx'] = on[first]
+    table['offset_idx'] = off[last]
+    table['onset_ms'] = onset_ms[first]
+    table['offset_ms'] = offset_ms[last]
+    table['duration_ms'] = np.where(first == last, dur[first],
+                                    offset_ms[last] - onset_ms[first])
+    table['peak_hz'] = np.maximum.reduceat(peak, first)
+    return table
+
+
+# ------------------------------------------------------------
+# Cache por pasta de resultados
+# ------------------------------------------------------------
+
+def _rate_key(rate_hz):
+    return hashlib.sha1(np.ascontiguousarray(rate_hz, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+
+def _params_key(dt_ms, params):
+    text = json.dumps({'dt_ms': float(dt_ms), **{k: float(v) for k, v in params.items()}},
+                      sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def load_episodes(results_dir, rate_hz=None, dt_ms=None, **params):
+    """
+    Tabela de episódios de results_dir para os parâmetros dados (demais
+    valores: REPORT_PARAMS). rate_hz e dt_ms são lidos da pasta se não
+    forem passados. Usa <pasta>/episodes.npz quando a tabela já existe.
+    """
+    params = {**REPORT_PARAMS, **params}
+    if rate_hz is None:
+        rate_hz = np.load(os.path.join(results_dir, "rate_hz.npy"))
+    if dt_ms is None:
+        dt_ms = rate_dt_ms(np.load(os.path.join(results_dir, "rate_t.npy")))
+
+    rate_key = _rate_key(rate_hz)
+    name = f"r{rate_key}_p{_params_key(dt_ms, params)}"
+    path = os.path.join(results_dir, CACHE_FILE)
+
+    cached = {}
+    if os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                if name in data.files:
+                    return data[name]
+                # Mantém só as tabelas do rate_hz atual
+                cached = {k: data[k] for k in data.files if k.startswith(f"r{rate_key}_")}
+        except (OSError, ValueError) as e:
+            print(f"[AVISO] Cache de episódios ilegível ({e}); recalculando.")
+
+    table = detect_episodes(rate_hz, dt_ms=dt_ms, **params)
+    cached[name] = table
+
+    tmp_path = path + ".tmp.npz"
+    try:
+        np.savez(tmp_path, **cached)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[AVISO] Não foi possível gravar {CACHE_FILE}: {e}")
+    return table
+
+
+# ------------------------------------------------------------
+# Detecção durante a simulação
+# ------------------------------------------------------------
+
+class OnlineEpisodeDetector:
+    """
+    Episódios da execução em andamento. feed() recebe a taxa instantânea
+    (Hz, passo dt_ms) do PopulationRateMonitor na ordem em que é gerada,
+    aplica a mesma média móvel de rate_hz.npy (width amostras) e guarda a
+    taxa suavizada em bins de bin_ms.
+
+    update() é incremental. O limiar por percentis (e o pico mínimo)
+    depende da série inteira; ele é recalculado, com a detecção completa,
+    só quando a série cresceu refresh_growth vezes desde o último cálculo
+    (ou com update(exact=True)). Entre dois recálculos o limiar fica fixo e
+    só o fim da série é varrido de novo: a partir do último episódio que
+    ainda pode mudar (aberto ou a menos de min_gap_ms de um trecho acima
+    do limiar em andamento). Os episódios anteriores não mudam com o
+    limiar fixo. Custo total linear na duração da execução.
+
+    O T_LEPIS gravado em tlepis.txt continua vindo de rate_hz.npy no fim da
+    execução; o valor online tem resolução bin_ms e usa o limiar do último
+    recálculo.
+
+    cursor : amostras do monitor já lidas por feed_monitor() (zerar quando
+             o monitor é esvaziado pelo streaming).
+    """
+
+    def __init__(self, dt_ms, width, bin_ms=1.0, refresh_growth=1.25, **params):
+        self.params = {**REPORT_PARAMS, **params}
+        self.dt_ms = float(dt_ms)
+        self.refresh_growth = float(refresh_growth)
+        self._window = np.ones(width) * 1.0 / width
+        # mode='same' do np.convolve: (width − 1)/2 zeros antes da série
+        self._tail = np.zeros((width - 1) // 2)
+        self._bin = max(1, int(round(bin_ms / self.dt_ms)))
+        self.bin_ms = self._bin * self.dt_ms
+        self._pending = np.zeros(0)
+        self._bins = np.zeros(1024)
+        self._n_bins = 0
+        self.cursor = 0
+        self.episodes = np.zeros(0, dtype=EPISODE_DTYPE)
+
+        # Estado da detecção incremental
+        self._thr = None
+        self._peak_min = None
+        self._n_at_refresh = 0
+        self._sealed = np.zeros(0, dtype=EPISODE_DTYPE)
+        self._scan_from = 0
+
+    def feed(self, rate_raw):
+        """Acrescenta amostras da taxa instantânea (Hz)."""
+        buf = np.concatenate([self._tail, np.asarray(rate_raw, dtype=float)])
+        keep = len(self._window) - 1
+        if len(buf) <= keep:
+            self._tail = buf
+            return
+        smooth = np.convolve(buf, self._window, mode='valid')
+        self._tail = buf[len(buf) - keep:]
+
+        pending = np.concatenate([self._pending, smooth])
+        n_full = len(pending) // self._bin * self._bin
+        if n_full:
+            self._append_bins(pending[:n_full].reshape(-1, self._bin).mean(axis=1))
+        self._pending = pending[n_full:]
+
+    def _append_bins(self, values):
+        n = self._n_bins + len(values)
+        if n > len(self._bins):
+            grown = np.zeros(max(n, 2 * len(self._bins)))
+            grown[:self._n_bins] = self._bins[:self._n_bins]
+            self._bins = grown
+        self._bins[self._n_bins:n] = values
+        self._n_bins = n
+
+    def feed_monitor(self, rate_mon):
+        """Lê do PopulationRateMonitor as amostras novas desde o cursor."""
+        values = rate_mon.variables['rate'].get_value()[self.cursor:]
+        self.cursor += len(values)
+        self.feed(values)
+
+    @property
+    def trace(self):
+        """Taxa suavizada em bins de bin_ms (view, sem cópia)."""
+        return self._bins[:self._n_bins]
+
+    def update(self, exact=False):
+        """
+        Atualiza a tabela com os bins recebidos; retorna a tabela. exact=True
+        recalcula o limiar sobre a série inteira (mesma tabela que
+        detect_episodes sobre os bins).
+        """
+        trace = self.trace
+        n = len(trace)
+        if n == 0:
+            return self.episodes
+        p = self.params
+
+        if exact or self._thr is None or n >= self.refresh_growth * self._n_at_refresh:
+            self._thr, self._peak_min = episode_threshold(trace, p['threshold_frac'],
+                                                          p['min_peak_frac'])
+            self._n_at_refresh = n
+            self._sealed = np.zeros(0, dtype=EPISODE_DTYPE)
+            self._scan_from = 0
+
+        s = self._scan_from
+        seg = trace[s:]
+        tail = _detect_fixed(seg, self._thr, self._peak_min, self.bin_ms,
+                             p['min_episode_ms'], p['min_gap_ms'], base_idx=s)
+        self.episodes = np.concatenate([self._sealed, tail])
+
+        # Início do trecho acima do limiar em andamento (n se não houver)
+        run_start = n
+        if len(seg) and seg[-1] > self._thr:
+            below = np.flatnonzero(seg <= self._thr)
+            run_start = s + (int(below[-1]) + 1 if len(below) else 0)
+
+        # Todos os episódios da varredura, menos o último, são definitivos;
+        # o último também, se o trecho em andamento começa a ≥ min_gap_ms
+        # do seu fim (não pode mais ser fundido a um episódio novo).
+        n_sealed = max(len(tail) - 1, 0)
+        if len(tail) and run_start * self.bin_ms - tail[-1]['offset_ms'] >= p['min_gap_ms']:
+            n_sealed = len(tail)
+        if n_sealed:
+            self._sealed = np.concatenate([self._sealed, tail[:n_sealed]])
+            self._scan_from = int(tail[n_sealed - 1]['offset_idx'])
+        if n_sealed == len(tail):
+            # Antes de run_start só há trechos curtos já encerrados
+            self._scan_from = max(self._scan_from, run_start)
+        return self.episodes
+
+    @property
+    def t_ms(self):
+        """Tempo coberto pelos bins já formados."""
+        return self._n_bins * self.bin_ms
+
+    @property
+    def t_lepis_ms(self):
+        """Onset do último episódio (None se ainda não houve episódio)."""
+        return float(self.episodes[-1]['onset_ms']) if len(self.episodes) else None
+
+    def quiet_ms(self):
+        """Tempo desde o fim do último episódio (desde 0 se não houve)."""
+        last_end = float(self.episodes[-1]['offset_ms']) if len(self.episodes) else 0.0
+        return self.t_ms - last_end
@@ -1,8 +1,11 @@
-# export_for_plot.py — gera BASE_Spikes.py e BASE_np.txt
+# export_for_plot.py — gera o raster BASE_raster_*.npy e BASE_np.txt
+# (BASE_Spikes.py, o formato antigo, só com --legacy-py)
 import os, argparse, textwrap
 import numpy as np
 from datetime import datetime
 
+from raster_store import build_raster, save_raster
+
 INVALID = '<>:"/\\|?*,'
 
 # ------------------------------ util básicos ------------------------------
@@ -82,6 +85,8 @@ def main():
     ap.add_argument("--n", type=int, default=None, help="Força n_neurons (opcional)")
     ap.add_argument("--append-ts", dest="append_ts", action="store_true", help="Anexa timestamp ao base")
     ap.add_argument("--ts-format", default="%Y-%m-%d_%H%M%S", help="Formato do timestamp")
+    ap.add_argument("--legacy-py", dest="legacy_py", action="store_true",
+                    help="Gera também BASE_Spikes.py (formato antigo, lento para execuções longas)")
     args = ap.parse_args()
 
     root = args.root
@@ -101,7 +106,7 @@ def main():
     p_w_t     = os.path.join(root, "w_t.npy")
     p_w_mean  = os.path.join(root, "w_mean.npy")
 
-    # ----- gerar spikes.py e np.txt -----
+    # ----- gerar raster e np.txt -----
     spike_i = load_npy_must(p_spike_i)
     spike_t = load_npy_must(p_spike_t)
     rate_t  = load_npy_must(p_rate_t)
@@ -109,10 +114,15 @@ def main():
     w_t = np.load(p_w_t) if os.path.exists(p_w_t) else None
     w_mean = np.load(p_w_mean) if os.path.exists(p_w_mean) else None
 
-    spikeTimes = build_spikeTimes(spike_i, spike_t, n_neurons=args.n)
-    out_spikes_py = os.path.join(root, f"{base}_Spikes.py")
-    save_spikes_py(spikeTimes, out_spikes_py)
-    print(f"[ok] Gerado: {out_spikes_py}  (neurônios: {len(spikeTimes)})")
+    ptr, times = build_raster(spike_i, spike_t, n_neurons=args.n)
+    out_raster = save_raster(ptr, times, root, base)
+    print(f"[ok] Gerado: {out_raster}  (neurônios: {len(ptr) - 1}, spikes: {len(times)})")
+
+    if args.legacy_py:
+        spikeTimes = build_spikeTimes(spike_i, spike_t, n_neurons=args.n)
+        out_spikes_py = os.path.join(root, f"{base}_Spikes.py")
+        save_spikes_py(spikeTimes, out_spikes_py)
+        print(f"[ok] Gerado: {out_spikes_py}  (neurônios: {len(spikeTimes)})")
 
     out_np_txt = os.path.join(root, f"{base}_np.txt")
     save_np_txt(rate_t, rate_hz, w_t=w_t, w_mean=w_mean, out_txt_path=out_np_txt)
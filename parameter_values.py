@@ -0,0 +1,283 @@
+# parameter_values.py — valores dos parâmetros da simulação, sem Brian2
+#
+# É aqui que os valores padrão são editados. As grandezas físicas são
+# floats em unidades SI (s, F, S, V, A): 200*pF vale 2e-10, exatamente o
+# float de 200*pF no Brian2. Os scripts de análise e de gráficos importam
+# este módulo sem carregar o Brian2; SimulationParameters.py aplica as
+# unidades do Brian2 aos mesmos valores para a simulação.
+
+# Unidades (fatores SI, iguais aos do Brian2)
+second = 1.0
+ms     = 1e-3
+pF     = 1e-12
+nS     = 1e-9
+mV     = 1e-3
+pA     = 1e-12
+_UNIT_NAMES = ('second', 'ms', 'pF', 'nS', 'mV', 'pA')
+
+# ===========================
+# Tempo de simulação
+# ===========================
+SIM_TIME = 480*second
+DT       = 0.1*ms
+
+# Método de integração do NeuronGroup (v, ge, s, ga):
+# 'euler'             → Euler explícito (original); pede dt pequeno.
+# 'exponential_euler' → Euler exponencial: exato para ge, s e ga, e para v
+#                       com as condutâncias fixas dentro do passo. Tolera
+#                       dt maior (ver bench_dt.py).
+# A integração exata ('exact' do Brian2) não se aplica: o termo ge·(v − V_syn)
+# acopla duas variáveis de estado e o sistema deixa de ser linear.
+INTEGRATION_METHOD = 'euler'
+
+# ===========================
+# Tamanho da rede
+# ===========================
+N = 100                   # Tabak usa N=100; rede menor = mais ruído estocástico
+P_CONNECT = 1.0           # completamente conectada (all-to-all)
+AUTAPSES = False          # sem autoconexões
+
+# Cache dos pares sorteados quando P_CONNECT < 1 (connectivity.py), por
+# (N, P_CONNECT, AUTAPSES, seed). Compartilhado entre execuções e entre os
+# workers do sweep.py. None = sem cache.
+CONNECTIVITY_CACHE_DIR = "./cache/connectivity"
+
+# ===========================
+# Modo de feedback lento (escolha aqui)
+# ===========================
+# 'adaptation'  → corrente lenta de adaptação (ga, theta)
+# 'depression'  → depressão sináptica pré-sináptica (s_j), Tabak et al. 2010
+FEEDBACK_MODE = 'depression'  # <--- comute aqui
+
+# ===========================
+# LIF — parâmetros comuns a ambos os modos
+# ===========================
+Cm      = 200*pF          # Capacitância
+gL      = 10*nS           # Condutância de vazamento  -> tau_m = Cm/gL = 20 ms
+EL      = -70*mV          # Potencial de repouso
+V_th    = -50*mV          # limiar de spike
+V_reset = -60*mV          # reset pós-spike
+
+# Sinapse excitatória — reversal
+V_syn   = 0*mV            # reversal da sinapse excitatória
+
+# ===========================
+# Parâmetros POR MODO — Adaptação celular  (Tabak Table 1, col. adaptation)
+# ===========================
+T_ref_adapt    = 5*ms
+gbar_syn_adapt = 0.14*nS
+tau_e_adapt    = 10*ms
+V_theta        = -80*mV
+tau_a          = 2500*ms
+
+# Incremento de ga por spike — HETEROGÊNEO por neurônio
+gbar_theta_min = 0.05*nS
+gbar_theta_max = 0.25*nS
+gbar_theta     = 0.5 * (gbar_theta_min + gbar_theta_max)
+
+# Corrente externa — adaptação
+I_min_adapt = 80*pA
+I_max_adapt = 340*pA
+
+# ===========================
+# Parâmetros POR MODO — Depressão sináptica
+# ===========================
+T_ref_dep      = 5*ms
+gbar_syn_dep   = 0.28*nS
+tau_e_dep      = 10*ms
+tau_s_rec      = 5000*ms
+delta_dep      = 0.025
+
+I_DIST_DEP     = 'uniform'
+I_min_dep      = 30*pA
+I_max_dep      = 230*pA
+I_mean_dep     = 200*pA
+I_std_dep      = 50*pA
+
+# ===========================
+# STDP — Configuração
+# ===========================
+STDP_ENABLED = True       # <--- comute aqui
+
+# Modo de STDP:
+#   'batch'        → STDP em lote (batch_stdp.py) — RECOMENDADO para redes episódicas
+#   'event_driven' → STDP event-driven do Brian2 — NÃO RECOMENDADO (viés LTD)
+STDP_MODE = 'batch'
+
+# Janelas temporais
+tau_pre  = 20*ms
+tau_post = 20*ms
+
+# Magnitudes
+A_LTP =  0.009          # Δw por par causal (pré-antes-pós)
+A_LTD = -0.009          # Δw por par anti-causal (pós-antes-pré)
+eta   =  1.0            # fator global
+
+# ===========================
+# Pesos sinápticos
+# ===========================
+
+# Limites absolutos permitidos pelo STDP
+W_MIN = 0.0
+W_MAX = 2.0
+
+# Valor médio de referência.
+W_INIT_FIXED = 1.0
+
+# Inicialização uniforme próxima de 1.0.
+W_INIT_MIN = 0.5
+W_INIT_MAX = 1.5
+
+# Normaliza os pesos iniciais para média exatamente igual a W_INIT_FIXED.
+W_INIT_NORMALIZE_MEAN = False
+
+# Seed fixa para pesos iniciais.
+# Para cada execução sair diferente, use:
+#   RANDOM_SEED = None
+RANDOM_SEED = 99
+
+# Intervalo de aplicação do batch STDP (stride, ms). Independente dos
+# snapshots dos pesos (a cada 500 ms): 50.0 reproduz a cadência do modelo
+# HH. Com stride < 500 ms, os lotes são aplicados dentro de net.run()
+# (ver batch_stdp.py); bench_stdp_stride.py mede o custo.
+STDP_BATCH_INTERVAL_MS = 500.0
+
+# Cálculo dos pares do batch STDP (mesmos pares e somas; ver check_batch_stdp.py):
+#   'trace'    → trens ordenados + núcleo exponencial: somas acumuladas e
+#                buscas binárias, vetorizado sobre todos os pares
+#   'pairwise' → referência: matriz t_post − t_pre por sinapse, em Python
+STDP_KERNEL = 'trace'
+
+# Threads do kernel 'trace' (as linhas da soma são divididas entre elas;
+# o resultado é idêntico para qualquer valor). 0 = todos os núcleos.
+# Com sweep.py --workers > 1, manter 1 para não disputar os núcleos.
+STDP_THREADS = 1
+
+# ===========================
+# Monitoramento
+# ===========================
+N_W_SAMPLES = 64
+W_MON_DT    = 50*ms
+
+# ===========================
+# Atraso sináptico
+# ===========================
+DELAY = 1.5*ms
+
+# ===========================
+# Registro da variável lenta (s | ga)
+# ===========================
+# A média populacional <s> (ou <θ>) é acumulada durante a simulação a cada
+# 1 ms, sem guardar s de cada neurônio (ver slow_variable.py).
+SLOW_RECORD_STD = False   # grava também o desvio padrão entre neurônios
+
+# Traços individuais (opcional): quantos neurônios, igualmente espaçados,
+# e a cada quanto tempo. 0 = nenhum.
+SLOW_TRACE_NEURONS = 0
+SLOW_TRACE_DT      = 10*ms
+
+# ===========================
+# Histórico de pesos (STDP)
+# ===========================
+# Os snapshots de 500 ms vão para uma única matriz T×n_syn mapeada em
+# memória (weights_history.npy + weights_history_t.npy, ver
+# weight_store.py). 'float32' e 'float16' reduzem o arquivo a 1/2 e 1/4;
+# float16 tem resolução de ~1e-3 em w ∈ [0, 2].
+WEIGHT_STORE_DTYPE = 'float64'
+
+# 'dense' → matriz completa (acima).
+# 'delta' → pesos completos a cada WEIGHT_KEYFRAME_EVERY snapshots e, entre
+#           eles, só as sinapses alteradas pelo STDP (índice, valor novo).
+#           Reconstrução exata de qualquer snapshot; bem menor quando poucas
+#           sinapses mudam por lote.
+WEIGHT_STORE_FORMAT    = 'dense'
+WEIGHT_KEYFRAME_EVERY  = 20      # snapshots (20 × 500 ms = 10 s)
+
+# ===========================
+# Geração de código (Brian2)
+# ===========================
+# 'cython' → código compilado (bem mais rápido para a rede all-to-all);
+#            cai automaticamente para 'numpy' se não houver compilador/Cython.
+# 'numpy'  → sem compilação (mais lento).
+CODEGEN_TARGET = 'cython'
+
+# Pasta do cache de extensões compiladas. None = padrão do Brian2
+# (~/.cython/brian_extensions). O cache é compartilhado entre execuções
+# e entre os workers do sweep.py.
+CODEGEN_CACHE_DIR = None
+
+# ===========================
+# Modo de execução
+# ===========================
+# 'runtime'    → loop Python em LIF_EMILLY.main(): net.run() em blocos de
+#                500 ms e batch STDP aplicado em Python (batch_stdp.py).
+# 'standalone' → dispositivo cpp_standalone do Brian2: a simulação inteira
+#                vira um único executável C++; o batch STDP (janela de
+#                100 ms, overlap-ignore e clip) roda no código gerado.
+# 'dense'      → motor NumPy sem Brian2 (dense_engine.py): pesos numa matriz
+#                N×N e buffer circular para o DELAY. Equivalente ao runtime
+#                em estatística, não spike a spike (check_dense_engine.py).
+EXECUTION_MODE = 'runtime'
+
+# Só no modo 'dense': nas fases silenciosas entre episódios (população sem
+# spikes, ninguém em refratário, nenhum spike em trânsito), avança v, ge,
+# s e ga analiticamente até pouco antes do próximo cruzamento de V_th
+# previsto, em vez de integrar passo a passo. Spikes iguais aos do
+# passo a passo, a menos de arredondamento.
+QUIESCENT_FASTFORWARD = False
+
+# Threads OpenMP no modo standalone (0 = sem OpenMP).
+STANDALONE_OPENMP_THREADS = 0
+
+# Pasta do projeto C++ gerado. None = <pasta de resultados>/standalone.
+# Apontar várias execuções sequenciais para a mesma pasta reaproveita a
+# compilação dos arquivos que não mudaram.
+STANDALONE_BUILD_DIR = None
+
+# ===========================
+# Gravação em streaming (modo runtime)
+# ===========================
+# True → ao fim de cada bloco de 500 ms os spikes e a taxa vão para
+# spike_i/spike_t/rate_t.npy no disco (legíveis durante a execução) e os
+# monitores são esvaziados; rate_hz.npy é escrito no fim. Mesmos arquivos
+# finais do modo False (tudo em memória até o fim). Ver stream_writer.py.
+STREAM_OUTPUTS = True
+
+# ===========================
+# Checkpoints (modo runtime)
+# ===========================
+# A cada quantos blocos de 500 ms gravar um checkpoint em
+# <pasta de resultados>/checkpoint (0 = desligado). Retomar com:
+#   python LIF_EMILLY.py --resume results/<RUN_NAME>
+# O checkpoint é apagado quando a execução termina normalmente.
+CHECKPOINT_EVERY = 1
+
+# ===========================
+# Episódios online e parada antecipada (modo runtime)
+# ===========================
+# True → ao fim de cada bloco de 500 ms os episódios são atualizados
+# sobre a taxa até ali (mesmos critérios do relatório, em bins de 1 ms) e
+# o T_LEPIS parcial é impresso. A atualização é incremental (só o fim da
+# série é varrido de novo); ver episodes.OnlineEpisodeDetector.
+ONLINE_EPISODES = True
+
+# True → encerra a simulação antes de SIM_TIME quando não há episódio há
+# pelo menos EARLY_STOP_QUIET e a variável lenta está saturada no repouso
+# (|<s> − 1| ou |<θ>| ≤ EARLY_STOP_SLOW_TOL): a rede não volta a disparar.
+# As saídas cobrem só o tempo simulado; run_log.txt registra o instante
+# da parada (EARLY_STOP_MS).
+EARLY_STOP          = False
+EARLY_STOP_QUIET    = 30*second
+EARLY_STOP_SLOW_TOL = 0.02
+
+# ===========================
+# Catálogo de execuções
+# ===========================
+# True → ao fim de cada execução, parâmetros, métricas e arquivos são
+# registrados em results/run_catalog.sqlite (ver run_catalog.py).
+RUN_CATALOG = True
+
+# Exporta os parâmetros, não os fatores de unidade (SimulationParameters.py
+# faz "from brian2 import *" e não pode ter ms, pF etc. trocados por floats)
+__all__ = [_name for _name in list(globals())
+           if not _name.startswith('_') and _name not in _UNIT_NAMES]
@@ -5,6 +5,8 @@ import importlib
 import sys, os, glob
 import argparse # Adicionado
 from matplotlib.ticker import FuncFormatter, MaxNLocator
+from raster_store import Raster, find_raster, open_raster
+from run_catalog import read_params
 
 # =========================
 # CONFIG
@@ -58,18 +60,7 @@ base = ""        # Mantemos para auto-inferir o nome dos arquivos
 # =========================
 # Ler parâmetros e criar strings
 # =========================
-def get_params(root_dir):
-    params = {}
-    params_path = os.path.join(root_dir, "params.txt")
-    if os.path.exists(params_path):
-        with open(params_path, "r") as f:
-            for line in f:
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    params[key.strip()] = value.strip()
-    return params
-
-params = get_params(root)
+params = read_params(root)
 stdp_info = ""
 filename_suffix = ""
 
@@ -92,9 +83,16 @@ if "STDP_ENABLED" in params:
 # =========================
 assert os.path.isdir(root), f"Diretório não existe: {root}"
 if base == "":
-    # A busca agora é feita dentro do diretório especificado em 'root'
+    base = find_raster(root) or ""
+
+if base != "":
+    # Raster binário (export_for_plot.py): lido em memmap, sem cópia
+    raster = open_raster(root, base)
+    spike_source = base + "_raster"
+else:
+    # Pastas antigas: módulo BASE_Spikes.py (export_for_plot.py --legacy-py)
     candidates = sorted(glob.glob(os.path.join(root, "*_Spikes*.py")), key=os.path.getmtime)
-    assert len(candidates) > 0, f"Nenhum arquivo *_Spikes*.py encontrado em '{root}'"
+    assert len(candidates) > 0, f"Nenhum raster *_raster_ptr.npy ou *_Spikes*.py encontrado em '{root}'"
     spike_module_path = candidates[-1]
     spike_module_name = os.path.basename(spike_module_path)[:-3]
     if spike_module_name.endswith("_Spikes_pN-1"):
@@ -103,13 +101,16 @@ if base == "":
         base = spike_module_name[:-len("_Spikes")]
     else:
         base = spike_module_name.split("_Spikes")[0]
-else:
-    spike_module_name = base + "_Spikes"
 
-sys.path.append(root)
-moduleSpikeTimes = importlib.import_module(spike_module_name)
-spikeTimes = moduleSpikeTimes.spikeTimes
-nNeurons = len(spikeTimes)
+    sys.path.append(root)
+    spikeTimes = importlib.import_module(spike_module_name).spikeTimes
+    lens = [len(st) for st in spikeTimes]
+    ptr = np.zeros(len(spikeTimes) + 1, dtype=np.int64)
+    np.cumsum(lens, out=ptr[1:])
+    times = np.concatenate([np.asarray(st, dtype=float) for st in spikeTimes]) if sum(lens) else np.zeros(0)
+    raster = Raster(ptr, times, base)
+    spike_source = spike_module_name
+nNeurons = len(raster)
 
 np_path = os.path.join(root, base + "_np.txt")
 assert os.path.exists(np_path), f"Arquivo não encontrado: {np_path}"
@@ -156,14 +157,7 @@ peak_t_ms = t[peak_idx] if peak_idx.size else np.array([])
 # =========================
 # ISI (0–100 ms para hist)
 # =========================
-allisi = []
-for n in range(nNeurons):
-    st = np.asarray(spikeTimes[n], dtype=float)
-    if st.size > 1:
-        isi = np.diff(st)
-        isi = isi[np.isfinite(isi)]
-        allisi.append(isi)
-allisi = np.concatenate(allisi) if len(allisi) else np.array([])
+allisi = raster.isi()
 if allisi.size:
     allisi = allisi[(allisi > 0) & (allisi < 100.0)]
 
@@ -174,15 +168,13 @@ from matplotlib import gridspec
 fig = plt.figure(figsize=(12, 6.5), constrained_layout=True)
 gs = fig.add_gridspec(2, 2, width_ratios=[3, 1], height_ratios=[1, 1])
 
-title = f"{os.path.join(root, spike_module_name)}\n{stdp_info}"
+title = f"{os.path.join(root, spike_source)}\n{stdp_info}"
 fig.suptitle(title, y=1.02, fontsize=9)
 
 # 1) raster (top-left)
 ax0 = fig.add_subplot(gs[0, 0])
-for n in range(nNeurons):
-    st = np.asarray(spikeTimes[n], dtype=float)
-    if st.size:
-        ax0.scatter(st, np.full_like(st, n), s=3, marker='.', c='red', alpha=0.9, linewidths=0)
+if raster.n_spikes:
+    ax0.scatter(raster.times, raster.neuron_ids(), s=3, marker='.', c='red', alpha=0.9, linewidths=0)
 ax0.set_xlim([0, tT])
 ax0.set_ylabel("Neuron")
 ax0.invert_yaxis()
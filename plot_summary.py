@@ -22,51 +22,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
 
-
-# ============================================================
-# Detecção de episódios (mesma lógica do plot_tabak_analysis)
-# ============================================================
-def detect_episodes(activity, threshold_frac=0.15, min_episode_ms=10,
-                    min_gap_ms=50, dt_ms=1.0):
-    a = np.asarray(activity, dtype=float)
-    lo, hi = np.percentile(a, 5), np.percentile(a, 95)
-    thr = lo + threshold_frac * (hi - lo)
-
-    above = a > thr
-    diff = np.diff(above.astype(int))
-    onsets  = np.where(diff == 1)[0] + 1
-    offsets = np.where(diff == -1)[0] + 1
-
-    if above[0]:
-        onsets = np.concatenate([[0], onsets])
-    if above[-1]:
-        offsets = np.concatenate([offsets, [len(a) - 1]])
-
-    n_ep = min(len(onsets), len(offsets))
-    episodes = []
-    for i in range(n_ep):
-        on_i  = onsets[i]
-        off_i = offsets[i]
-        dur = (off_i - on_i) * dt_ms
-        if dur >= min_episode_ms:
-            episodes.append({
-                'onset_idx':  on_i,
-                'offset_idx': off_i,
-                'onset_ms':   on_i * dt_ms,
-                'offset_ms':  off_i * dt_ms,
-                'duration_ms': dur,
-            })
-
-    merged = []
-    for ep in episodes:
-        if merged and (ep['onset_ms'] - merged[-1]['offset_ms']) < min_gap_ms:
-            merged[-1]['offset_idx'] = ep['offset_idx']
-            merged[-1]['offset_ms']  = ep['offset_ms']
-            merged[-1]['duration_ms'] = ep['offset_ms'] - merged[-1]['onset_ms']
-        else:
-            merged.append(ep)
-
-    return merged
+from episodes import PLOT_PARAMS, load_episodes, rate_dt_ms
+from run_catalog import read_params
 
 
 def compute_intervals(episodes):
@@ -99,21 +56,6 @@ def compute_intervals(episodes):
     }
 
 
-# ============================================================
-# Ler parâmetros da simulação
-# ============================================================
-def get_params(rdir):
-    params = {}
-    params_path = os.path.join(rdir, "params.txt")
-    if os.path.exists(params_path):
-        with open(params_path, "r") as f:
-            for line in f:
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    params[key.strip()] = value.strip()
-    return params
-
-
 # ============================================================
 # Detectar picos de atividade (para linhas verticais)
 # ============================================================
@@ -171,7 +113,7 @@ def main():
     rate_t  = np.load(os.path.join(rdir, "rate_t.npy"))     # ms
     rate_hz = np.load(os.path.join(rdir, "rate_hz.npy"))    # Hz
 
-    params = get_params(rdir)
+    params = read_params(rdir)
 
     # ---- Normalizar atividade para [0, 1] ----
     a_min, a_max = rate_hz.min(), rate_hz.max()
@@ -181,8 +123,9 @@ def main():
         a_norm = np.zeros_like(rate_hz)
 
     # ---- Detectar episódios ----
-    dt_rate = np.median(np.diff(rate_t)) if len(rate_t) > 1 else 1.0
-    episodes = detect_episodes(a_norm, threshold_frac=args.thr, dt_ms=dt_rate)
+    dt_rate = rate_dt_ms(rate_t)
+    episodes = load_episodes(rdir, rate_hz=rate_hz, dt_ms=dt_rate,
+                             **{**PLOT_PARAMS, 'threshold_frac': args.thr})
 
     # ---- Separar: visualização usa TODOS, estatísticas descartam os primeiros N ----
     skip_n = max(0, int(args.skip_first))
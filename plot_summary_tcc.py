@@ -23,34 +23,7 @@ import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 from scipy import stats
 
-
-def detect_episodes(activity, threshold_frac=0.15, min_episode_ms=10,
-                    min_gap_ms=50, dt_ms=1.0):
-    a = np.asarray(activity, dtype=float)
-    lo, hi = np.percentile(a, 5), np.percentile(a, 95)
-    thr = lo + threshold_frac * (hi - lo)
-    above = a > thr
-    diff  = np.diff(above.astype(int))
-    onsets  = np.where(diff == 1)[0] + 1
-    offsets = np.where(diff == -1)[0] + 1
-    if above[0]:  onsets  = np.concatenate([[0], onsets])
-    if above[-1]: offsets = np.concatenate([offsets, [len(a) - 1]])
-    n_ep = min(len(onsets), len(offsets))
-    episodes = []
-    for i in range(n_ep):
-        dur = (offsets[i] - onsets[i]) * dt_ms
-        if dur >= min_episode_ms:
-            episodes.append({'onset_ms':  onsets[i] * dt_ms,
-                             'offset_ms': offsets[i] * dt_ms,
-                             'duration_ms': dur})
-    merged = []
-    for ep in episodes:
-        if merged and (ep['onset_ms'] - merged[-1]['offset_ms']) < min_gap_ms:
-            merged[-1]['offset_ms']   = ep['offset_ms']
-            merged[-1]['duration_ms'] = ep['offset_ms'] - merged[-1]['onset_ms']
-        else:
-            merged.append(ep)
-    return merged
+from episodes import PLOT_PARAMS, load_episodes, rate_dt_ms
 
 
 def compute_intervals(episodes):
@@ -85,8 +58,9 @@ def _run(args):
     a_min, a_max = rate_hz.min(), rate_hz.max()
     a_norm = (rate_hz - a_min) / (a_max - a_min) if a_max > a_min else np.zeros_like(rate_hz)
 
-    dt_rate  = float(np.median(np.diff(rate_t))) if len(rate_t) > 1 else 1.0
-    episodes = detect_episodes(a_norm, threshold_frac=thr, dt_ms=dt_rate)
+    dt_rate  = rate_dt_ms(rate_t)
+    episodes = load_episodes(rdir, rate_hz=rate_hz, dt_ms=dt_rate,
+                             **{**PLOT_PARAMS, 'threshold_frac': thr})
     skip_n   = max(0, int(skip_first))
     if skip_n >= len(episodes):
         skip_n = 0
@@ -24,57 +24,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
 
-
-# ============================================================
-# Detecção de episódios
-# ============================================================
-def detect_episodes(activity, threshold_frac=0.15, min_episode_ms=10,
-                    min_gap_ms=50, dt_ms=1.0):
-    """
-    Detecta episódios de atividade alta.
-    threshold_frac: fração entre min e max da atividade para considerar 'ativo'.
-    Retorna lista de dicts com {onset_idx, offset_idx, onset_ms, offset_ms, duration_ms}.
-    """
-    a = np.asarray(activity, dtype=float)
-    lo, hi = np.percentile(a, 5), np.percentile(a, 95)
-    thr = lo + threshold_frac * (hi - lo)
-
-    above = a > thr
-    diff = np.diff(above.astype(int))
-    onsets  = np.where(diff == 1)[0] + 1
-    offsets = np.where(diff == -1)[0] + 1
-
-    if above[0]:
-        onsets = np.concatenate([[0], onsets])
-    if above[-1]:
-        offsets = np.concatenate([offsets, [len(a) - 1]])
-
-    n_ep = min(len(onsets), len(offsets))
-    episodes = []
-    for i in range(n_ep):
-        on_i  = onsets[i]
-        off_i = offsets[i]
-        dur = (off_i - on_i) * dt_ms
-        if dur >= min_episode_ms:
-            episodes.append({
-                'onset_idx':  on_i,
-                'offset_idx': off_i,
-                'onset_ms':   on_i * dt_ms,
-                'offset_ms':  off_i * dt_ms,
-                'duration_ms': dur,
-            })
-
-    # Mesclar episódios muito próximos
-    merged = []
-    for ep in episodes:
-        if merged and (ep['onset_ms'] - merged[-1]['offset_ms']) < min_gap_ms:
-            merged[-1]['offset_idx'] = ep['offset_idx']
-            merged[-1]['offset_ms']  = ep['offset_ms']
-            merged[-1]['duration_ms'] = ep['offset_ms'] - merged[-1]['onset_ms']
-        else:
-            merged.append(ep)
-
-    return merged
+from episodes import PLOT_PARAMS, load_episodes, rate_dt_ms
+from run_catalog import read_params
 
 
 def compute_intervals_and_correlations(episodes):
@@ -128,14 +79,9 @@ def detect_mode(rdir):
         return 'adaptation'
 
     # Tentar ler params.txt
-    params_path = os.path.join(rdir, "params.txt")
-    if os.path.exists(params_path):
-        with open(params_path) as f:
-            for line in f:
-                if 'FEEDBACK_MODE' in line and 'adaptation' in line:
-                    return 'adaptation'
-                if 'FEEDBACK_MODE' in line and 'depression' in line:
-                    return 'depression'
+    mode = read_params(rdir).get('FEEDBACK_MODE')
+    if mode in ('depression', 'adaptation'):
+        return mode
 
     return None
 
@@ -216,8 +162,9 @@ def main():
     slow_interp = np.interp(rate_t, slow_t, slow_mean)
 
     # ---- Detectar episódios ----
-    dt_rate = np.median(np.diff(rate_t)) if len(rate_t) > 1 else 1.0
-    episodes = detect_episodes(a_norm, threshold_frac=args.thr, dt_ms=dt_rate)
+    dt_rate = rate_dt_ms(rate_t)
+    episodes = load_episodes(rdir, rate_hz=rate_hz, dt_ms=dt_rate,
+                             **{**PLOT_PARAMS, 'threshold_frac': args.thr})
 
     # ---- Separar: visualização (A, B) usa TODOS; estatísticas (C-F) descartam os primeiros N ----
     skip_n = max(0, int(args.skip_first))
@@ -8,6 +8,12 @@ T_LEPIS é lido do arquivo tlepis.txt gerado automaticamente pelo LIF_EMILLY.py.
 Uso — escanear subpastas automaticamente:
     python plot_tlepis_comparison.py --root ./results
 
+    Se houver <root>/run_catalog.sqlite (ver run_catalog.py), as execuções
+    vêm do catálogo, sem reler params.txt/tlepis.txt de cada subpasta. O
+    catálogo é antes acertado com as pastas em disco (pastas apagadas saem,
+    pastas não registradas entram, pastas com params.txt/tlepis.txt/
+    run_log.txt alterados são relidas); --no-catalog força a varredura.
+
 Uso — especificar pastas manualmente:
     python plot_tlepis_comparison.py --dirs ./results/sim_1 ./results/sim_2 ...
 
@@ -23,6 +29,8 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+from run_catalog import read_kv, read_params, open_catalog
+
 
 # ─────────────────────────────────────────────
 # Leitura de dados
@@ -33,13 +41,7 @@ def _read_tlepis(results_dir):
     p = os.path.join(results_dir, "tlepis.txt")
     if not os.path.exists(p):
         return None
-    data = {}
-    with open(p) as f:
-        for line in f:
-            line = line.strip()
-            if "=" in line and not line.startswith("#"):
-                k, v = line.split("=", 1)
-                data[k.strip()] = v.strip()
+    data = read_kv(p)
     try:
         return {
             'tlepis_s'   : float(data["T_LEPIS_S"]),
@@ -52,18 +54,6 @@ def _read_tlepis(results_dir):
         return None
 
 
-def _read_params(results_dir):
-    params = {}
-    p = os.path.join(results_dir, "params.txt")
-    if os.path.exists(p):
-        with open(p) as f:
-            for line in f:
-                if "=" in line:
-                    k, v = line.strip().split("=", 1)
-                    params[k.strip()] = v.strip()
-    return params
-
-
 def collect_data(dirs):
     """
     Varre as pastas e coleta (A_LTP, T_LEPIS, metadados).
@@ -72,7 +62,7 @@ def collect_data(dirs):
     rows = []
     for d in sorted(dirs):
         tl = _read_tlepis(d)
-        pr = _read_params(d)
+        pr = read_params(d)
 
         if tl is None:
             print(f"[AVISO] tlepis.txt ausente em: {os.path.basename(d)} — pulando.")
@@ -111,6 +101,42 @@ def collect_data(dirs):
     return rows
 
 
+def collect_data_from_catalog(catalog, root):
+    """
+    Mesmas linhas de collect_data(), lidas do catálogo SQLite
+    (run_catalog.RunCatalog) em vez das pastas. Antes, o catálogo é
+    acertado com as subpastas de root que têm tlepis.txt.
+    """
+    dirs = [os.path.dirname(f) for f in glob.glob(os.path.join(root, "*", "tlepis.txt"))]
+    n_added, n_updated, n_removed = catalog.sync(dirs)
+    if n_added or n_updated or n_removed:
+        print(f"[INFO] Catálogo atualizado: {n_added} pasta(s) registrada(s), "
+              f"{n_updated} reregistrada(s), {n_removed} inexistente(s) removida(s).")
+
+    rows = []
+    for r in catalog.query(order_by='dir'):
+        if r['tlepis_s'] is None:
+            continue
+        a_ltp = r['a_ltp'] if r['a_ltp'] is not None else 0.0
+        rows.append({
+            'dir'        : r['dir'],
+            'label'      : r['name'],
+            'a_ltp'      : a_ltp,
+            'a_ltd'      : r['a_ltd'] if r['a_ltd'] is not None else 0.0,
+            'amplitude'  : abs(a_ltp),
+            'stdp_on'    : bool(r['stdp_enabled']),
+            'stdp_mode'  : r['stdp_mode'] or "batch",
+            'tlepis_s'   : r['tlepis_s'],
+            'tlepis_ms'  : r['tlepis_ms'],
+            'n_episodes' : r['n_episodes'],
+            'sim_time_s' : r['sim_time_s'] or 0.0,
+            'mode'       : (r['feedback_mode'] or "?").upper(),
+        })
+
+    print(f"[INFO] {len(rows)} simulações com T_LEPIS encontradas no catálogo.")
+    return rows
+
+
 # ─────────────────────────────────────────────
 # Plot
 # ─────────────────────────────────────────────
@@ -246,6 +272,10 @@ def main():
         "--output", default=None,
         help="Caminho do PNG de saída (padrão: tlepis_comparison.png na pasta raiz)."
     )
+    parser.add_argument(
+        "--no-catalog", action="store_true",
+        help="Com --root, ignora run_catalog.sqlite e lê as subpastas."
+    )
     parser.add_argument(
         "--sort-by", default='a_ltp',
         choices=['a_ltp', 'a_ltd', 'amplitude'],
@@ -254,19 +284,26 @@ def main():
     args = parser.parse_args()
 
     # ── Encontrar pastas ──────────────────────────────────────────────
+    catalog = None
     if args.root:
         root = args.root
-        pattern = os.path.join(root, "*", "tlepis.txt")
-        found = glob.glob(pattern)
-        dirs = [os.path.dirname(f) for f in found]
-        if not dirs:
-            print(f"[AVISO] Nenhuma subpasta com tlepis.txt em: {root}")
-            return
+        catalog = None if args.no_catalog else open_catalog(root)
+        if catalog is None:
+            pattern = os.path.join(root, "*", "tlepis.txt")
+            found = glob.glob(pattern)
+            dirs = [os.path.dirname(f) for f in found]
+            if not dirs:
+                print(f"[AVISO] Nenhuma subpasta com tlepis.txt em: {root}")
+                return
     else:
         root = os.path.commonpath(args.dirs) if len(args.dirs) > 1 else os.path.dirname(args.dirs[0])
         dirs = args.dirs
 
-    rows = collect_data(dirs)
+    if catalog is not None:
+        rows = collect_data_from_catalog(catalog, root)
+        catalog.close()
+    else:
+        rows = collect_data(dirs)
     if not rows:
         print("[ERRO] Nenhum dado válido para plotar.")
         return
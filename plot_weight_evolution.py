@@ -2,9 +2,9 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import os
-import glob
 import argparse
-from SimulationParameters import W_MIN, W_MAX
+from parameter_values import W_MIN, W_MAX
+from weight_store import open_weight_history
 
 def main():
     parser = argparse.ArgumentParser(description="Gera gráficos e dados de contagem de pesos a partir de uma pasta de simulação.")
@@ -29,31 +29,24 @@ def main():
     print(f"Salvando dados de contagem em: {os.path.abspath(data_output_path)}")
     # ==========================================================
 
-    file_pattern = "weights_t_*.npy"
-    search_path = os.path.join(results_dir, file_pattern)
-    snapshot_files = sorted(glob.glob(search_path))
+    history = open_weight_history(results_dir)
 
-    if not snapshot_files:
-        print(f"[ERRO] Nenhum arquivo de snapshot ('{file_pattern}') encontrado em '{results_dir}'.")
+    if history is None:
+        print(f"[ERRO] Nenhum histórico de pesos (weights_history.npy ou weights_t_*.npy) encontrado em '{results_dir}'.")
         return
 
     weight_bins = np.linspace(W_MIN, W_MAX, 101)
 
     # Preparação para o gráfico resumo (mosaico)
-    n_plots = len(snapshot_files)
+    n_plots = len(history)
     ncols = 3
     nrows = (n_plots + ncols - 1) // ncols 
     fig_summary, axes_summary = plt.subplots(nrows, ncols, figsize=(5 * ncols, 4 * nrows), constrained_layout=True)
     axes_summary = axes_summary.flatten()
     
-    # Itera sobre cada arquivo de snapshot
-    for i, file_path in enumerate(snapshot_files):
-        weights = np.load(file_path)
-        try:
-            time_ms = int(os.path.basename(file_path).split('_t_')[1].split('.')[0])
-        except (IndexError, ValueError):
-            print(f"[AVISO] Não foi possível extrair o tempo do arquivo: {file_path}. Pulando.")
-            continue
+    # Itera sobre cada snapshot do histórico
+    for i, (t_ms, weights) in enumerate(history):
+        time_ms = int(round(t_ms))
 
         # --- Parte 1: Calcula os dados do histograma UMA VEZ ---
         counts, bin_edges = np.histogram(weights, bins=weight_bins)
@@ -13,16 +13,14 @@ Uso:
 """
 import argparse
 import os
-import glob
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
-try:
-    from SimulationParameters import W_MIN, W_MAX
-except ImportError:
-    W_MIN, W_MAX = 0.0, 2.0
+from parameter_values import W_MIN, W_MAX
+from run_catalog import read_params
+from weight_store import open_weight_history
 
 
 # ─────────────────────────────────────────────
@@ -43,18 +41,6 @@ Y_LIM_MAX = 600
 # Helpers
 # ─────────────────────────────────────────────
 
-def _read_params(results_dir):
-    params = {}
-    p = os.path.join(results_dir, "params.txt")
-    if os.path.exists(p):
-        with open(p) as f:
-            for line in f:
-                if "=" in line:
-                    k, v = line.strip().split("=", 1)
-                    params[k.strip()] = v.strip()
-    return params
-
-
 def _build_run_label(params):
     """Monta string de identificação para títulos de figuras."""
     mode = params.get("FEEDBACK_MODE", "?").upper()
@@ -73,44 +59,25 @@ def _build_run_label(params):
         return f"Modo: {mode}  |  N = {n}  |  STDP: OFF"
 
 
-def _parse_time_from_file(fpath):
-    """Extrai o tempo em ms do nome do arquivo weights_t_XXXXX.npy."""
-    try:
-        return int(os.path.basename(fpath).split('_t_')[1].split('.')[0])
-    except Exception:
-        return None
-
-
-def _select_four_snapshots(snapshot_files):
+def _select_four_snapshots(history):
     """
-    Dado uma lista ordenada de arquivos weights_t_XXXXX.npy,
-    retorna os 4 arquivos mais próximos de 0%, 25%, 50%, 100%.
+    Dado o histórico de pesos (weight_store.WeightHistory), retorna as
+    4 linhas mais próximas de 0%, 25%, 50%, 100% da simulação.
 
-    Retorna: list of (pct_float, time_ms, filepath)
+    Retorna: list of (pct_float, time_ms, índice_da_linha)
     """
-    timed = []
-
-    for f in snapshot_files:
-        t = _parse_time_from_file(f)
-        if t is not None:
-            timed.append((t, f))
-
-    if not timed:
+    if not len(history):
         return []
 
-    timed.sort()
-
-    t_vals  = [t for t, _ in timed]
-    t_min   = t_vals[0]
-    t_max   = t_vals[-1]
+    t_min   = float(np.min(history.t_ms))
+    t_max   = float(np.max(history.t_ms))
     t_range = t_max - t_min if t_max != t_min else 1
 
     selected = []
 
     for pct in [0.0, 0.25, 0.50, 1.0]:
-        target = t_min + pct * t_range
-        closest = min(timed, key=lambda x: abs(x[0] - target))
-        selected.append((pct, closest[0], closest[1]))
+        k = history.index_of(t_min + pct * t_range)
+        selected.append((pct, int(round(history.t_ms[k])), k))
 
     return selected
 
@@ -451,17 +418,16 @@ def run_weight_snapshots(results_dir):
 
     Retorna o caminho da pasta criada, ou None se não houver snapshots.
     """
-    params    = _read_params(results_dir)
+    params    = read_params(results_dir)
     run_label = _build_run_label(params)
 
-    pattern   = os.path.join(results_dir, "weights_t_*.npy")
-    all_files = sorted(glob.glob(pattern))
+    history = open_weight_history(results_dir)
 
-    if not all_files:
+    if history is None:
         print(f"[AVISO] Nenhum snapshot de pesos encontrado em: {results_dir}")
         return None
 
-    selected = _select_four_snapshots(all_files)
+    selected = _select_four_snapshots(history)
 
     if not selected:
         print("[AVISO] Não foi possível selecionar snapshots.")
@@ -472,8 +438,8 @@ def run_weight_snapshots(results_dir):
 
     snapshots_data = []
 
-    for pct, time_ms, fpath in selected:
-        weights = np.load(fpath)
+    for pct, time_ms, k in selected:
+        weights = history[k]
         snapshots_data.append((pct, time_ms, weights))
 
         print(
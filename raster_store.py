@@ -0,0 +1,132 @@
+# raster_store.py — raster de spikes em formato binário mapeado em memória
+#
+# export_for_plot.py gravava os spikes como código Python (BASE_Spikes.py,
+# via np.array2string) e o plotRaster.py o carregava com
+# importlib.import_module: numa execução de 480 s o arquivo passa de
+# centenas de MB e o Python leva minutos para compilá-lo.
+#
+# Agora o raster é gravado em dois .npy, no estilo CSR (uma "linha" por
+# neurônio):
+#
+#   BASE_raster_t.npy     (n_spikes,) float64, tempos em ms agrupados por
+#                         neurônio e em ordem crescente dentro de cada um
+#   BASE_raster_ptr.npy   (N+1,) int64, spikes do neurônio n em
+#                         t[ptr[n]:ptr[n+1]]
+#
+# Leitura sem cópia (np.load com mmap_mode='r'):
+#
+#   from raster_store import open_raster
+#   r = open_raster(results_dir)
+#   len(r)            número de neurônios
+#   r[n]              tempos (ms) do neurônio n (view do memmap)
+#   r.times, r.ptr    os dois vetores
+#   r.neuron_ids()    índice do neurônio de cada elemento de r.times
+#   r.isi()           intervalos entre spikes consecutivos do mesmo neurônio
+#
+# O BASE_Spikes.py antigo continua disponível com
+# export_for_plot.py --legacy-py.
+
+import glob
+import os
+
+import numpy as np
+
+TIMES_SUFFIX = "_raster_t.npy"
+PTR_SUFFIX = "_raster_ptr.npy"
+
+
+def build_raster(spike_i, spike_t, n_neurons=None):
+    """
+    (ptr, times) do raster de (spike_i, spike_t). Mesmos tempos e mesma
+    ordem do build_spikeTimes de export_for_plot.py (índices fora de
+    [0, n_neurons) são descartados).
+    """
+    spike_i = np.asarray(spike_i).astype(np.int64)
+    spike_t = np.asarray(spike_t).astype(np.float64)
+    if spike_i.shape != spike_t.shape:
+        raise ValueError(f"Dimensões divergentes: spike_i {spike_i.shape} vs spike_t {spike_t.shape}")
+    if n_neurons is None:
+        n_neurons = int(spike_i.max()) + 1 if spike_i.size else 0
+
+    keep = (spike_i >= 0) & (spike_i < n_neurons)
+    spike_i, spike_t = spike_i[keep], spike_t[keep]
+    # por neurônio e, dentro dele, por tempo (estável, como o mergesort)
+    order = np.lexsort((spike_t, spike_i))
+
+    ptr = np.zeros(n_neurons + 1, dtype=np.int64)
+    np.cumsum(np.bincount(spike_i, minlength=n_neurons), out=ptr[1:])
+    return ptr, spike_t[order]
+
+
+def raster_paths(root, base):
+    """Caminhos (tempos, ponteiros) do raster BASE em root."""
+    return (os.path.join(root, base + TIMES_SUFFIX),
+            os.path.join(root, base + PTR_SUFFIX))
+
+
+def save_raster(ptr, times, root, base):
+    """Grava o raster BASE em root. Retorna o caminho do arquivo de tempos."""
+    times_path, ptr_path = raster_paths(root, base)
+    np.save(times_path, np.asarray(times, dtype=np.float64))
+    np.save(ptr_path, np.asarray(ptr, dtype=np.int64))
+    return times_path
+
+
+class Raster:
+    """Raster CSR: tempos (ms) por neurônio, sem copiar os vetores."""
+
+    def __init__(self, ptr, times, base=""):
+        self.ptr = ptr
+        self.times = times
+        self.base = base
+
+    def __len__(self):
+        return len(self.ptr) - 1
+
+    def __getitem__(self, n):
+        return self.times[self.ptr[n]:self.ptr[n + 1]]
+
+    def __iter__(self):
+        for n in range(len(self)):
+            yield self[n]
+
+    @property
+    def n_spikes(self):
+        return int(self.ptr[-1])
+
+    def neuron_ids(self):
+        """Neurônio de cada spike de self.times."""
+        return np.repeat(np.arange(len(self)), np.diff(self.ptr))
+
+    def isi(self):
+        """ISIs (ms) de todos os neurônios, sem os saltos entre neurônios."""
+        if self.n_spikes < 2:
+            return np.zeros(0)
+        d = np.diff(self.times)
+        # d[k] = times[k+1] − times[k]; é ISI se k+1 não abre um neurônio
+        first = self.ptr[1:-1]
+        first = first[(first > 0) & (first < self.n_spikes)]
+        valid = np.ones(len(d), dtype=bool)
+        valid[first - 1] = False
+        return d[valid]
+
+
+def find_raster(root):
+    """BASE do raster mais recente em root (None se não houver)."""
+    candidates = sorted(glob.glob(os.path.join(root, "*" + PTR_SUFFIX)), key=os.path.getmtime)
+    candidates = [p for p in candidates
+                  if os.path.exists(p[:-len(PTR_SUFFIX)] + TIMES_SUFFIX)]
+    if not candidates:
+        return None
+    return os.path.basename(candidates[-1])[:-len(PTR_SUFFIX)]
+
+
+def open_raster(root, base=None):
+    """Abre o raster BASE de root (padrão: o mais recente) mapeado em memória."""
+    if base is None:
+        base = find_raster(root)
+        if base is None:
+            raise FileNotFoundError(f"Nenhum arquivo *{PTR_SUFFIX} encontrado em '{root}'")
+    times_path, ptr_path = raster_paths(root, base)
+    return Raster(np.load(ptr_path, mmap_mode='r'),
+                  np.load(times_path, mmap_mode='r'), base)
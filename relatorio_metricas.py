@@ -19,110 +19,15 @@ import argparse
 import os
 import numpy as np
 
-
-def _calcular_dt_ms(rate_t):
-    """
-    Calcula o passo temporal real do vetor rate_t, em ms.
-    """
-    rate_t = np.asarray(rate_t, dtype=float)
-
-    if len(rate_t) > 1:
-        return float(np.median(np.diff(rate_t)))
-
-    return 1.0
-
-
-def _detectar_episodios(
-    activity,
-    threshold_frac=0.35,
-    min_episode_ms=80,
-    min_gap_ms=300,
-    dt_ms=1.0,
-    min_peak_frac=0.25
-):
-    """
-    Detecta episódios de atividade populacional.
-
-    Parâmetros principais:
-    - threshold_frac:
-        controla o limiar baseado nos percentis da atividade.
-        Valores maiores tornam a detecção menos sensível.
-
-    - min_episode_ms:
-        duração mínima para considerar um evento como episódio.
-
-    - min_gap_ms:
-        intervalo mínimo entre episódios.
-        Eventos muito próximos são mesclados.
-
-    - min_peak_frac:
-        filtra episódios cujo pico é muito pequeno em relação ao pico global.
-        Isso evita contar pequenas oscilações residuais no final como episódios.
-    """
-    a = np.asarray(activity, dtype=float)
-
-    if len(a) == 0:
-        return []
-
-    lo, hi = np.percentile(a, 5), np.percentile(a, 95)
-    thr = lo + threshold_frac * (hi - lo)
-
-    peak_global = float(np.max(a))
-    min_peak = min_peak_frac * peak_global
-
-    above = a > thr
-    diff = np.diff(above.astype(int))
-
-    onsets = np.where(diff == 1)[0] + 1
-    offsets = np.where(diff == -1)[0] + 1
-
-    if len(a) > 0 and above[0]:
-        onsets = np.concatenate([[0], onsets])
-
-    if len(a) > 0 and above[-1]:
-        offsets = np.concatenate([offsets, [len(a) - 1]])
-
-    n_ep = min(len(onsets), len(offsets))
-
-    episodes = []
-
-    for i in range(n_ep):
-        on_i = int(onsets[i])
-        off_i = int(offsets[i])
-
-        if off_i <= on_i:
-            continue
-
-        dur_ms = (off_i - on_i) * dt_ms
-        peak = float(np.max(a[on_i:off_i + 1]))
-
-        if dur_ms >= min_episode_ms and peak >= min_peak:
-            episodes.append({
-                'onset_ms': on_i * dt_ms,
-                'offset_ms': off_i * dt_ms,
-                'duration_ms': dur_ms,
-                'peak_hz': peak,
-            })
-
-    # Mesclar episódios muito próximos
-    merged = []
-
-    for ep in episodes:
-        if merged and (ep['onset_ms'] - merged[-1]['offset_ms']) < min_gap_ms:
-            merged[-1]['offset_ms'] = ep['offset_ms']
-            merged[-1]['duration_ms'] = ep['offset_ms'] - merged[-1]['onset_ms']
-            merged[-1]['peak_hz'] = max(merged[-1]['peak_hz'], ep['peak_hz'])
-        else:
-            merged.append(ep)
-
-    return merged
+from episodes import REPORT_PARAMS, load_episodes, rate_dt_ms
+from run_catalog import read_params
 
 
 def _salvar_tlepis(results_dir, episodes, sim_time_s, dt_ms):
     """
     Salva o tempo do último episódio em tlepis.txt.
     """
-    if episodes:
+    if len(episodes):
         last_ep = episodes[-1]
         tlepis_ms = float(last_ep['onset_ms'])
         tlepis_s = tlepis_ms / 1000.0
@@ -187,17 +92,9 @@ def gerar_relatorio(results_dir, verbose=True):
     rate_t = np.load(rate_t_path)      # ms
     rate_hz = np.load(rate_hz_path)    # Hz
 
-    dt_ms = _calcular_dt_ms(rate_t)
-
-    params_path = os.path.join(results_dir, "params.txt")
-    params = {}
+    dt_ms = rate_dt_ms(rate_t)
 
-    if os.path.exists(params_path):
-        with open(params_path, "r", encoding="utf-8", errors="replace") as f:
-            for line in f:
-                if "=" in line:
-                    k, v = line.strip().split("=", 1)
-                    params[k.strip()] = v.strip()
+    params = read_params(results_dir)
 
     N = int(params.get("N", 100))
 
@@ -207,19 +104,12 @@ def gerar_relatorio(results_dir, verbose=True):
     n_spikes = len(spike_i)
     taxa_media = n_spikes / (N * sim_time_s) if sim_time_s > 0 else 0.0
 
-    episodes = _detectar_episodios(
-        rate_hz,
-        dt_ms=dt_ms,
-        threshold_frac=0.35,
-        min_episode_ms=80,
-        min_gap_ms=300,
-        min_peak_frac=0.25
-    )
+    episodes = load_episodes(results_dir, rate_hz=rate_hz, dt_ms=dt_ms, **REPORT_PARAMS)
 
     n_episodes = len(episodes)
 
     if n_episodes > 0:
-        duracoes_s = np.array([ep['duration_ms'] / 1000.0 for ep in episodes])
+        duracoes_s = episodes['duration_ms'] / 1000.0
         duracao_media = float(np.mean(duracoes_s))
         duracao_std = float(np.std(duracoes_s))
     else:
@@ -265,10 +155,8 @@ def gerar_relatorio(results_dir, verbose=True):
     linhas.append(f"T_LEPIS: {tlepis_info['tlepis_s']:.4f} s")
     linhas.append("")
     linhas.append("--- Parâmetros da Detecção de Episódios ---")
-    linhas.append("threshold_frac = 0.35")
-    linhas.append("min_episode_ms = 80")
-    linhas.append("min_gap_ms = 300")
-    linhas.append("min_peak_frac = 0.25")
+    for key in ('threshold_frac', 'min_episode_ms', 'min_gap_ms', 'min_peak_frac'):
+        linhas.append(f"{key} = {REPORT_PARAMS[key]}")
     linhas.append("")
     linhas.append("--- Fim do Relatório ---")
 
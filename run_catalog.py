@@ -0,0 +1,403 @@
+# run_catalog.py — catálogo SQLite das execuções
+#
+# Comparações entre execuções (plot_tlepis_comparison.py, varreduras)
+# percorriam results/*/ e reliam params.txt e tlepis.txt de cada pasta.
+# Com centenas de execuções isso é uma varredura do sistema de arquivos a
+# cada consulta.
+#
+# Cada execução é registrada ao fim de LIF_EMILLY.main() (e de cada réplica
+# do ensemble) em <pasta raiz>/run_catalog.sqlite, com:
+#
+#   runs       uma linha por pasta: colunas indexadas para as consultas
+#              comuns (modo, STDP, A_LTP/A_LTD, T_LEPIS, episódios, tempos)
+#   params     todos os pares de params.txt (texto)
+#   metrics    métricas de gerar_relatorio() e tempos de run_log.txt
+#   artifacts  arquivos da pasta (caminho relativo e tamanho)
+#
+# A coluna dir guarda o caminho relativo à pasta do catálogo, então a
+# árvore de resultados pode ser movida ou copiada; query() devolve o
+# caminho absoluto. sync() remove as pastas que não existem mais,
+# registra as que ainda não estão no catálogo (execuções com
+# RUN_CATALOG = False, pastas copiadas) e registra de novo as que têm
+# params.txt, tlepis.txt ou run_log.txt mais novo que o registro (p. ex.
+# tlepis.txt reescrito por relatorio_metricas.py).
+#
+# Pastas antigas podem ser registradas com:
+#   python run_catalog.py backfill --root ./results
+# Consulta pela linha de comando:
+#   python run_catalog.py list --root ./results --where FEEDBACK_MODE=depression
+#
+# read_params()/read_kv() são o leitor único dos arquivos "CHAVE = valor"
+# (params.txt, tlepis.txt, run_log.txt) usado pelos demais scripts.
+
+import argparse
+import glob
+import os
+import sqlite3
+import time
+
+CATALOG_FILE = "run_catalog.sqlite"
+
+# Arquivos lidos por register(): se mudarem, o registro fica desatualizado
+_SOURCE_FILES = ("params.txt", "tlepis.txt", "run_log.txt")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          INTEGER PRIMARY KEY,
+    dir             TEXT UNIQUE NOT NULL,
+    name            TEXT NOT NULL,
+    registered_at   REAL NOT NULL,
+    feedback_mode   TEXT,
+    stdp_enabled    INTEGER,
+    stdp_mode       TEXT,
+    a_ltp           REAL,
+    a_ltd           REAL,
+    n               INTEGER,
+    random_seed     TEXT,
+    execution_mode  TEXT,
+    codegen_target  TEXT,
+    sim_time_s      REAL,
+    tlepis_s        REAL,
+    tlepis_ms       REAL,
+    n_episodes      INTEGER,
+    t_sim_s         REAL,
+    t_total_s       REAL
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id  INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    key     TEXT NOT NULL,
+    value   TEXT,
+    PRIMARY KEY (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id  INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    key     TEXT NOT NULL,
+    value   REAL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id  INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    path    TEXT NOT NULL,
+    bytes   INTEGER,
+    PRIMARY KEY (run_id, path)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_stdp   ON runs (feedback_mode, stdp_enabled, a_ltp, a_ltd);
+CREATE INDEX IF NOT EXISTS idx_runs_tlepis ON runs (tlepis_s);
+CREATE INDEX IF NOT EXISTS idx_params_kv   ON params (key, value);
+CREATE INDEX IF NOT EXISTS idx_metrics_kv  ON metrics (key, value);
+"""
+
+# Colunas de runs que podem ser usadas como filtro em query()
+RUN_COLUMNS = ('dir', 'name', 'registered_at', 'feedback_mode', 'stdp_enabled', 'stdp_mode',
+               'a_ltp', 'a_ltd', 'n', 'random_seed', 'execution_mode', 'codegen_target',
+               'sim_time_s', 'tlepis_s', 'tlepis_ms', 'n_episodes', 't_sim_s', 't_total_s')
+
+
+# ------------------------------------------------------------
+# Leitura dos arquivos "CHAVE = valor"
+# ------------------------------------------------------------
+
+def read_kv(path):
+    """Pares CHAVE = valor de um arquivo de texto (linhas com # ignoradas)."""
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if "=" in line and not line.lstrip().startswith("#"):
+                key, val = line.split("=", 1)
+                values[key.strip()] = val.strip()
+    return values
+
+
+def read_params(results_dir):
+    """params.txt de uma pasta de resultados ({} se não existir)."""
+    return read_kv(os.path.join(results_dir, "params.txt"))
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value):
+    f = _float(value)
+    return int(f) if f is not None else None
+
+
+# ------------------------------------------------------------
+# Catálogo
+# ------------------------------------------------------------
+
+def catalog_path_for(results_dir):
+    """Catálogo da pasta raiz que contém results_dir."""
+    return os.path.join(os.path.dirname(os.path.abspath(results_dir)), CATALOG_FILE)
+
+
+class RunCatalog:
+    """
+    Catálogo SQLite em path. Vários processos (workers do sweep.py) podem
+    registrar ao mesmo tempo: cada registro é uma transação.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.conn = sqlite3.connect(path, timeout=60.0)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rel(self, results_dir):
+        """Valor da coluna dir: caminho relativo à pasta do catálogo."""
+        return os.path.relpath(os.path.abspath(results_dir), self.root)
+
+    def _abs(self, dir_value):
+        """Caminho absoluto de um valor da coluna dir (relativo ou antigo, absoluto)."""
+        return os.path.normpath(os.path.join(self.root, dir_value))
+
+    # ---- Registro ----
+    def register(self, results_dir, metrics=None):
+        """
+        Registra (ou atualiza) a execução em results_dir. metrics: dict de
+        gerar_relatorio(); tlepis.txt e run_log.txt são lidos da pasta.
+        Retorna o run_id.
+        """
+        results_dir = os.path.abspath(results_dir)
+        rel_dir = self._rel(results_dir)
+        params = read_params(results_dir)
+        tlepis = read_kv(os.path.join(results_dir, "tlepis.txt"))
+        run_log = read_kv(os.path.join(results_dir, "run_log.txt"))
+
+        row = {
+            'dir':            rel_dir,
+            'name':           os.path.basename(results_dir),
+            'registered_at':  time.time(),
+            'feedback_mode':  params.get('FEEDBACK_MODE'),
+            'stdp_enabled':   (int(params['STDP_ENABLED'].lower() == 'true')
+                               if 'STDP_ENABLED' in params else None),
+            'stdp_mode':      params.get('STDP_MODE'),
+            'a_ltp':          _float(params.get('A_LTP')),
+            'a_ltd':          _float(params.get('A_LTD')),
+            'n':              _int(params.get('N')),
+            'random_seed':    params.get('RANDOM_SEED'),
+            'execution_mode': params.get('EXECUTION_MODE'),
+            'codegen_target': run_log.get('CODEGEN_TARGET'),
+            'sim_time_s':     _float(tlepis.get('SIM_TIME_S')),
+            'tlepis_s':       _float(tlepis.get('T_LEPIS_S')),
+            'tlepis_ms':      _float(tlepis.get('T_LEPIS_MS')),
+            'n_episodes':     _int(tlepis.get('N_EPISODES')),
+            't_sim_s':        _float(run_log.get('T_SIM_S')),
+            't_total_s':      _float(run_log.get('T_TOTAL_S')),
+        }
+
+        numeric = {k: _float(v) for k, v in (metrics or {}).items()}
+        numeric.update({k: _float(v) for k, v in run_log.items()})
+
+        artifacts = []
+        for base, _, files in os.walk(results_dir):
+            for name in files:
+                full = os.path.join(base, name)
+                artifacts.append((os.path.relpath(full, results_dir), os.path.getsize(full)))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE dir IN (?, ?)", (rel_dir, results_dir))
+            cols = ", ".join(row)
+            marks = ", ".join("?" for _ in row)
+            cur = self.conn.execute(f"INSERT INTO runs ({cols}) VALUES ({marks})",
+                                    tuple(row.values()))
+            run_id = cur.lastrowid
+            self.conn.executemany("INSERT INTO params VALUES (?, ?, ?)",
+                                  [(run_id, k, v) for k, v in params.items()])
+            self.conn.executemany("INSERT INTO metrics VALUES (?, ?, ?)",
+                                  [(run_id, k, v) for k, v in numeric.items() if v is not None])
+            self.conn.executemany("INSERT INTO artifacts VALUES (?, ?, ?)",
+                                  [(run_id, p, b) for p, b in artifacts])
+        return run_id
+
+    def remove_missing(self):
+        """Remove as execuções cujas pastas não existem mais. Retorna quantas."""
+        gone = [r['dir'] for r in self.conn.execute("SELECT dir FROM runs")
+                if not os.path.isdir(self._abs(r['dir']))]
+        with self.conn:
+            self.conn.executemany("DELETE FROM runs WHERE dir = ?", [(d,) for d in gone])
+        return len(gone)
+
+    def sync(self, dirs):
+        """
+        Acerta o catálogo com as pastas em disco: remove as que não existem
+        mais, registra as de dirs que ainda não estão nele e registra de
+        novo as que têm algum de _SOURCE_FILES mais novo que o registro
+        (as métricas de gerar_relatorio() já gravadas são mantidas).
+        Retorna (registradas, atualizadas, removidas).
+        """
+        n_removed = self.remove_missing()
+        known = {self._abs(r['dir']): (r['run_id'], r['registered_at'])
+                 for r in self.conn.execute("SELECT run_id, dir, registered_at FROM runs")}
+
+        stale = []
+        for d, (run_id, registered_at) in known.items():
+            for name in _SOURCE_FILES:
+                path = os.path.join(d, name)
+                if os.path.exists(path) and os.path.getmtime(path) > registered_at:
+                    stale.append((d, run_id))
+                    break
+        for d, run_id in stale:
+            self.register(d, self.metrics(run_id))
+
+        new = [d for d in dirs if os.path.abspath(d) not in known]
+        for d in new:
+            self.register(d)
+        return len(new), len(stale), n_removed
+
+    # ---- Consulta ----
+    def query(self, params=None, order_by='run_id', **filters):
+        """
+        Execuções como lista de dicts (colunas de runs).
+
+        filters : igualdade em colunas de runs, p. ex.
+                  query(feedback_mode='depression', stdp_enabled=1)
+        params  : igualdade em pares de params.txt (texto), p. ex.
+                  query(params={'I_ORDER': 'RAND'})
+        """
+        where, args = [], []
+        for key, value in filters.items():
+            if key not in RUN_COLUMNS:
+                raise ValueError(f"Coluna desconhecida no catálogo: '{key}'.")
+            if key == 'dir':
+                value = self._rel(value)
+            where.append(f"r.{key} = ?")
+            args.append(value)
+        for key, value in (params or {}).items():
+            where.append("EXISTS (SELECT 1 FROM params p WHERE p.run_id = r.run_id "
+                         "AND p.key = ? AND p.value = ?)")
+            args += [key, str(value)]
+        if order_by not in RUN_COLUMNS + ('run_id',):
+            raise ValueError(f"Coluna desconhecida no catálogo: '{order_by}'.")
+
+        sql = "SELECT r.* FROM runs r"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY r.{order_by}"
+        rows = [dict(r) for r in self.conn.execute(sql, args)]
+        for r in rows:
+            r['dir'] = self._abs(r['dir'])
+        return rows
+
+    def params(self, run_id):
+        """params.txt de uma execução registrada."""
+        return {r['key']: r['value'] for r in
+                self.conn.execute("SELECT key, value FROM params WHERE run_id = ?", (run_id,))}
+
+    def metrics(self, run_id):
+        """Métricas numéricas de uma execução registrada."""
+        return {r['key']: r['value'] for r in
+                self.conn.execute("SELECT key, value FROM metrics WHERE run_id = ?", (run_id,))}
+
+    def artifacts(self, run_id):
+        """Arquivos da execução: lista de (caminho relativo, bytes)."""
+        return [(r['path'], r['bytes']) for r in
+                self.conn.execute("SELECT path, bytes FROM artifacts WHERE run_id = ? "
+                                  "ORDER BY path", (run_id,))]
+
+
+def register_run(results_dir, metrics=None):
+    """Registra results_dir no catálogo da sua pasta raiz."""
+    with RunCatalog(catalog_path_for(results_dir)) as catalog:
+        return catalog.register(results_dir, metrics)
+
+
+def open_catalog(root):
+    """Catálogo de root (pasta raiz dos resultados), ou None se não existir."""
+    path = os.path.join(root, CATALOG_FILE)
+    return RunCatalog(path) if os.path.exists(path) else None
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+
+def backfill(root, recompute=False):
+    """
+    Registra todas as subpastas de root com params.txt. As métricas vêm de
+    gerar_relatorio() (que reescreve relatorio_metricas.txt) só quando
+    recompute=True; caso contrário, só tlepis.txt e run_log.txt.
+    """
+    dirs = sorted(os.path.dirname(p) for p in glob.glob(os.path.join(root, "*", "params.txt")))
+    if recompute:
+        from relatorio_metricas import gerar_relatorio
+
+    with RunCatalog(os.path.join(root, CATALOG_FILE)) as catalog:
+        n_removed = catalog.remove_missing()
+        for k, d in enumerate(dirs):
+            metrics = gerar_relatorio(d, verbose=False) if recompute else None
+            catalog.register(d, metrics)
+            print(f"[{k + 1}/{len(dirs)}] {os.path.basename(d)}")
+    print(f"[OK] {len(dirs)} execuções registradas em {os.path.join(root, CATALOG_FILE)}"
+          f" ({n_removed} pastas inexistentes removidas).")
+
+
+def _fmt(value, width, spec):
+    return format(value, f">{width}{spec}") if value is not None else f"{'-':>{width}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catálogo SQLite das execuções.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_back = sub.add_parser("backfill", help="Registra as pastas de resultados já existentes.")
+    p_back.add_argument("--root", default="./results", help="Pasta raiz (padrão: ./results).")
+    p_back.add_argument("--recompute", action="store_true",
+                        help="Recalcula as métricas com gerar_relatorio() em cada pasta.")
+
+    p_list = sub.add_parser("list", help="Lista as execuções registradas.")
+    p_list.add_argument("--root", default="./results", help="Pasta raiz (padrão: ./results).")
+    p_list.add_argument("--where", action="append", metavar="CHAVE=valor",
+                        help="Filtro (pode repetir): coluna do catálogo em minúsculas "
+                             "(a_ltp=0.009) ou chave de params.txt (I_ORDER=RAND).")
+    p_list.add_argument("--order-by", default="run_id", help="Coluna de ordenação.")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill(args.root, args.recompute)
+        return
+
+    catalog = open_catalog(args.root)
+    if catalog is None:
+        print(f"[ERRO] Catálogo não encontrado em: {args.root} (rode 'backfill' antes).")
+        return
+
+    filters, params = {}, {}
+    for item in args.where or []:
+        key, value = (s.strip() for s in item.split("=", 1))
+        if key in RUN_COLUMNS:
+            filters[key] = value
+        else:
+            params[key] = value
+
+    t0 = time.time()
+    rows = catalog.query(params=params, order_by=args.order_by, **filters)
+    dt_ms = (time.time() - t0) * 1e3
+    catalog.close()
+
+    print(f"  {'execução':<60} {'A_LTP':>8} {'A_LTD':>8} {'T_LEPIS(s)':>10} {'N_ep':>5}")
+    print("-" * 96)
+    for r in rows:
+        print(f"  {r['name'][:60]:<60} {_fmt(r['a_ltp'], 8, '.4f')} {_fmt(r['a_ltd'], 8, '.4f')} "
+              f"{_fmt(r['tlepis_s'], 10, '.2f')} {_fmt(r['n_episodes'], 5, 'd')}")
+    print(f"[INFO] {len(rows)} execução(ões) em {dt_ms:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# slow_variable.py — registro da variável lenta sem a matriz N×T
+#
+# O registro original era StateMonitor(G, 's' | 'ga', record=True,
+# dt=1 ms): para 100 neurônios e 480 s são 48 milhões de amostras
+# (≈ 384 MB em float64), das quais main() só guardava a média
+# populacional.
+#
+# Aqui a média (e, opcionalmente, o desvio padrão) é acumulada durante a
+# simulação: uma Synapses com variáveis "summed" soma s_pre/N (e s_pre²/N)
+# num grupo auxiliar de um neurônio por população, atualizado a cada 1 ms
+# no início do passo — o mesmo instante em que o StateMonitor antigo lia
+# s. Só esse grupo é monitorado. Os valores coincidem com
+# np.mean(s_all, axis=0) a menos de arredondamento (ordem da soma).
+#
+# Traços individuais são opcionais e decimados: SLOW_TRACE_NEURONS
+# neurônios igualmente espaçados, a cada SLOW_TRACE_DT.
+#
+# Arquivos (depressão: prefixo s; adaptação: prefixo theta = ga/gbar_theta):
+#   <p>_mean.npy, <p>_t.npy                      sempre
+#   <p>_std.npy                                  se SLOW_RECORD_STD
+#   <p>_traces.npy, <p>_traces_idx.npy,
+#   <p>_traces_t.npy                             se SLOW_TRACE_NEURONS > 0
+
+import os
+
+import numpy as np
+from brian2 import NeuronGroup, Synapses, StateMonitor, ms
+
+_MEAN_DT = 1 * ms
+
+
+def trace_indices(cfg):
+    """Neurônios com traço individual: SLOW_TRACE_NEURONS igualmente espaçados."""
+    n_rec = min(int(cfg.SLOW_TRACE_NEURONS), cfg.N)
+    if n_rec <= 0:
+        return np.zeros(0, dtype=int)
+    return np.unique(np.linspace(0, cfg.N - 1, n_rec).round().astype(int))
+
+
+class SlowVariableRecorder:
+    """
+    Registro da variável lenta (s na depressão, ga na adaptação) de
+    n_pops populações consecutivas de cfg.N neurônios do grupo G
+    (n_pops > 1 no modo ensemble).
+
+    objects  : objetos do Brian2 a incluir na Network
+    monitors : monitores cujos dados crescem durante a execução
+    """
+
+    def __init__(self, G, cfg, n_pops=1):
+        self.cfg = cfg
+        self.n_pops = n_pops
+        N = cfg.N
+
+        if cfg.FEEDBACK_MODE == 'depression':
+            self.var, unit, unit_sq = 's', '1', '1'
+            self.prefix, self.divisor = 's', 1.0
+        else:
+            self.var, unit, unit_sq = 'ga', 'siemens', 'siemens**2'
+            # θ = ga / gbar_theta (adimensional, comparável ao Tabak Fig. 5)
+            self.prefix, self.divisor = 'theta', float(cfg.gbar_theta)
+
+        var = self.var
+        self.with_std = bool(cfg.SLOW_RECORD_STD)
+
+        pop_eqs = f'{var}_mean : {unit}'
+        sum_eqs = f'{var}_mean_post = {var}_pre / n_pop : {unit} (summed)'
+        recorded = [f'{var}_mean']
+        if self.with_std:
+            pop_eqs += f'\n{var}_sq : {unit_sq}'
+            sum_eqs += f'\n{var}_sq_post = {var}_pre**2 / n_pop : {unit_sq} (summed)'
+            recorded.append(f'{var}_sq')
+
+        # Um neurônio auxiliar por população, com relógio de 1 ms
+        self.pop = NeuronGroup(n_pops, pop_eqs, dt=_MEAN_DT, name='slowpop')
+        self.syn = Synapses(G, self.pop, model=sum_eqs,
+                            namespace={'n_pop': float(N)}, name='slowpop_syn')
+        pre = np.arange(n_pops * N)
+        self.syn.connect(i=pre, j=pre // N)
+
+        # A soma roda no início do passo (antes do monitor), sobre o estado
+        # que o StateMonitor(G) leria nesse mesmo instante.
+        for updater in self.syn.summed_updaters.values():
+            updater.when = 'start'
+            updater.order = -1
+
+        mon_name = 'smon' if var == 's' else 'gamon'
+        self.mon = StateMonitor(self.pop, recorded, record=True, dt=_MEAN_DT,
+                                when='start', name=mon_name)
+
+        # Traços individuais (opcional, decimados)
+        self.trace_idx = trace_indices(cfg)
+        self.trace_mon = None
+        if len(self.trace_idx):
+            record = np.concatenate([self.trace_idx + k * N for k in range(n_pops)])
+            self.trace_mon = StateMonitor(G, var, record=record, dt=cfg.SLOW_TRACE_DT,
+                                          name='slowtrace')
+
+    @property
+    def objects(self):
+        return [o for o in (self.pop, self.syn, self.mon, self.trace_mon) if o is not None]
+
+    @property
+    def monitors(self):
+        return [o for o in (self.mon, self.trace_mon) if o is not None]
+
+    # ------------------------------------------------------------
+    def t_ms(self):
+        return np.asarray(self.mon.t / ms, dtype=float)
+
+    def mean(self, k=0):
+        """Média populacional da população k (s ou θ)."""
+        return np.asarray(getattr(self.mon, f'{self.var}_mean')[k], dtype=float) / self.divisor
+
+    def std(self, k=0):
+        """Desvio padrão entre os neurônios da população k (s ou θ)."""
+        m = np.asarray(getattr(self.mon, f'{self.var}_mean')[k], dtype=float)
+        sq = np.asarray(getattr(self.mon, f'{self.var}_sq')[k], dtype=float)
+        return np.sqrt(np.maximum(sq - m * m, 0.0)) / self.divisor
+
+    def traces(self, k=0):
+        """Traços individuais da população k: (n_neurônios, n_amostras)."""
+        n_rec = len(self.trace_idx)
+        values = np.asarray(getattr(self.trace_mon, self.var), dtype=float)
+        return values[k * n_rec:(k + 1) * n_rec] / self.divisor
+
+    def save(self, results_dir, k=0):
+        """Grava os arquivos da população k em results_dir."""
+        save_slow_variable(
+            results_dir, self.prefix, self.t_ms(), self.mean(k),
+            std=self.std(k) if self.with_std else None,
+            traces=self.traces(k) if self.trace_mon is not None else None,
+            trace_idx=self.trace_idx,
+            trace_t_ms=(np.asarray(self.trace_mon.t / ms, dtype=float)
+                        if self.trace_mon is not None else None),
+        )
+
+
+def save_slow_variable(results_dir, prefix, t_ms, mean, std=None,
+                       traces=None, trace_idx=None, trace_t_ms=None):
+    """Grava <prefix>_mean/_t (e, se houver, _std e _traces*) em results_dir."""
+    np.save(os.path.join(results_dir, f"{prefix}_mean.npy"), mean)
+    np.save(os.path.join(results_dir, f"{prefix}_t.npy"), t_ms)
+    if std is not None:
+        np.save(os.path.join(results_dir, f"{prefix}_std.npy"), std)
+    if traces is not None:
+        np.save(os.path.join(results_dir, f"{prefix}_traces.npy"), traces)
+        np.save(os.path.join(results_dir, f"{prefix}_traces_idx.npy"), np.asarray(trace_idx))
+        np.save(os.path.join(results_dir, f"{prefix}_traces_t.npy"), trace_t_ms)
+
+    symbol = "<s>" if prefix == 's' else "<θ>"
+    print(f"[INFO] Dados de {symbol} salvos ({len(mean)} amostras).")
@@ -0,0 +1,134 @@
+# standalone_backend.py — execução no dispositivo cpp_standalone do Brian2
+#
+# No modo runtime, LIF_EMILLY.main() roda a rede em blocos de 500 ms e
+# aplica o batch STDP em Python entre os blocos. Isso impede o uso do
+# dispositivo standalone, que gera e compila UM programa C++ para a
+# simulação inteira e só devolve os dados no final.
+#
+# No modo standalone (EXECUTION_MODE = 'standalone'):
+#   - o batch STDP roda no código gerado (ver
+#     SimulationInitialization._standalone_batch_stdp);
+#   - um StateMonitor grava todos os pesos a cada 500 ms, de onde saem os
+#     mesmo histórico de pesos (weights_history.npy) do modo runtime;
+#   - spikes, taxa e variável lenta vêm dos monitores de sempre, lidos
+#     depois de device.build().
+#
+# Diferenças em relação ao modo runtime:
+#   - stdp_weight_log.json: mean_dw/std_dw são calculados a partir dos
+#     snapshots (Δw já com clip) e n_ltp_pairs/n_ltd_pairs ficam None,
+#     porque os pares não são contados no código gerado;
+#   - g_theta_inc (adaptação) é sorteado pelo gerador do C++, não pelo
+#     do numpy.
+
+import os
+import time
+
+import numpy as np
+from brian2 import set_device, device, prefs, StateMonitor, ms
+from brian2.devices.device import reset_device
+
+from weight_store import open_weight_writer
+
+SNAPSHOT_INTERVAL_MS = 500.0
+
+
+def configure_standalone(cfg, results_dir):
+    """
+    Ativa o dispositivo cpp_standalone (deve ser chamado antes de criar
+    qualquer objeto do Brian2). Retorna (rótulo do backend, pasta do build).
+    """
+    build_dir = cfg.STANDALONE_BUILD_DIR or os.path.join(results_dir, "standalone")
+    build_dir = os.path.abspath(build_dir)
+
+    set_device('cpp_standalone', build_on_run=False, directory=build_dir)
+    # Se uma execução standalone anterior já rodou neste processo
+    # (ex.: várias chamadas de main()), começa de um estado limpo.
+    device.reinit()
+    device.activate(build_on_run=False, directory=build_dir)
+
+    threads = int(cfg.STANDALONE_OPENMP_THREADS or 0)
+    prefs.devices.cpp_standalone.openmp_threads = threads
+
+    label = "cpp_standalone" + (f" (OpenMP x{threads})" if threads > 0 else "")
+    return label, build_dir
+
+
+def make_weight_snapshot_monitor(S):
+    """
+    Grava todos os pesos a cada SNAPSHOT_INTERVAL_MS, no início do passo
+    de tempo e depois da aplicação do batch STDP (order=1), ou seja, o
+    mesmo estado que o modo runtime salva ao fim de cada bloco.
+    """
+    return StateMonitor(S, 'w', record=True, dt=SNAPSHOT_INTERVAL_MS * ms,
+                        when='start', order=1, name='wsnapmon')
+
+
+def build_and_run(net, cfg, build_dir):
+    """
+    Gera, compila e executa o projeto C++. Retorna (t_compile, t_sim) em
+    segundos; t_sim é o tempo medido dentro do executável.
+    """
+    net.run(cfg.SIM_TIME, report='text')
+
+    t0 = time.time()
+    device.build(directory=build_dir, compile=True, run=True)
+    t_total = time.time() - t0
+
+    t_sim = float(device._last_run_time)
+    return t_total - t_sim, t_sim
+
+
+def save_weight_snapshots(results_dir, S, wsnap, cfg, spike_t_ms):
+    """
+    Grava o histórico de pesos (t = 0, 500, ..., SIM_TIME ms) a partir do
+    monitor de snapshots. No batch STDP o último lote ainda está em
+    S.dw_acc e é aplicado aqui, como o modo runtime faz após o último
+    bloco. Retorna o weight_log (lista de dicts por lote).
+    """
+    use_batch_stdp = cfg.STDP_MODE == 'batch'
+
+    snaps = np.asarray(wsnap.w)                  # (n_syn, n_amostras)
+    w_final = np.asarray(S.w)
+    if use_batch_stdp:
+        w_final = np.clip(w_final + cfg.eta * np.asarray(S.dw_acc), cfg.W_MIN, cfg.W_MAX)
+    snaps = np.column_stack([snaps, w_final])
+
+    times_ms = np.append(np.asarray(wsnap.t / ms, dtype=float), float(cfg.SIM_TIME / ms))
+
+    spike_t_ms = np.asarray(spike_t_ms)
+    weight_log = []
+
+    weight_store = open_weight_writer(results_dir, snaps.shape[0], len(times_ms), cfg)
+    for k, t_ms in enumerate(times_ms):
+        w_k = snaps[:, k]
+        weight_store.write(k, round(float(t_ms), 6), w_k)
+
+        if k == 0 or not use_batch_stdp:
+            continue
+
+        # Mesmo critério do modo runtime: lote sem spikes novos não entra no log
+        t_start = times_ms[k - 1]
+        if not np.any((spike_t_ms >= t_start) & (spike_t_ms < t_ms)):
+            continue
+
+        dw = w_k - snaps[:, k - 1]
+        weight_log.append({
+            't_ms':        float(t_ms),
+            'mean_dw':     float(np.mean(dw)),
+            'std_dw':      float(np.std(dw)),
+            'mean_w':      float(np.mean(w_k)),
+            'min_w':       float(np.min(w_k)),
+            'max_w':       float(np.max(w_k)),
+            'n_ltp_pairs': None,
+            'n_ltd_pairs': None,
+        })
+
+    weight_store.close()
+    print(f"[INFO] {len(times_ms)} snapshots de pesos salvos (standalone).")
+    return weight_log
+
+
+def release_device():
+    """Volta ao dispositivo runtime para as próximas execuções do processo."""
+    device.reinit()
+    reset_device()
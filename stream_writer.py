@@ -0,0 +1,148 @@
+# stream_writer.py — gravação incremental de spikes e taxa (modo runtime)
+#
+# Sem streaming, SpikeMonitor e PopulationRateMonitor guardam toda a
+# execução em memória e spike_*.npy / rate_*.npy só são escritos no fim de
+# main(): o pico de memória cresce com SIM_TIME e nada pode ser
+# inspecionado durante a execução.
+#
+# Com STREAM_OUTPUTS = True, ao fim de cada bloco de 500 ms RunStream
+# acrescenta os spikes e a taxa do bloco a arquivos .npy que crescem no
+# disco e esvazia os monitores. O cabeçalho de cada .npy é reescrito a
+# cada bloco, então os arquivos podem ser lidos (np.load) com a execução
+# em andamento:
+#
+#   spike_i.npy, spike_t.npy, rate_t.npy   finais desde o primeiro bloco
+#   _rate_raw.npy                          taxa instantânea (Hz), provisória
+#
+# finalize() calcula rate_hz.npy (média móvel de 10 ms, igual a
+# smooth_rate(window='flat')) a partir de _rate_raw.npy e o remove. Os
+# arquivos finais têm os mesmos nomes e conteúdo do modo sem streaming.
+
+import os
+import struct
+
+import numpy as np
+
+_HEADER_LEN = 128           # cabeçalho .npy de tamanho fixo (múltiplo de 64)
+_RATE_RAW = "_rate_raw"
+
+
+class GrowableNpy:
+    """
+    Arquivo .npy 1-D que cresce por append. O cabeçalho tem tamanho fixo e
+    é reescrito após cada append, de modo que o arquivo é sempre um .npy
+    válido com os dados já gravados.
+
+    length : se dado, reabre um arquivo existente e o trunca para esse
+             número de elementos (retomada de checkpoint).
+    """
+
+    def __init__(self, path, dtype, length=None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        if length is None:
+            self.n = 0
+            with open(path, "wb") as f:
+                f.write(self._header())
+        else:
+            self.n = int(length)
+            with open(path, "r+b") as f:
+                f.truncate(_HEADER_LEN + self.n * self.dtype.itemsize)
+                f.seek(0)
+                f.write(self._header())
+
+    def _header(self):
+        descr = np.lib.format.dtype_to_descr(self.dtype)
+        text = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({self.n},), }}"
+        text = text.ljust(_HEADER_LEN - 10 - 1) + "\n"
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(text)) + text.encode("latin1")
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        if not len(values):
+            return
+        with open(self.path, "r+b") as f:
+            f.seek(_HEADER_LEN + self.n * self.dtype.itemsize)
+            values.tofile(f)
+            self.n += len(values)
+            f.seek(0)
+            f.write(self._header())
+
+    def read(self, start=0):
+        """Elementos a partir de start (memmap, sem carregar o arquivo todo)."""
+        data = np.load(self.path, mmap_mode="r")
+        return data[start:]
+
+
+def clear_monitor(mon):
+    """Descarta os dados já gravados de um monitor do Brian2 (modo runtime)."""
+    mon.resize(0)
+    # resize() de SpikeMonitor/PopulationRateMonitor não zera o contador N
+    mon.variables["N"].set_value(0)
+
+
+class RunStream:
+    """
+    Streaming dos monitores de spikes (spk) e de taxa (rate) para
+    results_dir. state: dict de RunStream.state() salvo num checkpoint,
+    para retomar a gravação a partir dele.
+    """
+
+    def __init__(self, results_dir, spk, rate, state=None):
+        self.results_dir = results_dir
+        self.spk, self.rate = spk, rate
+        state = state or {}
+
+        def open_file(name, dtype):
+            return GrowableNpy(os.path.join(results_dir, f"{name}.npy"), dtype, state.get(name))
+
+        self.files = {
+            'spike_i':  open_file('spike_i', spk.variables['i'].dtype),
+            'spike_t':  open_file('spike_t', np.float64),
+            'rate_t':   open_file('rate_t', np.float64),
+            _RATE_RAW:  open_file(_RATE_RAW, np.float64),
+        }
+
+    def state(self):
+        """Número de elementos gravados em cada arquivo."""
+        return {name: f.n for name, f in self.files.items()}
+
+    def flush(self):
+        """Acrescenta os dados atuais dos monitores aos arquivos e os esvazia."""
+        spk_vars, rate_vars = self.spk.variables, self.rate.variables
+
+        # get_value() devolve os arrays internos dos monitores (t em s)
+        self.files['spike_i'].append(spk_vars['i'].get_value())
+        self.files['spike_t'].append(spk_vars['t'].get_value() / 1e-3)
+        self.files['rate_t'].append(rate_vars['t'].get_value() / 1e-3)
+        self.files[_RATE_RAW].append(rate_vars['rate'].get_value())
+
+        clear_monitor(self.spk)
+        clear_monitor(self.rate)
+
+    def spikes_since(self, t_from_ms):
+        """(spike_i, spike_t_ms) já gravados com t ≥ t_from_ms."""
+        t = self.files['spike_t'].read()
+        first = int(np.searchsorted(t, t_from_ms, side='left'))
+        return (np.array(self.files['spike_i'].read(first)),
+                np.array(self.files['spike_t'].read(first)))
+
+    def rate_raw(self):
+        """Taxa instantânea (Hz) já gravada, desde o início da execução."""
+        return np.array(self.files[_RATE_RAW].read())
+
+    def finalize(self, width_dt):
+        """
+        Grava os dados restantes e escreve rate_hz.npy: média móvel
+        retangular de width_dt amostras sobre a taxa instantânea, com a
+        mesma operação de PopulationRateMonitor.smooth_rate.
+        """
+        self.flush()
+        raw_path = self.files[_RATE_RAW].path
+        rate = np.load(raw_path)
+        window = np.ones(width_dt)
+        rate_hz = np.convolve(rate, window * 1.0 / sum(window), mode='same')
+        np.save(os.path.join(self.results_dir, "rate_hz.npy"), rate_hz)
+        os.remove(raw_path)
+        print(f"[INFO] Spikes e taxa gravados em streaming "
+              f"({self.files['spike_i'].n} spikes, {len(rate)} amostras de taxa).")
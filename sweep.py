@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+sweep.py
+========
+Varredura paralela de parâmetros sobre LIF_EMILLY.main().
+
+Cada configuração (conjunto de sobrescritas de parâmetros, convertido em
+um RunConfig) roda em um processo próprio de um pool (contexto 'spawn',
+um processo novo por configuração), usando todos os núcleos locais por
+padrão. Cada execução
+grava na sua pasta usual results/<RUN_NAME>, com um sufixo que identifica
+a varredura e o índice da configuração. Ao final é salvo um manifesto
+results/sweep_<ID>.json com o status de cada ponto.
+
+Com CODEGEN_TARGET = 'cython', o processo principal compila antes uma vez
+cada estrutura de rede distinta (aquecimento do cache do Brian2), de modo
+que os workers apenas carregam as extensões já compiladas.
+
+Os valores aceitam literais Python (0.005, -0.009, True, None, 'RAND')
+ou expressões com unidades do Brian2 (5000*ms, 0.28*nS). Textos que não
+são nenhum dos dois são usados como string (depression, ASC, ...).
+
+Uso — grade cartesiana:
+  python sweep.py --grid A_LTP=0.001,0.005,0.009 --grid A_LTD=-0.001,-0.009
+
+Uso — arquivo de especificação JSON:
+  python sweep.py --spec sweep.json --workers 16
+
+  {
+    "base": {"FEEDBACK_MODE": "depression"},
+    "grid": {"A_LTP": [0.001, 0.005], "A_LTD": [-0.001, -0.005]},
+    "runs": [{"STDP_ENABLED": false}]
+  }
+
+  Os pontos de "grid" (produto cartesiano) e de "runs" (lista explícita)
+  são concatenados; "base" é aplicado a todos.
+"""
+import argparse
+import ast
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+import traceback
+
+_RESULTS_DIR = "./results"
+
+
+# ============================================================
+# Montagem das configurações
+# ============================================================
+def parse_value(text):
+    """
+    Converte um valor textual da linha de comando / JSON.
+
+    Ordem de tentativa: literal Python → expressão com unidades do
+    Brian2 → string crua.
+    """
+    if not isinstance(text, str):
+        return text
+
+    text = text.strip()
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        pass
+
+    try:
+        import brian2.units as _units
+        namespace = {k: getattr(_units, k) for k in dir(_units) if not k.startswith('_')}
+        return eval(text, {'__builtins__': {}}, namespace)
+    except Exception:
+        return text
+
+
+def expand_grid(grid):
+    """Produto cartesiano de {param: [valores]} → lista de dicts (ordem estável)."""
+    if not grid:
+        return []
+    keys = list(grid.keys())
+    values = [list(grid[k]) for k in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def build_configs(base=None, grid=None, runs=None):
+    """Combina base + grade + lista explícita em uma lista de sobrescritas."""
+    base = {k: parse_value(v) for k, v in (base or {}).items()}
+    grid = {k: [parse_value(v) for v in vals] for k, vals in (grid or {}).items()}
+
+    points = expand_grid(grid) + [
+        {k: parse_value(v) for k, v in run.items()} for run in (runs or [])
+    ]
+    if not points:
+        points = [{}]
+
+    return [{**base, **p} for p in points]
+
+
+def validate_overrides(configs):
+    """Garante que todas as chaves são campos de RunConfig e que os valores são aceitos."""
+    from SimulationConfig import RunConfig, field_names
+
+    known = set(field_names())
+    for overrides in configs:
+        unknown = sorted(set(overrides) - known)
+        if unknown:
+            raise ValueError(f"Parâmetro(s) desconhecido(s) no sweep: {unknown}")
+        RunConfig(**overrides)
+
+
+# ============================================================
+# Execução em um processo do pool
+# ============================================================
+def _init_worker():
+    # Um processo por núcleo: evita que o BLAS de cada worker abra
+    # várias threads e sobrecarregue a máquina.
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+
+
+def _run_one(task):
+    idx, overrides, run_tag = task
+    t0 = time.time()
+    try:
+        from SimulationConfig import RunConfig
+        from LIF_EMILLY import main as lif_main
+        results_dir = lif_main(RunConfig(**overrides), run_tag=run_tag)
+        status, error = 'ok', None
+    except Exception:
+        results_dir = None
+        status, error = 'erro', traceback.format_exc()
+
+    return {
+        'index': idx,
+        'overrides': {k: repr(v) for k, v in overrides.items()},
+        'run_tag': run_tag,
+        'results_dir': results_dir,
+        'status': status,
+        'error': error,
+        'elapsed_s': time.time() - t0,
+    }
+
+
+def warmup(configs):
+    """Compila uma vez cada estrutura de rede distinta presente no sweep."""
+    from SimulationConfig import RunConfig
+    from codegen_backend import structural_key, warmup_codegen
+
+    seen = set()
+    for overrides in configs:
+        cfg = RunConfig(**overrides)
+        key = structural_key(cfg)
+        if key in seen:
+            continue
+        seen.add(key)
+        target, elapsed = warmup_codegen(cfg)
+        print(f"[INFO] Aquecimento do cache ({target}) para {key}: {elapsed:.1f} s")
+
+
+def run_sweep(configs, workers=None, sweep_id=None, results_root=_RESULTS_DIR,
+              warm=True):
+    """
+    Executa todas as configurações em paralelo.
+
+    Retorna a lista de resultados (um dict por configuração, na ordem
+    original) e grava o manifesto em results_root/sweep_<ID>.json.
+    """
+    validate_overrides(configs)
+
+    if warm:
+        warmup(configs)
+
+    sweep_id = sweep_id or time.strftime("%Y%m%d_%H%M%S")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(configs)))
+
+    tasks = [
+        (idx, overrides, f"SW{sweep_id}_{idx:03d}")
+        for idx, overrides in enumerate(configs)
+    ]
+
+    print(f"[INFO] Sweep {sweep_id}: {len(tasks)} configurações em {workers} processo(s).")
+
+    results = []
+    ctx = mp.get_context('spawn')
+    with ctx.Pool(workers, initializer=_init_worker, maxtasksperchild=1) as pool:
+        for res in pool.imap_unordered(_run_one, tasks):
+            results.append(res)
+            print(f"[SWEEP] {len(results)}/{len(tasks)}  #{res['index']:03d}  "
+                  f"{res['status']}  ({res['elapsed_s']:.1f} s)  {res['overrides']}")
+            if res['error']:
+                print(res['error'])
+
+    results.sort(key=lambda r: r['index'])
+
+    os.makedirs(results_root, exist_ok=True)
+    manifest_path = os.path.join(results_root, f"sweep_{sweep_id}.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({'sweep_id': sweep_id, 'workers': workers, 'runs': results}, f, indent=2)
+    print(f"[OK] Manifesto do sweep salvo em: {manifest_path}")
+
+    return results
+
+
+# ============================================================
+# CLI
+# ============================================================
+def _parse_grid_args(items):
+    grid = {}
+    for item in items or []:
+        if "=" not in item:
+            raise ValueError(f"--grid espera PARAM=v1,v2,...; recebido: '{item}'")
+        key, values = item.split("=", 1)
+        grid[key.strip()] = [v for v in values.split(",") if v.strip()]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Varredura paralela de parâmetros do modelo LIF."
+    )
+    parser.add_argument("--grid", action="append", metavar="PARAM=v1,v2,...",
+                        help="Eixo da grade cartesiana (pode repetir).")
+    parser.add_argument("--set", action="append", metavar="PARAM=valor",
+                        help="Sobrescrita comum a todas as configurações (pode repetir).")
+    parser.add_argument("--spec", default=None,
+                        help="Arquivo JSON com 'base', 'grid' e/ou 'runs'.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de processos (padrão: todos os núcleos).")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Apenas lista as configurações, sem simular.")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="Não pré-compila o código antes de iniciar o pool.")
+    args = parser.parse_args()
+
+    base, grid, runs = {}, {}, []
+    if args.spec:
+        with open(args.spec, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        base.update(spec.get("base", {}))
+        grid.update(spec.get("grid", {}))
+        runs.extend(spec.get("runs", []))
+
+    for item in args.set or []:
+        key, value = item.split("=", 1)
+        base[key.strip()] = value
+    grid.update(_parse_grid_args(args.grid))
+
+    configs = build_configs(base=base, grid=grid, runs=runs)
+
+    if args.dry_run:
+        validate_overrides(configs)
+        for idx, overrides in enumerate(configs):
+            print(f"#{idx:03d}  {overrides}")
+        print(f"[INFO] {len(configs)} configuração(ões).")
+        return
+
+    run_sweep(configs, workers=args.workers, warm=not args.no_warmup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# synapse_index.py — índice CSR/CSC das sinapses para o batch STDP
+#
+# apply_batch_stdp relia np.asarray(S.i) e np.asarray(S.j) a cada batch e
+# percorria todas as sinapses, mesmo as de neurônios sem spikes na janela.
+# Com P_CONNECT < 1 e N grande, a maior parte delas não contribui.
+#
+# SynapseIndex guarda, uma única vez (em make_synapses), os índices pré e
+# pós de cada sinapse e duas listas de adjacência:
+#   CSR (por neurônio pré) : out_syn[out_ptr[n]:out_ptr[n+1]]  sinapses que saem de n
+#   CSC (por neurônio pós) : in_syn[in_ptr[n]:in_ptr[n+1]]     sinapses que chegam a n
+# between(neurônios) devolve as sinapses com pré E pós no conjunto, a custo
+# proporcional às sinapses que saem dos neurônios ativos.
+#
+# O índice fica em S.syn_index (Synapses do Brian2 e os objetos
+# equivalentes de dense_engine.py e ensemble.py). synapse_index(S) o
+# constrói e guarda se ainda não existir.
+
+import numpy as np
+
+
+def _rows(ptr, order, rows):
+    """Concatena order[ptr[r]:ptr[r+1]] para as linhas rows, sem laço Python."""
+    starts = ptr[rows]
+    lens = ptr[rows + 1] - starts
+    total = int(lens.sum())
+    if total == 0:
+        return np.zeros(0, dtype=order.dtype)
+    # posição dentro de order: início da linha + deslocamento na linha
+    shift = np.repeat(starts - (np.cumsum(lens) - lens), lens)
+    return order[shift + np.arange(total)]
+
+
+class SynapseIndex:
+    """
+    Índices pré/pós das sinapses, com adjacência CSR (por pré) e CSC (por
+    pós). n_neurons: tamanho do grupo (padrão: maior índice + 1).
+    """
+
+    def __init__(self, pre, post, n_neurons=None):
+        self.pre = np.asarray(pre, dtype=np.int64)
+        self.post = np.asarray(post, dtype=np.int64)
+        if n_neurons is None:
+            n_neurons = int(max(self.pre.max(), self.post.max())) + 1 if len(self.pre) else 0
+        self.n_neurons = int(n_neurons)
+
+        self.out_syn = np.argsort(self.pre, kind='stable')
+        self.out_ptr = np.zeros(self.n_neurons + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.pre, minlength=self.n_neurons), out=self.out_ptr[1:])
+
+        self.in_syn = np.argsort(self.post, kind='stable')
+        self.in_ptr = np.zeros(self.n_neurons + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.post, minlength=self.n_neurons), out=self.in_ptr[1:])
+
+    @classmethod
+    def from_synapses(cls, S):
+        """Índice de um objeto Synapses do Brian2 (modo runtime)."""
+        return cls(np.asarray(S.i), np.asarray(S.j), S.source.N)
+
+    def __len__(self):
+        return len(self.pre)
+
+    def outgoing(self, neurons):
+        """Sinapses que saem dos neurônios dados (CSR)."""
+        return _rows(self.out_ptr, self.out_syn, neurons)
+
+    def incoming(self, neurons):
+        """Sinapses que chegam aos neurônios dados (CSC)."""
+        return _rows(self.in_ptr, self.in_syn, neurons)
+
+    def between(self, neurons):
+        """
+        Sinapses com pré e pós em neurons, em ordem crescente. Percorre a
+        lista (CSR ou CSC) do lado com menos sinapses.
+        """
+        neurons = np.asarray(neurons, dtype=np.int64)
+        neurons = neurons[(neurons >= 0) & (neurons < self.n_neurons)]
+        if len(np.unique(neurons)) == self.n_neurons:
+            return np.arange(len(self.pre))
+        member = np.zeros(self.n_neurons, dtype=bool)
+        member[neurons] = True
+
+        n_out = int((self.out_ptr[neurons + 1] - self.out_ptr[neurons]).sum())
+        n_in = int((self.in_ptr[neurons + 1] - self.in_ptr[neurons]).sum())
+        if n_out <= n_in:
+            syn = self.outgoing(neurons)
+            syn = syn[member[self.post[syn]]]
+        else:
+            syn = self.incoming(neurons)
+            syn = syn[member[self.pre[syn]]]
+        return np.sort(syn)
+
+
+def synapse_index(S):
+    """S.syn_index, construído (e guardado em S) se ainda não existir."""
+    index = getattr(S, 'syn_index', None)
+    if index is None:
+        index = SynapseIndex(np.asarray(S.i), np.asarray(S.j))
+        try:
+            S.syn_index = index
+        except AttributeError:
+            pass
+    return index
@@ -0,0 +1,389 @@
+# weight_store.py — histórico de pesos num único arquivo mapeado em memória
+#
+# Antes, cada bloco de 500 ms gravava um weights_t_XXXXX.npy com todos os
+# pesos: uma execução de 480 s deixava 961 arquivos por pasta, e os
+# scripts de análise precisavam de glob + parse do nome + np.load de cada
+# arquivo.
+#
+# Agora o histórico é uma matriz T×n_syn pré-alocada no início da
+# execução (np.lib.format.open_memmap) e preenchida linha a linha:
+#
+#   weights_history.npy     (T, n_syn) no dtype de WEIGHT_STORE_DTYPE
+#   weights_history_t.npy   (T,) tempo de cada linha em ms; NaN = linha
+#                           ainda não gravada (execução em andamento,
+#                           interrompida ou retomada de checkpoint)
+#
+# Os dois arquivos são .npy válidos desde a criação. Leitura:
+#
+#   from weight_store import open_weight_history
+#   wh = open_weight_history(results_dir)
+#   wh.t_ms            tempos gravados (ms)
+#   wh[k]              pesos da linha k (float64)
+#   wh.at(t_ms)        pesos no instante t_ms (exato)
+#   wh.nearest(t_ms)   (t, pesos) da linha mais próxima de t_ms
+#   wh.matrix()        matriz (len(wh), n_syn) sem copiar (memmap)
+#
+# Formato 'delta' (WEIGHT_STORE_FORMAT = 'delta'): entre dois lotes o batch
+# STDP só altera as sinapses cujos neurônios pré e pós dispararam na
+# janela, então em vez da matriz completa são gravados
+#
+#   weights_keyframes.npy   (ceil(T/K), n_syn) pesos completos a cada
+#                           K = WEIGHT_KEYFRAME_EVERY snapshots
+#   weights_delta_idx.npy   índices das sinapses alteradas, snapshot a
+#   weights_delta_val.npy   snapshot, e o novo valor de cada uma
+#   weights_delta_ptr.npy   (T+1,) valores do snapshot k em val[ptr[k]:ptr[k+1]]
+#   weights_delta_iptr.npy  (T+1,) índices do snapshot k em idx[iptr[k]:iptr[k+1]]
+#
+# Quando tantas sinapses mudam que (índice, valor) ocuparia mais que a
+# linha inteira (típico durante um episódio), o snapshot é gravado
+# completo: n_syn valores e nenhum índice.
+#   weights_delta.json      K e número total de snapshots
+#   weights_history_t.npy   como no formato denso
+#
+# Guardar o valor novo (e não Δw) torna a reconstrução exata: qualquer
+# snapshot k sai do keyframe k // K mais os registros seguintes, sem
+# acumular arredondamento. O reader é o mesmo para os dois formatos.
+#
+# open_weight_history também lê pastas antigas com weights_t_*.npy.
+# O layout antigo pode ser exportado com:
+#   python weight_store.py --dir results/<RUN_NAME> --export-legacy
+
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+
+from stream_writer import GrowableNpy
+
+HISTORY_FILE = "weights_history.npy"
+TIMES_FILE = "weights_history_t.npy"
+KEYFRAMES_FILE = "weights_keyframes.npy"
+DELTA_IDX_FILE = "weights_delta_idx.npy"
+DELTA_VAL_FILE = "weights_delta_val.npy"
+DELTA_PTR_FILE = "weights_delta_ptr.npy"
+DELTA_IPTR_FILE = "weights_delta_iptr.npy"
+DELTA_META_FILE = "weights_delta.json"
+LEGACY_PATTERN = "weights_t_*.npy"
+
+
+def legacy_name(t_ms):
+    """Nome do arquivo por snapshot do layout antigo."""
+    return f"weights_t_{int(round(t_ms)):05d}.npy"
+
+
+def _open_times(results_dir, n_snapshots, resume):
+    """Índice de tempos (NaN = linha não gravada), novo ou reaberto."""
+    path = os.path.join(results_dir, TIMES_FILE)
+    if resume:
+        return np.load(path, mmap_mode='r+')
+    t = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(n_snapshots,))
+    t[:] = np.nan
+    t.flush()
+    return t
+
+
+class WeightHistoryWriter:
+    """
+    Grava o histórico de pesos de uma execução em results_dir (formato
+    denso: uma linha completa por snapshot).
+
+    n_snapshots : número total de linhas (snapshot inicial + um por bloco)
+    resume_rows : retomada de checkpoint — número de linhas já gravadas
+                  que valem; as seguintes são sobrescritas.
+    """
+
+    def __init__(self, results_dir, n_syn, n_snapshots, dtype='float64', resume_rows=None):
+        hist_path = os.path.join(results_dir, HISTORY_FILE)
+        resume = resume_rows is not None
+        if resume:
+            self.w = np.load(hist_path, mmap_mode='r+')
+        else:
+            self.w = np.lib.format.open_memmap(
+                hist_path, mode='w+', dtype=np.dtype(dtype), shape=(n_snapshots, n_syn))
+        self.t = _open_times(results_dir, n_snapshots, resume)
+
+    def write(self, k, t_ms, weights):
+        """Grava os pesos do instante t_ms na linha k."""
+        self.w[k] = weights
+        self.w.flush()
+        # O tempo vai por último: a linha só é considerada gravada depois
+        # que os pesos estão no disco.
+        self.t[k] = t_ms
+        self.t.flush()
+
+    def close(self):
+        self.w.flush()
+        self.t.flush()
+        del self.w, self.t
+
+
+class DeltaWeightWriter:
+    """
+    Grava o histórico de pesos no formato 'delta': keyframe completo a
+    cada keyframe_every snapshots e, nos demais, só as sinapses cujo peso
+    mudou desde o snapshot anterior. Os snapshots devem ser gravados em
+    ordem (k = 0, 1, 2, ...).
+    """
+
+    def __init__(self, results_dir, n_syn, n_snapshots, dtype='float64',
+                 keyframe_every=20, resume_rows=None):
+        self.dtype = np.dtype(dtype)
+        self.keyframe_every = int(keyframe_every)
+        path = lambda name: os.path.join(results_dir, name)
+        resume = resume_rows is not None
+
+        if resume:
+            self.keyframes = np.load(path(KEYFRAMES_FILE), mmap_mode='r+')
+            with open(path(DELTA_META_FILE)) as f:
+                self.keyframe_every = json.load(f)['keyframe_every']
+            ptr = np.load(path(DELTA_PTR_FILE))[:resume_rows + 1]
+            iptr = np.load(path(DELTA_IPTR_FILE))[:resume_rows + 1]
+            self.ptr = GrowableNpy(path(DELTA_PTR_FILE), np.int64, len(ptr))
+            self.iptr = GrowableNpy(path(DELTA_IPTR_FILE), np.int64, len(iptr))
+            self.idx = GrowableNpy(path(DELTA_IDX_FILE), np.int32, int(iptr[-1]))
+            self.val = GrowableNpy(path(DELTA_VAL_FILE), self.dtype, int(ptr[-1]))
+            self.n_rows = resume_rows
+            self.prev = _DeltaRows(self.keyframes, self.keyframe_every, self.idx.read(),
+                                   self.val.read(), ptr, iptr)[resume_rows - 1].astype(self.dtype)
+        else:
+            n_key = -(-n_snapshots // self.keyframe_every)
+            self.keyframes = np.lib.format.open_memmap(
+                path(KEYFRAMES_FILE), mode='w+', dtype=self.dtype, shape=(n_key, n_syn))
+            with open(path(DELTA_META_FILE), 'w') as f:
+                json.dump({'keyframe_every': self.keyframe_every,
+                           'n_snapshots': int(n_snapshots)}, f)
+            self.ptr = GrowableNpy(path(DELTA_PTR_FILE), np.int64)
+            self.ptr.append([0])
+            self.iptr = GrowableNpy(path(DELTA_IPTR_FILE), np.int64)
+            self.iptr.append([0])
+            self.idx = GrowableNpy(path(DELTA_IDX_FILE), np.int32)
+            self.val = GrowableNpy(path(DELTA_VAL_FILE), self.dtype)
+            self.n_rows = 0
+            self.prev = None
+        self.t = _open_times(results_dir, n_snapshots, resume)
+
+    def write(self, k, t_ms, weights):
+        """Grava os pesos do instante t_ms como snapshot k."""
+        if k != self.n_rows:
+            raise ValueError(f"Snapshot {k} fora de ordem (esperado {self.n_rows}).")
+        # Comparação já no dtype gravado: em float16, variações abaixo da
+        # resolução não geram registros
+        weights = np.array(weights, dtype=self.dtype)
+
+        if k % self.keyframe_every == 0:
+            self.keyframes[k // self.keyframe_every] = weights
+            self.keyframes.flush()
+        else:
+            changed = np.flatnonzero(weights != self.prev)
+            sparse_bytes = len(changed) * (self.idx.dtype.itemsize + self.dtype.itemsize)
+            if sparse_bytes < weights.nbytes:
+                self.idx.append(changed)
+                self.val.append(weights[changed])
+            else:
+                self.val.append(weights)
+        self.ptr.append([self.val.n])
+        self.iptr.append([self.idx.n])
+
+        self.prev = weights
+        self.n_rows += 1
+        self.t[k] = t_ms
+        self.t.flush()
+
+    def close(self):
+        self.keyframes.flush()
+        self.t.flush()
+        del self.keyframes, self.t
+
+
+def open_weight_writer(results_dir, n_syn, n_snapshots, cfg, resume_rows=None):
+    """Writer do formato escolhido em cfg.WEIGHT_STORE_FORMAT."""
+    if cfg.WEIGHT_STORE_FORMAT == 'delta':
+        return DeltaWeightWriter(results_dir, n_syn, n_snapshots, cfg.WEIGHT_STORE_DTYPE,
+                                 cfg.WEIGHT_KEYFRAME_EVERY, resume_rows)
+    return WeightHistoryWriter(results_dir, n_syn, n_snapshots, cfg.WEIGHT_STORE_DTYPE,
+                               resume_rows)
+
+
+class _DeltaRows:
+    """Reconstrução por índice das linhas do formato 'delta'."""
+
+    def __init__(self, keyframes, keyframe_every, idx, val, ptr, iptr):
+        self.keyframes = keyframes
+        self.keyframe_every = keyframe_every
+        self.idx, self.val, self.ptr, self.iptr = idx, val, ptr, iptr
+
+    def __getitem__(self, k):
+        first = k - k % self.keyframe_every
+        w = np.array(self.keyframes[first // self.keyframe_every], dtype=float)
+        for j in range(first + 1, k + 1):
+            values = self.val[self.ptr[j]:self.ptr[j + 1]]
+            if self.iptr[j + 1] > self.iptr[j]:
+                w[self.idx[self.iptr[j]:self.iptr[j + 1]]] = values
+            elif len(values):
+                w[:] = values           # snapshot gravado completo
+        return w
+
+
+class WeightHistory:
+    """
+    Leitura do histórico de pesos de uma pasta de resultados. Usar
+    open_weight_history(), que também aceita o layout antigo.
+    """
+
+    def __init__(self, t_ms, rows, n_syn, dtype, source):
+        self.t_ms = np.asarray(t_ms, dtype=float)
+        self._rows = rows           # memmap (T, n_syn), _DeltaRows ou lista de arquivos
+        self.n_syn = n_syn
+        self.dtype = np.dtype(dtype)
+        self.source = source        # 'history' | 'delta' | 'legacy'
+        self.files = []
+
+    def __len__(self):
+        return len(self.t_ms)
+
+    def __getitem__(self, k):
+        if isinstance(self._rows, list):
+            return np.load(self._rows[k]).astype(float)
+        return np.asarray(self._rows[k], dtype=float)
+
+    def nbytes(self):
+        """Tamanho em disco do histórico (bytes)."""
+        return sum(os.path.getsize(f) for f in self.files)
+
+    def index_of(self, t_ms):
+        """Linha mais próxima do instante t_ms."""
+        return int(np.argmin(np.abs(self.t_ms - t_ms)))
+
+    def at(self, t_ms):
+        """Pesos no instante t_ms (tolerância de 0.5 ms)."""
+        k = self.index_of(t_ms)
+        if abs(self.t_ms[k] - t_ms) > 0.5:
+            raise KeyError(f"Sem snapshot de pesos em t = {t_ms} ms.")
+        return self[k]
+
+    def nearest(self, t_ms):
+        """(t, pesos) da linha mais próxima de t_ms."""
+        k = self.index_of(t_ms)
+        return float(self.t_ms[k]), self[k]
+
+    def matrix(self):
+        """Matriz (len, n_syn) no dtype gravado (memmap no formato denso)."""
+        if isinstance(self._rows, list):
+            return np.stack([np.load(f) for f in self._rows])
+        if isinstance(self._rows, _DeltaRows):
+            return np.stack([self._rows[k] for k in range(len(self))]).astype(self.dtype)
+        return self._rows
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield float(self.t_ms[k]), self[k]
+
+
+def _open_history(results_dir):
+    w = np.load(os.path.join(results_dir, HISTORY_FILE), mmap_mode='r')
+    t = np.load(os.path.join(results_dir, TIMES_FILE))
+    rows = np.flatnonzero(~np.isnan(t))
+    # Linhas gravadas são sempre um prefixo; a cópia só ocorre se não forem
+    if len(rows) and rows[-1] == len(rows) - 1:
+        w_rows = w[:len(rows)]
+    else:
+        w_rows = w[rows]
+    wh = WeightHistory(t[rows], w_rows, w.shape[1], w.dtype, 'history')
+    wh.files = [os.path.join(results_dir, f) for f in (HISTORY_FILE, TIMES_FILE)]
+    return wh
+
+
+def _open_delta(results_dir):
+    path = lambda name: os.path.join(results_dir, name)
+    keyframes = np.load(path(KEYFRAMES_FILE), mmap_mode='r')
+    t = np.load(path(TIMES_FILE))
+    ptr = np.load(path(DELTA_PTR_FILE))
+    iptr = np.load(path(DELTA_IPTR_FILE))
+    # Só linhas com tempo e ponteiros gravados (prefixo, gravação em ordem)
+    n_rows = min(int(np.count_nonzero(~np.isnan(t))), len(ptr) - 1, len(iptr) - 1)
+    with open(path(DELTA_META_FILE)) as f:
+        keyframe_every = json.load(f)['keyframe_every']
+    rows = _DeltaRows(keyframes, keyframe_every, np.load(path(DELTA_IDX_FILE), mmap_mode='r'),
+                      np.load(path(DELTA_VAL_FILE), mmap_mode='r'), ptr, iptr)
+    wh = WeightHistory(t[:n_rows], rows, keyframes.shape[1], keyframes.dtype, 'delta')
+    wh.files = [path(f) for f in (KEYFRAMES_FILE, DELTA_IDX_FILE, DELTA_VAL_FILE,
+                                  DELTA_PTR_FILE, DELTA_IPTR_FILE, DELTA_META_FILE, TIMES_FILE)]
+    return wh
+
+
+def _open_legacy(results_dir):
+    timed = []
+    for path in glob.glob(os.path.join(results_dir, LEGACY_PATTERN)):
+        try:
+            timed.append((int(os.path.basename(path).split('_t_')[1].split('.')[0]), path))
+        except (IndexError, ValueError):
+            print(f"[AVISO] Não foi possível extrair o tempo do arquivo: {path}. Pulando.")
+    if not timed:
+        return None
+    timed.sort()
+    first = np.load(timed[0][1], mmap_mode='r')
+    wh = WeightHistory([t for t, _ in timed], [p for _, p in timed],
+                       len(first), first.dtype, 'legacy')
+    wh.files = [p for _, p in timed]
+    return wh
+
+
+def open_weight_history(results_dir):
+    """
+    Histórico de pesos de results_dir (formato denso, formato 'delta' ou,
+    em pastas antigas, weights_t_*.npy). Retorna None se não houver nenhum.
+    """
+    for name, opener in ((HISTORY_FILE, _open_history), (KEYFRAMES_FILE, _open_delta)):
+        if os.path.exists(os.path.join(results_dir, name)):
+            wh = opener(results_dir)
+            if len(wh):
+                return wh
+    return _open_legacy(results_dir)
+
+
+def export_legacy(results_dir, out_dir=None):
+    """Escreve um weights_t_XXXXX.npy por snapshot. Retorna o número de arquivos."""
+    wh = open_weight_history(results_dir)
+    if wh is None:
+        print(f"[AVISO] Nenhum histórico de pesos encontrado em: {results_dir}")
+        return 0
+    out_dir = out_dir or results_dir
+    os.makedirs(out_dir, exist_ok=True)
+    for t_ms, w in wh:
+        np.save(os.path.join(out_dir, legacy_name(t_ms)), w)
+    print(f"[OK] {len(wh)} arquivos weights_t_*.npy escritos em: {out_dir}")
+    return len(wh)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Informações do histórico de pesos e exportação para weights_t_*.npy."
+    )
+    parser.add_argument("--dir", required=True, help="Pasta de resultados da simulação.")
+    parser.add_argument("--export-legacy", action="store_true",
+                        help="Escreve um weights_t_XXXXX.npy por snapshot (layout antigo).")
+    parser.add_argument("--out", default=None,
+                        help="Pasta de destino da exportação (padrão: a própria --dir).")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"[ERRO] Diretório não encontrado: {args.dir}")
+        return
+
+    if args.export_legacy:
+        export_legacy(args.dir, args.out)
+        return
+
+    wh = open_weight_history(args.dir)
+    if wh is None:
+        print(f"[AVISO] Nenhum histórico de pesos encontrado em: {args.dir}")
+        return
+    print(f"[INFO] Origem: {wh.source} | snapshots = {len(wh)} | sinapses = {wh.n_syn} "
+          f"| dtype = {wh.dtype} | t = {wh.t_ms[0]:g} … {wh.t_ms[-1]:g} ms "
+          f"| {wh.nbytes() / 2**20:.2f} MiB em disco")
+
+
+if __name__ == "__main__":
+    main()